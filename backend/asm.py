@@ -1,8 +1,13 @@
+from collections import Counter
+from typing import Any, Iterable, Optional
+
 from backend.dataflow.cfg import CFG
 from backend.dataflow.cfgbuilder import CFGBuilder
 from backend.dataflow.livenessanalyzer import LivenessAnalyzer
 from backend.reg.bruteregalloc import BruteRegAlloc
 from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from utils.passtimer import NULL_TIMER, PassTimer
+from utils.tac.tacfunc import TACFunc
 from utils.tac.tacprog import TACProg
 
 """
@@ -10,18 +15,69 @@ Asm: we use it to generate all the asm code for the program
 """
 
 class Asm:
-    def __init__(self, emitter: RiscvAsmEmitter, regAlloc: BruteRegAlloc) -> None:
+    def __init__(
+        self,
+        emitter: RiscvAsmEmitter,
+        regAlloc: BruteRegAlloc,
+        timer: PassTimer = NULL_TIMER,
+        stats: Optional[list[dict[str, Any]]] = None,
+    ) -> None:
         self.emitter = emitter
         self.regAlloc = regAlloc
+        self.timer = timer
+        # If given, the statistics of every function are appended to it, see `functionStats`.
+        self.stats = stats
 
     def transform(self, prog: TACProg):
+        return self.transformFuncs(prog.funcs)
+
+    # Compile the functions one at a time, in the order `funcs` yields them: the instructions, the CFG
+    # and the liveness of a function are dropped once it is emitted, so that `funcs` may generate them lazily.
+    def transformFuncs(self, funcs: Iterable[TACFunc]):
         analyzer = LivenessAnalyzer()
+        for func in funcs:
+            self.transformFunc(func, analyzer)
+            # Not to hold on to the function while the next one is generated.
+            del func
 
-        for func in prog.funcs:
+        return self.emitter.emitEnd()
+
+    def transformFunc(self, func: TACFunc, analyzer: LivenessAnalyzer) -> None:
+        # Every pass is measured per function, see `PassTimer`.
+        measure = self.timer.measure
+        name = func.entry.name
+        with measure("selectInstr", name):
             pair = self.emitter.selectInstr(func)
-            builder = CFGBuilder()
+        builder = CFGBuilder()
+        with measure("buildCFG", name):
             cfg: CFG = builder.buildFrom(pair[0])
+        with measure("liveness", name):
             analyzer.accept(cfg)
+        instrs = self.emitter.printer.instrs
+        with measure("regAlloc", name):
             self.regAlloc.accept(cfg, pair[1])
+        if self.stats is not None:
+            self.stats.append(
+                self.functionStats(
+                    func, cfg, analyzer, self.emitter.printer.instrs - instrs
+                )
+            )
 
-        return self.emitter.emitEnd()
+    # The statistics of a function, gathered from the counters of the passes once the function is emitted.
+    def functionStats(
+        self, func: TACFunc, cfg: CFG, analyzer: LivenessAnalyzer, asmInstrs: int
+    ) -> dict[str, Any]:
+        instrs = [instr for instr in func.getInstrSeq() if not instr.isLabel()]
+        return {
+            "function": func.entry.name,
+            "tacInstrs": len(instrs),
+            "tacKinds": dict(sorted(Counter(type(i).__name__ for i in instrs).items())),
+            "temps": func.tempUsed,
+            "blocks": len(cfg.nodes),
+            "edges": len(cfg.edges),
+            "averageLiveIn": analyzer.liveIns / analyzer.locs if analyzer.locs else 0,
+            "spills": self.regAlloc.spills,
+            "reloads": self.regAlloc.reloads,
+            "frameSize": self.regAlloc.frameSize,
+            "asmInstrs": asmInstrs,
+        }
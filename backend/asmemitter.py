@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional, TextIO
 
 from utils.asmcodeprinter import AsmCodePrinter
 from utils.tac.reg import Reg
@@ -9,7 +10,7 @@ from .subroutineinfo import SubroutineInfo
 """
 AsmEmitter: emit asm code
 
-        printer: use it to output the asm code
+        printer: use it to output the asm code, written to `out` function by function if it is given
 allocatableRegs: all the regs that can used in reg alloc
  callerSaveRegs: all the caller save regs that used in reg alloc
 
@@ -19,10 +20,15 @@ allocatableRegs: all the regs that can used in reg alloc
 
 
 class AsmEmitter(ABC):
-    def __init__(self, allocatableRegs: list[Reg], callerSaveRegs: list[Reg]) -> None:
+    def __init__(
+        self,
+        allocatableRegs: list[Reg],
+        callerSaveRegs: list[Reg],
+        out: Optional[TextIO] = None,
+    ) -> None:
         self.allocatableRegs = allocatableRegs
         self.callerSaveRegs = callerSaveRegs
-        self.printer = AsmCodePrinter()
+        self.printer = AsmCodePrinter(out)
 
     @abstractmethod
     def selectInstr(self, func: TACFunc) -> tuple[list[str], SubroutineInfo]:
@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 from enum import Enum, auto, unique
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from backend.dataflow.loc import Loc
 from utils.label.label import Label
 
+if TYPE_CHECKING:
+    from backend.dataflow.liveness import LiveSet, Liveness, LocLiveness
+
 """
 BlockKind
 depend on the last instr of the basicblock
@@ -31,6 +36,9 @@ label: the label of the block, which will be used in CfgBuilder
 liveUse: the temps used in this basicblock before it's redefine
  liveIn: the active temps in the start of the basicblock
 liveOut: the active temps in the end of the basicblock
+
+The last three sets are views of the bit vectors of the `Liveness` of the function, set by `LivenessAnalyzer`,
+and so are the sets of its locs, computed on demand by `locLiveness`. They iterate the temps in ascending order.
 """
 
 
@@ -41,12 +49,44 @@ class BasicBlock:
         self.kind = kind
         self.id = id
         self.label = label
-        self.locs: list[Loc] = locs.copy()
-
-        self.define: set[int] = set()
-        self.liveUse: set[int] = set()
-        self.liveIn: set[int] = set()
-        self.liveOut: set[int] = set()
+        # Kept as it is, not copied: the caller gives it away.
+        self.locs: list[Loc] = locs
+        for index, loc in enumerate(self.locs):
+            loc.block = self
+            loc.index = index
+
+        self.liveness: Optional[Liveness] = None
+
+    def analyzed(self) -> Liveness:
+        if self.liveness is None:
+            raise ValueError("the liveness of the block has not been analyzed")
+        return self.liveness
+
+    # Every temp written in the block, computed when asked for: the liveness only keeps the ones live across blocks.
+    @property
+    def define(self) -> set[int]:
+        define: set[int] = set()
+        for loc in self.locs:
+            define.update(loc.instr.getWritten())
+        return define
+
+    @property
+    def liveUse(self) -> LiveSet:
+        liveness = self.analyzed()
+        return liveness.liveSet(liveness.liveUse[self.id])
+
+    @property
+    def liveIn(self) -> LiveSet:
+        liveness = self.analyzed()
+        return liveness.liveSet(liveness.liveIn[self.id])
+
+    @property
+    def liveOut(self) -> LiveSet:
+        liveness = self.analyzed()
+        return liveness.liveSet(liveness.liveOut[self.id])
+
+    def locLiveness(self) -> LocLiveness:
+        return self.analyzed().locLiveness(self)
 
     def isEmpty(self):
         return len(self.locs) == 0
@@ -1,3 +1,6 @@
+from array import array
+from typing import Optional
+
 from backend.dataflow.basicblock import BasicBlock
 
 """
@@ -5,38 +8,309 @@ CFG: Control Flow Graph
 
 nodes: sequence of basicblock
 edges: sequence of edge(u,v), which represents after block u is executed, block v may be executed
-links: links[u][0] represent the Prev of u, links[u][1] represent the Succ of u,
+
+The successors and the predecessors of the blocks are compact integer adjacency arrays:
+the successors of u are succs[succStart[u]:succStart[u + 1]], sorted and without duplicates, and so are its predecessors.
+
+Computed lazily, once per function, as a CFG is not modified once built:
+reversePostorder: the ids of the blocks in reverse postorder from the entry block 0, then the unreachable ones
+      dominators: the immediate dominator of every block (the algorithm of Cooper, Harvey and Kennedy),
+                  and the dominator tree
+           loops: the natural loops, nested, and the innermost loop and the loop depth of every block
 """
 
 
+class Loop:
+    """
+    A natural loop: the blocks of the back edges to header, and the blocks from which they are reached without
+    going through header, which dominates all of them. The loops with the same header are merged.
+
+     header: the id of its header
+    latches: the ids of the blocks with a back edge to header
+     blocks: the ids of its blocks, the ones of its nested loops included, in increasing order
+     parent: the loop it is nested in, if any, and children: the loops nested in it
+      depth: 1 for an outermost loop, the depth of its parent + 1 otherwise
+    """
+
+    __slots__ = ("header", "latches", "blocks", "parent", "children", "depth")
+
+    def __init__(self, header: int, latches: list[int]) -> None:
+        self.header = header
+        self.latches = latches
+        self.blocks = array("i")
+        self.parent: Optional[Loop] = None
+        self.children: list[Loop] = []
+        self.depth = 1
+
+    def __repr__(self) -> str:
+        return (
+            f"Loop(header={self.header}, depth={self.depth}, blocks={len(self.blocks)})"
+        )
+
+
 class CFG:
     def __init__(self, nodes: list[BasicBlock], edges: list[(int, int)]) -> None:
         self.nodes = nodes
         self.edges = edges
 
-        self.links = []
+        # Sorted by source, then by target: the successors of every block are sorted.
+        pairs = sorted(set(edges))
+        count = len(nodes)
+        self.succStart = self.startsOf([u for u, _ in pairs], count)
+        self.succs = array("i", [v for _, v in pairs])
+        # A counting sort by target, stable: the predecessors of every block are sorted too.
+        self.predStart = self.startsOf([v for _, v in pairs], count)
+        self.preds = array("i", bytes(self.succs.itemsize * len(pairs)))
+        position = array("i", self.predStart[:count])
+        for u, v in pairs:
+            self.preds[position[v]] = u
+            position[v] += 1
 
-        for i in range(len(nodes)):
-            self.links.append((set(), set()))
+        self._reversePostorder: Optional[list[int]] = None
+        # The position of every block in reversePostorder, -1 if it is unreachable.
+        self._order: Optional[array] = None
+        self._idom: Optional[array] = None
+        self._domStart = array("i")
+        self._domChildren = array("i")
+        # The preorder and postorder numbers of every block in the dominator tree.
+        self._domPre = array("i")
+        self._domPost = array("i")
+        self._loops: Optional[list[Loop]] = None
+        self._loopOf: list[Optional[Loop]] = []
+        self._loopDepth = array("i")
 
-        for (u, v) in edges:
-            self.links[u][1].add(v)
-            self.links[v][0].add(u)
+    # The first position of the items of every key in keys, sorted, and the end of the last one.
+    @staticmethod
+    def startsOf(keys: list[int], count: int) -> array:
+        starts = array("i", bytes(array("i").itemsize * (count + 1)))
+        for key in keys:
+            starts[key + 1] += 1
+        for i in range(count):
+            starts[i + 1] += starts[i]
+        return starts
 
     def getBlock(self, id):
         return self.nodes[id]
 
     def getPrev(self, id):
-        return self.links[id][0]
+        return self.preds[self.predStart[id] : self.predStart[id + 1]]
 
     def getSucc(self, id):
-        return self.links[id][1]
+        return self.succs[self.succStart[id] : self.succStart[id + 1]]
 
     def getInDegree(self, id):
-        return len(self.links[id][0])
+        return self.predStart[id + 1] - self.predStart[id]
 
     def getOutDegree(self, id):
-        return len(self.links[id][1])
+        return self.succStart[id + 1] - self.succStart[id]
 
     def iterator(self):
         return iter(self.nodes)
+
+    def reversePostorder(self) -> list[int]:
+        if self._reversePostorder is not None:
+            return self._reversePostorder
+        succStart, succs = self.succStart, self.succs
+        order = []
+        entry: list[int] = []
+        visited = bytearray(len(self.nodes))
+        for root in range(len(self.nodes)):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            # Iterative, as functions may have more blocks than the recursion limit.
+            stack = [(root, succStart[root])]
+            while stack:
+                node, next = stack[-1]
+                end = succStart[node + 1]
+                while next < end and visited[succs[next]]:
+                    next += 1
+                if next < end:
+                    succ = succs[next]
+                    visited[succ] = 1
+                    stack[-1] = (node, next + 1)
+                    stack.append((succ, succStart[succ]))
+                else:
+                    stack.pop()
+                    order.append(node)
+            if root == 0:
+                entry = order
+                order = []
+        # The unreachable blocks are ordered after the reachable ones.
+        self._reversePostorder = entry[::-1] + order[::-1]
+        self._order = array("i", [-1]) * len(self.nodes)
+        for position, id in enumerate(entry[::-1]):
+            self._order[id] = position
+        return self._reversePostorder
+
+    def isReachable(self, id: int) -> bool:
+        self.reversePostorder()
+        return self._order[id] >= 0  # type: ignore
+
+    def computeDominators(self) -> None:
+        if self._idom is not None:
+            return
+        self.reversePostorder()
+        # Lists, faster to index than arrays.
+        order = self._order.tolist()  # type: ignore
+        count = len(self.nodes)
+        idom = [-1] * count
+        if count:
+            idom[0] = 0
+        reachable = [id for id in self._reversePostorder if order[id] >= 0]  # type: ignore
+        predStart, preds = self.predStart.tolist(), self.preds.tolist()
+
+        changed = True
+        while changed:
+            changed = False
+            for id in reachable[1:]:
+                new = -1
+                for k in range(predStart[id], predStart[id + 1]):
+                    pred = preds[k]
+                    if idom[pred] < 0:
+                        # Not processed yet, or unreachable.
+                        continue
+                    if new < 0:
+                        new = pred
+                        continue
+                    # Intersect: walk up the dominator tree from both, to their nearest common dominator.
+                    other = pred
+                    while new != other:
+                        while order[new] > order[other]:
+                            new = idom[new]
+                        while order[other] > order[new]:
+                            other = idom[other]
+                if idom[id] != new:
+                    idom[id] = new
+                    changed = True
+        self._idom = array("i", idom)
+
+        # The dominator tree, with its children in reverse postorder.
+        children = [idom[id] for id in reachable[1:]]
+        self._domStart = self.startsOf(children, count)
+        self._domChildren = array("i", bytes(self._idom.itemsize * len(children)))
+        position = array("i", self._domStart[:count])
+        for id in reachable[1:]:
+            parent = idom[id]
+            self._domChildren[position[parent]] = id
+            position[parent] += 1
+
+        self._domPre = array("i", [-1]) * count
+        self._domPost = array("i", [-1]) * count
+        if not count:
+            return
+        pre = post = 0
+        self._domPre[0] = pre
+        stack = [(0, self._domStart[0])]
+        while stack:
+            node, next = stack[-1]
+            if next < self._domStart[node + 1]:
+                child = self._domChildren[next]
+                stack[-1] = (node, next + 1)
+                pre += 1
+                self._domPre[child] = pre
+                stack.append((child, self._domStart[child]))
+            else:
+                stack.pop()
+                self._domPost[node] = post
+                post += 1
+
+    # The immediate dominator of a block, None for the entry block and the unreachable ones.
+    def getIdom(self, id: int) -> Optional[int]:
+        self.computeDominators()
+        if id == 0 or self._idom[id] < 0:  # type: ignore
+            return None
+        return self._idom[id]  # type: ignore
+
+    # The blocks a block immediately dominates: its children in the dominator tree.
+    def getDomChildren(self, id: int):
+        self.computeDominators()
+        return self._domChildren[self._domStart[id] : self._domStart[id + 1]]
+
+    # Whether every path from the entry block to block b goes through block a.
+    def dominates(self, a: int, b: int) -> bool:
+        self.computeDominators()
+        pre, post = self._domPre, self._domPost
+        return pre[b] >= 0 and pre[a] <= pre[b] and post[b] <= post[a]
+
+    def computeLoops(self) -> None:
+        if self._loops is not None:
+            return
+        self.computeDominators()
+        count = len(self.nodes)
+        order = self._order.tolist()  # type: ignore
+        predStart, preds = self.predStart.tolist(), self.preds.tolist()
+        pre, post = self._domPre.tolist(), self._domPost.tolist()
+        loopOf: list[Optional[Loop]] = [None] * count
+        loops: list[Loop] = []
+
+        # The headers in postorder of the dominator tree: a loop is found before the loops it is nested in,
+        # whose headers dominate its header.
+        headers = [0] * (count - order.count(-1))
+        for id in range(count):
+            if post[id] >= 0:
+                headers[post[id]] = id
+        for header in headers:
+            # The predecessors header dominates.
+            latches = [
+                preds[k]
+                for k in range(predStart[header], predStart[header + 1])
+                if pre[preds[k]] >= pre[header] and post[preds[k]] <= post[header]
+            ]
+            if not latches:
+                continue
+            loop = Loop(header, latches)
+            loops.append(loop)
+            loopOf[header] = loop
+            # Walk back from the latches to the header. A block of a loop found before belongs to a nested loop:
+            # its outermost loop found so far is nested in this one, and the walk goes on from its header.
+            stack = list(latches)
+            while stack:
+                id = stack.pop()
+                inner = loopOf[id]
+                if inner is None:
+                    loopOf[id] = loop
+                else:
+                    while inner.parent is not None:
+                        inner = inner.parent
+                    if inner is loop:
+                        continue
+                    inner.parent = loop
+                    loop.children.append(inner)
+                    id = inner.header
+                for k in range(predStart[id], predStart[id + 1]):
+                    if order[preds[k]] >= 0:
+                        stack.append(preds[k])
+
+        # A loop is nested in a loop whose header dominates its header, thus comes after it in reverse postorder.
+        loops.sort(key=lambda loop: order[loop.header])
+        for loop in loops:
+            if loop.parent is not None:
+                loop.depth = loop.parent.depth + 1
+            loop.children.sort(key=lambda child: order[child.header])
+
+        self._loopDepth = array("i", bytes(array("i").itemsize * count))
+        for id in range(count):
+            loop = loopOf[id]
+            if loop is not None:
+                self._loopDepth[id] = loop.depth
+            while loop is not None:
+                loop.blocks.append(id)
+                loop = loop.parent
+        self._loopOf = loopOf
+        self._loops = loops
+
+    # The natural loops, outer ones before the ones nested in them.
+    def loops(self) -> list[Loop]:
+        self.computeLoops()
+        return self._loops  # type: ignore
+
+    # The innermost loop a block is in, if any.
+    def getLoop(self, id: int) -> Optional[Loop]:
+        self.computeLoops()
+        return self._loopOf[id]
+
+    # The number of loops a block is in.
+    def getLoopDepth(self, id: int) -> int:
+        self.computeLoops()
+        return self._loopDepth[id]
@@ -7,6 +7,9 @@ from .cfg import CFG
 
 """
 CFGBuilder: from the sequence of instrs to build a control flow graph
+
+The locs of a basicblock are gathered in a list of its own, which the basicblock keeps,
+and the target of a jump is looked up once in labelsToBBs.
 """
 
 
@@ -49,13 +52,9 @@ class CFGBuilder:
             now += 1
 
             if bb.kind is BlockKind.END_BY_JUMP:
-                if self.labelsToBBs.get(bb.getLastInstr().label) is None:
-                    raise NullPointerException
-                edges.append((bb.id, self.labelsToBBs.get(bb.getLastInstr().label)))
+                edges.append((bb.id, self.target(bb)))
             elif bb.kind is BlockKind.END_BY_COND_JUMP:
-                if self.labelsToBBs.get(bb.getLastInstr().label) is None:
-                    raise NullPointerException
-                edges.append((bb.id, self.labelsToBBs.get(bb.getLastInstr().label)))
+                edges.append((bb.id, self.target(bb)))
                 if now < len(self.bbs) - 1:
                     edges.append((bb.id, bb.id + 1))
             elif bb.kind is BlockKind.END_BY_RETURN:
@@ -65,9 +64,16 @@ class CFGBuilder:
                     edges.append((bb.id, bb.id + 1))
         return CFG(self.bbs, edges)
 
+    # The id of the basicblock the last instr of bb jumps to.
+    def target(self, bb: BasicBlock) -> int:
+        id = self.labelsToBBs.get(bb.getLastInstr().label)
+        if id is None:
+            raise NullPointerException
+        return id
+
     def save(self, bb: BasicBlock):
         self.bbs.append(bb)
-        self.buf.clear()
+        self.buf = []
         self.currentBBLabel = None
 
         if bb.label is not None:
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from enum import Enum, auto, unique
+from heapq import heappop, heappush
+from typing import Generic, NamedTuple, Optional, TypeVar
+
+from backend.dataflow.basicblock import BasicBlock
+from backend.dataflow.cfg import CFG
+from backend.dataflow.loc import Loc
+
+"""
+A framework of dataflow analyses over the CFG of a function.
+
+DataflowProblem: what an analysis computes
+    direction: whether values flow from the entry to the exits (FORWARD) or the other way (BACKWARD)
+     boundary: the value at the entry (FORWARD), or at the exits (BACKWARD)
+      initial: the value every block starts from, the top of the lattice
+         meet: how the values of the predecessors (FORWARD), or of the successors (BACKWARD), are combined
+     transfer: the value after a block (in the direction of the analysis), given the value before it
+  transferLoc: the same for an instr
+    locValues: the values of the instrs of a block, with transferLoc unless a problem has a faster way
+Values are never modified in place, a transfer or a meet returns a new one.
+
+BitVectorProblem: a problem whose values are sets numbered densely, as ints used as bit vectors,
+with a transfer of the form gen | (value & ~kill), and a union or an intersection as meet.
+The gen and kill sets of a block can be summarized from the ones of its instrs (locGenKill).
+See backend.dataflow.problems for liveness, reaching definitions and available expressions.
+
+DataflowAnalyzer solves a problem over a CFG with a priority worklist, in sweeps in reverse postorder (FORWARD)
+or in postorder (BACKWARD): the block taken is the first queued one of the current sweep in that order,
+so that a block is mostly visited after the blocks it depends on. The result has the values at the start
+and at the end of every block, and computes the ones of the instrs on demand, a block at a time.
+"""
+
+T = TypeVar("T")
+
+
+@unique
+class Direction(Enum):
+    FORWARD = auto()
+    BACKWARD = auto()
+
+
+class DataflowProblem(ABC, Generic[T]):
+    direction: Direction
+
+    # Prepare the information of the blocks of graph, before it is solved.
+    def prepare(self, graph: CFG) -> None:
+        pass
+
+    @abstractmethod
+    def boundary(self) -> T:
+        raise NotImplementedError
+
+    @abstractmethod
+    def initial(self) -> T:
+        raise NotImplementedError
+
+    @abstractmethod
+    def meet(self, a: T, b: T) -> T:
+        raise NotImplementedError
+
+    @abstractmethod
+    def transfer(self, bb: BasicBlock, value: T) -> T:
+        raise NotImplementedError
+
+    @abstractmethod
+    def transferLoc(self, loc: Loc, value: T) -> T:
+        raise NotImplementedError
+
+    # The value before every instr of bb, followed by the value at the end of bb,
+    # given the value at its start (FORWARD) or at its end (BACKWARD).
+    def locValues(self, bb: BasicBlock, value: T) -> list[T]:
+        values = [value]
+        if self.direction is Direction.FORWARD:
+            for loc in bb.iterator():
+                value = self.transferLoc(loc, value)
+                values.append(value)
+        else:
+            for loc in bb.backwardIterator():
+                value = self.transferLoc(loc, value)
+                values.append(value)
+            values.reverse()
+        return values
+
+
+class BitVectorProblem(DataflowProblem[int]):
+    # Whether the meet is a union (may problems) or an intersection (must problems).
+    union: bool = True
+
+    def __init__(self) -> None:
+        # The size of the sets, and gen and kill of every block, by id: set by prepare.
+        self.size = 0
+        self.gen: list[int] = []
+        self.kill: list[int] = []
+
+    def universe(self) -> int:
+        return (1 << self.size) - 1
+
+    def boundary(self) -> int:
+        return 0
+
+    def initial(self) -> int:
+        return 0 if self.union else self.universe()
+
+    def meet(self, a: int, b: int) -> int:
+        return a | b if self.union else a & b
+
+    def transfer(self, bb: BasicBlock, value: int) -> int:
+        return self.gen[bb.id] | (value & ~self.kill[bb.id])
+
+    # The gen and kill sets of an instr.
+    @abstractmethod
+    def locGenKill(self, loc: Loc) -> tuple[int, int]:
+        raise NotImplementedError
+
+    def transferLoc(self, loc: Loc, value: int) -> int:
+        gen, kill = self.locGenKill(loc)
+        return gen | (value & ~kill)
+
+    # Compute gen and kill of every block from the ones of its instrs, in the direction of the problem.
+    def summarize(self, graph: CFG) -> None:
+        forward = self.direction is Direction.FORWARD
+        self.gen = []
+        self.kill = []
+        for bb in graph.nodes:
+            gen = kill = 0
+            for loc in bb.iterator() if forward else bb.backwardIterator():
+                locGen, locKill = self.locGenKill(loc)
+                gen = locGen | (gen & ~locKill)
+                kill |= locKill
+            self.gen.append(gen)
+            self.kill.append(kill)
+
+
+class DataflowStats(NamedTuple):
+    blocks: int
+    # The number of blocks taken from the worklist, and the number of times the value of a block changed.
+    visits: int
+    changes: int
+    # The most times a block was visited.
+    maxVisits: int
+
+
+class DataflowResult(Generic[T]):
+    def __init__(
+        self,
+        problem: DataflowProblem[T],
+        blockIn: list[T],
+        blockOut: list[T],
+        stats: DataflowStats,
+    ) -> None:
+        self.problem = problem
+        # The values at the start and at the end of every block, by id, whatever the direction.
+        self.blockIn = blockIn
+        self.blockOut = blockOut
+        self.stats = stats
+
+        self._block: Optional[BasicBlock] = None
+        self._locValues: list[T] = []
+
+    # The value before every instr of bb, followed by the value at the end of bb.
+    # The values of the last block asked for are kept.
+    def locValues(self, bb: BasicBlock) -> list[T]:
+        if self._block is bb:
+            return self._locValues
+        if self.problem.direction is Direction.FORWARD:
+            values = self.problem.locValues(bb, self.blockIn[bb.id])
+        else:
+            values = self.problem.locValues(bb, self.blockOut[bb.id])
+        self._block = bb
+        self._locValues = values
+        return values
+
+
+class DataflowAnalyzer(Generic[T]):
+    def __init__(self, problem: DataflowProblem[T]) -> None:
+        self.problem = problem
+
+    def accept(self, graph: CFG) -> DataflowResult[T]:
+        problem = self.problem
+        problem.prepare(graph)
+        count = len(graph.nodes)
+        forward = problem.direction is Direction.FORWARD
+
+        # The blocks the value of a block is computed from, and the blocks it flows to, as adjacency arrays.
+        if forward:
+            sourceStart, sources = graph.predStart, graph.preds
+            targetStart, targets = graph.succStart, graph.succs
+            order = graph.reversePostorder()
+        else:
+            sourceStart, sources = graph.succStart, graph.succs
+            targetStart, targets = graph.predStart, graph.preds
+            order = graph.reversePostorder()[::-1]
+
+        # before: the values on the side values come from, after: on the side they flow to.
+        initial = problem.initial()
+        before = [initial] * count
+        after = [initial] * count
+        boundary = problem.boundary()
+        meet = problem.meet
+        transfer = problem.transfer
+        nodes = graph.nodes
+
+        # The worklist is a heap of the queued blocks, keyed by sweep, then by position in the order:
+        # a block queued by one after it in the order (along a back edge) waits for the next sweep,
+        # so that the changes coming back to it are propagated together.
+        position = [0] * count
+        for i, id in enumerate(order):
+            position[id] = i
+        visits = changes = 0
+        visited = [0] * count
+        worklist = list(range(count))
+        queued = [True] * count
+        while worklist:
+            sweep, at = divmod(heappop(worklist), count)
+            id = order[at]
+            queued[id] = False
+            visits += 1
+            visited[id] += 1
+
+            first, end = sourceStart[id], sourceStart[id + 1]
+            if first < end:
+                value = after[sources[first]]
+                for k in range(first + 1, end):
+                    value = meet(value, after[sources[k]])
+                if forward and id == 0:
+                    value = meet(value, boundary)
+            elif forward and id != 0:
+                # Unreachable.
+                value = initial
+            else:
+                value = boundary
+            before[id] = value
+
+            value = transfer(nodes[id], value)
+            if value != after[id]:
+                after[id] = value
+                changes += 1
+                for target in targets[targetStart[id] : targetStart[id + 1]]:
+                    if not queued[target]:
+                        queued[target] = True
+                        later = position[target]
+                        heappush(
+                            worklist,
+                            (sweep if later > at else sweep + 1) * count + later,
+                        )
+
+        stats = DataflowStats(count, visits, changes, max(visited, default=0))
+        if forward:
+            return DataflowResult(problem, before, after, stats)
+        return DataflowResult(problem, after, before, stats)
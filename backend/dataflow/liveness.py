@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from collections.abc import Set
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+if TYPE_CHECKING:
+    from backend.dataflow.basicblock import BasicBlock
+    from backend.dataflow.framework import DataflowResult
+    from backend.dataflow.problems import LivenessProblem
+
+"""
+Liveness: the result of the liveness analysis of a function, see LivenessAnalyzer
+
+  problem: the LivenessProblem solved, which has the temps live across basicblocks, numbered densely:
+           temps[i] is the index of the temp numbered i, and numbering the number of each of these temps, by index,
+           and liveUse (gen) of every basicblock, by id
+   result: the DataflowResult of the problem, which has liveIn (blockIn) and liveOut (blockOut) of every basicblock
+
+A set of temps is an int used as a bit vector: bit i is set if the temp numbered i is in the set.
+Only the temps read in a basicblock before they are written in it can be live across basicblocks,
+so the others are left out of the sets of the basicblocks (and of kill), which keeps the bit vectors short.
+
+The sets of the instrs are computed on demand by locLiveness, one basicblock at a time, which keeps the sets
+of the last basicblock it computed. The other temps of the basicblock are numbered after the ones live across
+basicblocks, see BlockNumbering.
+"""
+
+
+class Liveness:
+    def __init__(self, problem: LivenessProblem, result: DataflowResult[int]) -> None:
+        self.problem = problem
+        self.result = result
+        self.temps = problem.temps
+        self.numbering = problem.numbering
+        self.liveUse = problem.gen
+        self.liveIn = result.blockIn
+        self.liveOut = result.blockOut
+
+        self._block: Optional[BasicBlock] = None
+        self._locLiveness: Optional[LocLiveness] = None
+
+    def liveSet(self, bits: int) -> LiveSet:
+        return LiveSet(bits, self.temps, self.numbering)
+
+    def locLiveness(self, bb: BasicBlock) -> LocLiveness:
+        if self._block is not bb:
+            sets = self.result.locValues(bb)
+            self._locLiveness = LocLiveness(sets, self.problem.blockNumbering(bb))
+            self._block = bb
+        return self._locLiveness  # type: ignore
+
+
+# The sets of the instrs of a basicblock: sets[i] is the live-in set of its i-th instr, and the last one its live-out set.
+class LocLiveness:
+    def __init__(self, sets: list[int], numbering: BlockNumbering) -> None:
+        self.sets = sets
+        self.numbering = numbering
+
+    def liveSet(self, i: int) -> LiveSet:
+        return LiveSet(self.sets[i], self.numbering, self.numbering)
+
+
+# The numbering of the temps of a basicblock: the temps live across basicblocks keep their numbers,
+# and the others are numbered after them, as they are met.
+# It maps a temp to its number (get), and a number to its temp (indexing).
+class BlockNumbering:
+    __slots__ = ("temps", "numbering", "localTemps", "localNumbering")
+
+    def __init__(self, temps: list[int], numbering: dict[int, int]) -> None:
+        self.temps = temps
+        self.numbering = numbering
+        self.localTemps: list[int] = []
+        self.localNumbering: dict[int, int] = {}
+
+    def get(self, temp: int) -> Optional[int]:
+        number = self.numbering.get(temp)
+        if number is None:
+            number = self.localNumbering.get(temp)
+        return number
+
+    def number(self, temp: int) -> int:
+        number = self.numbering.get(temp)
+        if number is None:
+            number = self.localNumbering.get(temp)
+            if number is None:
+                number = len(self.temps) + len(self.localTemps)
+                self.localNumbering[temp] = number
+                self.localTemps.append(temp)
+        return number
+
+    def __getitem__(self, number: int) -> int:
+        if number < len(self.temps):
+            return self.temps[number]
+        return self.localTemps[number - len(self.temps)]
+
+
+# A read-only set of temp indexes, viewing a bit vector.
+class LiveSet(Set):
+    __slots__ = ("bits", "temps", "numbering")
+
+    def __init__(
+        self,
+        bits: int,
+        temps: Union[list[int], BlockNumbering],
+        numbering: Union[dict[int, int], BlockNumbering],
+    ) -> None:
+        self.bits = bits
+        self.temps = temps
+        self.numbering = numbering
+
+    def __contains__(self, temp: object) -> bool:
+        number = self.numbering.get(temp)  # type: ignore
+        return number is not None and (self.bits >> number) & 1 == 1
+
+    # In ascending order, as the register allocator emits the stores of the live-out temps in the order it meets them.
+    def __iter__(self) -> Iterator[int]:
+        temps = self.temps
+        bits = self.bits
+        members = []
+        while bits:
+            low = bits & -bits
+            members.append(temps[low.bit_length() - 1])
+            bits ^= low
+        members.sort()
+        return iter(members)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __repr__(self) -> str:
+        return "{" + ", ".join(map(str, self)) + "}"
@@ -1,60 +1,63 @@
-from backend.dataflow.basicblock import BasicBlock
+from typing import Optional
+
 from backend.dataflow.cfg import CFG
-from utils.tac.temp import Temp
+from backend.dataflow.framework import DataflowAnalyzer, DataflowStats
+from backend.dataflow.liveness import Liveness
+from backend.dataflow.problems import LivenessProblem
 
 """
 LivenessAnalyzer: do the liveness analysis according to the CFG
+
+The analysis is a LivenessProblem solved by the dataflow framework, see backend.dataflow.framework:
+the temps live across basicblocks are numbered densely per function, and the sets of temps are bit vectors,
+see Liveness. The blocks are iterated from a worklist, first in postorder: liveness flows backwards,
+so the successors of a block are then mostly analyzed before it.
+Only the sets of the blocks are computed here, the ones of the instrs are computed from them when needed.
 """
 
 
 class LivenessAnalyzer:
     def __init__(self) -> None:
-        pass
+        self.graph: CFG = CFG([], [])
+        # The convergence statistics of the last `accept`.
+        self.stats = DataflowStats(0, 0, 0, 0)
+        self.liveness: Optional[Liveness] = None
+        self._liveIns: Optional[int] = None
+
+    # The number of blocks taken from the worklist by the last `accept`.
+    @property
+    def visits(self) -> int:
+        return self.stats.visits
+
+    # The number of instructions analyzed by the last `accept`.
+    @property
+    def locs(self) -> int:
+        return sum(len(bb.locs) for bb in self.graph.nodes)
+
+    # The total size of the live-in sets of the instructions analyzed by the last `accept`,
+    # counted once, from the live-out set of every block.
+    @property
+    def liveIns(self) -> int:
+        if self._liveIns is None:
+            liveness = self.liveness
+            self._liveIns = (
+                0
+                if liveness is None
+                else sum(
+                    liveness.problem.countLiveIns(bb, liveness.liveOut[bb.id])
+                    for bb in self.graph.nodes
+                )
+            )
+        return self._liveIns
 
     def accept(self, graph: CFG):
-        for bb in graph.nodes:
-            self.computeDefAndLiveUseFor(bb)
-            bb.liveIn = set()
-            bb.liveIn.update(bb.liveUse)
-            bb.liveOut = set()
-
-        changed = True
-        while changed:
-            changed = False
-            for bb in graph.nodes:
-                for next in graph.getSucc(bb.id):
-                    bb.liveOut.update(graph.getBlock(next).liveIn)
-
-                liveOut = bb.liveOut.copy()
-                for v in bb.define:
-                    liveOut.discard(v)
-
-                before = len(bb.liveIn)
-                bb.liveIn.update(liveOut)
-                after = len(bb.liveIn)
-
-                if before != after:
-                    changed = True
+        self.graph = graph
+        problem = LivenessProblem()
+        result = DataflowAnalyzer(problem).accept(graph)
+        self.stats = result.stats
 
+        liveness = Liveness(problem, result)
         for bb in graph.nodes:
-            self.analyzeLivenessForEachLocIn(bb)
-
-    def computeDefAndLiveUseFor(self, bb: BasicBlock):
-        bb.define = set()
-        bb.liveUse = set()
-        for loc in bb.iterator():
-            for read in loc.instr.getRead():
-                if not read in bb.define:
-                    bb.liveUse.add(read)
-            bb.define.update(loc.instr.getWritten())
-
-    def analyzeLivenessForEachLocIn(self, bb: BasicBlock):
-        liveOut = bb.liveOut.copy()
-        for loc in bb.backwardIterator():
-            loc.liveOut = liveOut.copy()
-
-            for v in loc.instr.getWritten():
-                liveOut.discard(v)
-
-            liveOut.update(loc.instr.getRead())
-            loc.liveIn = liveOut.copy()
+            bb.liveness = liveness
+        self.liveness = liveness
+        self._liveIns = None
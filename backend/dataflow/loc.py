@@ -1,12 +1,38 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
 from utils.tac.tacinstr import TACInstr
 
+if TYPE_CHECKING:
+    from backend.dataflow.basicblock import BasicBlock
+    from backend.dataflow.liveness import LiveSet
+
 """
 Loc: line of code
+
+ block: the basicblock it is in, and index: its position in it
+liveIn: the active temps before the instr
+liveOut: the active temps after the instr
+
+liveIn and liveOut are computed on demand from the liveness of the block, see `Liveness.locLiveness`.
 """
 
 
 class Loc:
+    __slots__ = ("instr", "block", "index")
+
     def __init__(self, instr: TACInstr) -> None:
         self.instr = instr
-        self.liveIn: set[int] = set()
-        self.liveOut: set[int] = set()
+        self.block: Optional[BasicBlock] = None
+        self.index = 0
+
+    @property
+    def liveIn(self) -> LiveSet:
+        assert self.block is not None
+        return self.block.locLiveness().liveSet(self.index)
+
+    @property
+    def liveOut(self) -> LiveSet:
+        assert self.block is not None
+        return self.block.locLiveness().liveSet(self.index + 1)
@@ -0,0 +1,243 @@
+from typing import NamedTuple, Optional
+
+from backend.dataflow.basicblock import BasicBlock
+from backend.dataflow.cfg import CFG
+from backend.dataflow.framework import BitVectorProblem, Direction
+from backend.dataflow.liveness import BlockNumbering
+from backend.dataflow.loc import Loc
+from utils.tac.tacinstr import InstrKind
+
+"""
+The dataflow problems of the framework, all of them on bit vectors, see backend.dataflow.framework
+
+LivenessProblem: the temps which may be read before they are written, backward
+ReachingDefinitions: the definitions (an instr and a temp it writes) which may reach an instr without being overwritten, forward
+AvailableExpressions: the expressions computed on every path to an instr, with none of their operands written since, forward
+"""
+
+
+class LivenessProblem(BitVectorProblem):
+    direction = Direction.BACKWARD
+    union = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The temps live across blocks, numbered densely, see Liveness.
+        self.temps: list[int] = []
+        self.numbering: dict[int, int] = {}
+
+        self._block: Optional[BasicBlock] = None
+        self._blockNumbering = BlockNumbering([], {})
+
+    def prepare(self, graph: CFG) -> None:
+        uses: list[list[int]] = []
+        defines: list[set[int]] = []
+        for bb in graph.nodes:
+            use, define = self.useAndDefine(bb)
+            uses.append(use)
+            defines.append(define)
+
+        # Only the temps in some liveUse can be live across blocks.
+        self.temps = []
+        self.numbering = {}
+        for use in uses:
+            for v in use:
+                if v not in self.numbering:
+                    self.numbering[v] = len(self.temps)
+                    self.temps.append(v)
+        self.size = len(self.temps)
+        self._block = None
+
+        numbering = self.numbering
+
+        def bits(vs) -> int:
+            result = 0
+            for v in vs:
+                number = numbering.get(v)
+                if number is not None:
+                    result |= 1 << number
+            return result
+
+        self.gen = [bits(use) for use in uses]
+        self.kill = [bits(define) for define in defines]
+
+    # The temps read in bb before they are written in it, in order, and the temps written in it.
+    @staticmethod
+    def useAndDefine(bb: BasicBlock) -> tuple[list[int], set[int]]:
+        define: set[int] = set()
+        liveUse: list[int] = []
+        used: set[int] = set()
+        for loc in bb.iterator():
+            for read in loc.instr.getRead():
+                if not read in define and not read in used:
+                    used.add(read)
+                    liveUse.append(read)
+            define.update(loc.instr.getWritten())
+        return liveUse, define
+
+    # On the temps live across blocks only: the others are numbered per block (see blockNumbering),
+    # and are never in the values at the boundaries of the blocks, which summarize computes gen and kill for.
+    def locGenKill(self, loc: Loc) -> tuple[int, int]:
+        numbering = self.numbering
+        gen = kill = 0
+        for v in loc.instr.getWritten():
+            number = numbering.get(v)
+            if number is not None:
+                kill |= 1 << number
+        for v in loc.instr.getRead():
+            number = numbering.get(v)
+            if number is not None:
+                gen |= 1 << number
+        return gen, kill
+
+    # The numbering of the temps of bb, in the order locValues meets them, kept for the last block asked for.
+    def blockNumbering(self, bb: BasicBlock) -> BlockNumbering:
+        if self._block is not bb:
+            self.locValues(bb, 0)
+        return self._blockNumbering
+
+    def transferLoc(self, loc: Loc, value: int) -> int:
+        assert loc.block is not None
+        numbering = self.blockNumbering(loc.block)
+        for v in loc.instr.getWritten():
+            value &= ~(1 << numbering.number(v))
+        for v in loc.instr.getRead():
+            value |= 1 << numbering.number(v)
+        return value
+
+    # The total size of the live-in sets of the instrs of bb, given its live-out set, computed as locValues does
+    # without keeping the sets, nor the numbering of the temps of bb.
+    def countLiveIns(self, bb: BasicBlock, value: int) -> int:
+        number = BlockNumbering(self.temps, self.numbering).number
+        count = 0
+        for loc in bb.backwardIterator():
+            instr = loc.instr
+            for v in instr.getWritten():
+                value &= ~(1 << number(v))
+            for v in instr.getRead():
+                value |= 1 << number(v)
+            count += value.bit_count()
+        return count
+
+    # Number the temps of bb as the values are computed.
+    def locValues(self, bb: BasicBlock, value: int) -> list[int]:
+        numbering = BlockNumbering(self.temps, self.numbering)
+        number = numbering.number
+        values = [value]
+        for loc in bb.backwardIterator():
+            instr = loc.instr
+            for v in instr.getWritten():
+                value &= ~(1 << number(v))
+            for v in instr.getRead():
+                value |= 1 << number(v)
+            values.append(value)
+        values.reverse()
+        self._block = bb
+        self._blockNumbering = numbering
+        return values
+
+
+class ReachingDefinitions(BitVectorProblem):
+    direction = Direction.FORWARD
+    union = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The definitions, numbered densely: an instr and a temp it writes.
+        self.definitions: list[tuple[Loc, int]] = []
+        # The number of the first definition of every instr which writes temps.
+        self.first: dict[Loc, int] = {}
+        # The definitions of every temp.
+        self.byTemp: dict[int, int] = {}
+
+    def prepare(self, graph: CFG) -> None:
+        self.definitions = []
+        self.first = {}
+        self.byTemp = {}
+        for bb in graph.nodes:
+            for loc in bb.iterator():
+                written = loc.instr.getWritten()
+                if written:
+                    self.first[loc] = len(self.definitions)
+                    for v in written:
+                        self.byTemp[v] = self.byTemp.get(v, 0) | (
+                            1 << len(self.definitions)
+                        )
+                        self.definitions.append((loc, v))
+        self.size = len(self.definitions)
+        self.summarize(graph)
+
+    def locGenKill(self, loc: Loc) -> tuple[int, int]:
+        gen = kill = 0
+        first = self.first.get(loc)
+        if first is not None:
+            for i, v in enumerate(loc.instr.getWritten()):
+                gen = (gen & ~self.byTemp[v]) | (1 << (first + i))
+                kill |= self.byTemp[v]
+        return gen, kill
+
+    def definitionsOf(self, bits: int) -> list[tuple[Loc, int]]:
+        return [self.definitions[i] for i in range(self.size) if (bits >> i) & 1]
+
+
+class Expression(NamedTuple):
+    kind: str
+    op: str
+    srcs: tuple[int, ...]
+
+    def __str__(self) -> str:
+        return "{} {}".format(self.op, ", ".join(f"_T{src}" for src in self.srcs))
+
+
+class AvailableExpressions(BitVectorProblem):
+    direction = Direction.FORWARD
+    union = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        # The expressions computed in the function, numbered densely.
+        self.expressions: list[Expression] = []
+        self.numbering: dict[Expression, int] = {}
+        # The expressions which read every temp.
+        self.reading: dict[int, int] = {}
+
+    # The expression computed by instr, if it computes one: a sequential instr with an op, writing a single temp.
+    @staticmethod
+    def expressionOf(loc: Loc) -> Optional[Expression]:
+        instr = loc.instr
+        op = getattr(instr, "op", None)
+        if (
+            op is None
+            or instr.kind is not InstrKind.SEQ
+            or len(instr.dsts) != 1
+            or not instr.srcs
+        ):
+            return None
+        return Expression(type(instr).__name__, op, tuple(instr.getRead()))
+
+    def prepare(self, graph: CFG) -> None:
+        self.expressions = []
+        self.numbering = {}
+        self.reading = {}
+        for bb in graph.nodes:
+            for loc in bb.iterator():
+                expression = self.expressionOf(loc)
+                if expression is not None and expression not in self.numbering:
+                    number = self.numbering[expression] = len(self.expressions)
+                    self.expressions.append(expression)
+                    for v in expression.srcs:
+                        self.reading[v] = self.reading.get(v, 0) | (1 << number)
+        self.size = len(self.expressions)
+        self.summarize(graph)
+
+    def locGenKill(self, loc: Loc) -> tuple[int, int]:
+        kill = 0
+        for v in loc.instr.getWritten():
+            kill |= self.reading.get(v, 0)
+        expression = self.expressionOf(loc)
+        if expression is None:
+            return 0, kill
+        return (1 << self.numbering[expression]) & ~kill, kill
+
+    def expressionsOf(self, bits: int) -> list[Expression]:
+        return [self.expressions[i] for i in range(self.size) if (bits >> i) & 1]
@@ -32,10 +32,17 @@ class BruteRegAlloc(RegAlloc):
     def __init__(self, emitter: RiscvAsmEmitter) -> None:
         super().__init__(emitter)
         self.bindings = {}
+        # Counters of the last function allocated: the spills and the reloads issued by `allocRegFor`,
+        # and the size of the stack frame.
+        self.spills = 0
+        self.reloads = 0
+        self.frameSize = 0
         for reg in emitter.allocatableRegs:
             reg.used = False
 
     def accept(self, graph: CFG, info: SubroutineInfo) -> None:
+        self.spills = 0
+        self.reloads = 0
         subEmitter = self.emitter.emitSubroutine(info)
         for bb in graph.iterator():
             # you need to think more here
@@ -44,6 +51,7 @@ class BruteRegAlloc(RegAlloc):
                 subEmitter.emitLabel(bb.label)
             self.localAlloc(bb, subEmitter)
         subEmitter.emitEnd()
+        self.frameSize = subEmitter.nextLocalOffset
 
     def bind(self, temp: Temp, reg: Reg):
         reg.used = True
@@ -110,6 +118,7 @@ class BruteRegAlloc(RegAlloc):
                 )
                 if isRead:
                     subEmitter.emitLoadFromStack(reg, temp)
+                    self.reloads += 1
                 if reg.occupied:
                     self.unbind(reg.temp)
                 self.bind(temp, reg)
@@ -119,6 +128,7 @@ class BruteRegAlloc(RegAlloc):
             random.randint(0, len(self.emitter.allocatableRegs))
         ]
         subEmitter.emitStoreToStack(reg)
+        self.spills += 1
         subEmitter.emitComment("  spill {} ({})".format(str(reg), str(reg.temp)))
         self.unbind(reg.temp)
         self.bind(temp, reg)
@@ -127,4 +137,5 @@ class BruteRegAlloc(RegAlloc):
         )
         if isRead:
             subEmitter.emitLoadFromStack(reg, temp)
+            self.reloads += 1
         return reg
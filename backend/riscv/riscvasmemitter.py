@@ -1,4 +1,4 @@
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, TextIO, Tuple
 
 from backend.asmemitter import AsmEmitter
 from utils.error import IllegalArgumentException
@@ -22,8 +22,9 @@ class RiscvAsmEmitter(AsmEmitter):
         self,
         allocatableRegs: list[Reg],
         callerSaveRegs: list[Reg],
+        out: Optional[TextIO] = None,
     ) -> None:
-        super().__init__(allocatableRegs, callerSaveRegs)
+        super().__init__(allocatableRegs, callerSaveRegs, out)
 
     
         # the start of the asm code
@@ -50,7 +51,7 @@ class RiscvAsmEmitter(AsmEmitter):
     def emitSubroutine(self, info: SubroutineInfo):
         return RiscvSubroutineEmitter(self, info)
 
-    # return all the string stored in asmcodeprinter
+    # return all the string stored in asmcodeprinter, or an empty one if it was written to `out`
     def emitEnd(self):
         return self.printer.close()
 
@@ -188,3 +189,6 @@ class RiscvSubroutineEmitter(SubroutineEmitter):
 
         self.printer.printInstr(Riscv.NativeReturn())
         self.printer.println("")
+
+        # the function is complete, it can be written out
+        self.printer.flush()
@@ -0,0 +1,4 @@
+"""
+Benchmarks of the compiler itself.
+Run them from the project root, e.g. `python3 -m benchmarks.coldstart`.
+"""
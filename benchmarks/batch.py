@@ -0,0 +1,94 @@
+"""
+Batch compilation benchmark: compile a set of small generated programs to RISC-V,
+spawning one compiler process per file, in a single process with `main.py --inputs`,
+and across a pool of processes with `--jobs`. The outputs of all of them are checked to be identical.
+"""
+
+import argparse
+import filecmp
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.generate import nested
+from benchmarks.harness import timed
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def perProcess(inputs: list[str], outputDir: str) -> None:
+    for inputFile in inputs:
+        name = os.path.splitext(os.path.basename(inputFile))[0]
+        with open(os.path.join(outputDir, name + ".s"), "w") as f:
+            subprocess.run(
+                [sys.executable, "main.py", "--input", inputFile, "--riscv"],
+                cwd=ROOT_DIR,
+                stdout=f,
+                check=True,
+            )
+
+
+def batched(inputs: list[str], outputDir: str, jobs: int = 1) -> None:
+    subprocess.run(
+        [sys.executable, "main.py", "--riscv", "--output-dir", outputDir]
+        + ["--jobs", str(jobs), "--inputs"]
+        + inputs,
+        cwd=ROOT_DIR,
+        check=True,
+    )
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--files", type=int, default=100)
+    argparser.add_argument("--lines", type=int, default=30)
+    argparser.add_argument(
+        "--jobs",
+        type=int,
+        nargs="*",
+        default=sorted({2, 4, os.cpu_count() or 1} - {1}),
+        help="the numbers of processes to compile the batch with, besides one",
+    )
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = []
+        for seed in range(args.files):
+            inputFile = os.path.join(tmp, f"input{seed}.c")
+            with open(inputFile, "w") as f:
+                f.write(nested(args.lines, seed=seed))
+            inputs.append(inputFile)
+
+        separate = os.path.join(tmp, "separate")
+        os.makedirs(separate)
+
+        print(
+            f"input: {args.files} files of {args.lines} statements, {os.cpu_count()} CPUs"
+        )
+        runs = [("per process", perProcess, separate, {})]
+        for jobs in [1] + args.jobs:
+            title = "batch" if jobs == 1 else f"{jobs} jobs"
+            runs.append((title, batched, os.path.join(tmp, title), {"jobs": jobs}))
+
+        base, names = None, []
+        for title, run, outputDir, kwargs in runs:
+            elapsed, _ = timed(lambda: run(inputs, outputDir, **kwargs))
+            if base is None:
+                base = elapsed
+                names = sorted(os.listdir(outputDir))
+            else:
+                _, mismatch, errors = filecmp.cmpfiles(
+                    separate, outputDir, names, shallow=False
+                )
+                assert (
+                    not mismatch and not errors
+                ), f"outputs differ: {mismatch + errors}"
+            print(
+                f"{title:<12} {elapsed:8.3f} s   {elapsed / args.files * 1000:8.2f} ms/file"
+                f"   {base / elapsed:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
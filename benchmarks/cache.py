@@ -0,0 +1,67 @@
+"""
+Compilation cache benchmark: the time `main.py --riscv` takes on a small program with the cache disabled,
+on a miss (which also stores the output), and on a hit, which must not import the compiler.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.generate import nested
+from benchmarks.harness import report, timed
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env.pop("MINIDECAF_CACHE_DIR", None)
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT_DIR, env=env, capture_output=True, check=True
+    )
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--runs", type=int, default=20)
+    argparser.add_argument("--lines", type=int, default=10)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cacheDir = os.path.join(tmp, "cache")
+        inputs = []
+        for seed in range(args.runs):
+            inputFile = os.path.join(tmp, f"input{seed}.c")
+            with open(inputFile, "w") as f:
+                f.write(nested(args.lines, seed=seed))
+            inputs.append(inputFile)
+
+        times: dict[str, list[float]] = {"uncached": [], "miss": [], "hit": []}
+        for inputFile in inputs:
+            command = ["main.py", "--input", inputFile, "--riscv"]
+            for title, extra in (
+                ("uncached", []),
+                ("miss", ["--cache-dir", cacheDir]),
+                ("hit", ["--cache-dir", cacheDir]),
+            ):
+                elapsed, output = timed(lambda: run(*command, *extra).stdout)
+                times[title].append(elapsed)
+                if title == "uncached":
+                    expected = output
+                assert output == expected, f"{title}: the output differs"
+
+        imported = run(
+            "-X", "importtime", *command, "--cache-dir", cacheDir
+        ).stderr.decode()
+        assert "frontend" not in imported and "backend" not in imported
+
+        base = report("uncached", times["uncached"])
+        report("miss", times["miss"])
+        print(f"speedup: {base / report('hit', times['hit']):.2f}x")
+        print(run("main.py", "--cache-dir", cacheDir, "--cache-stats").stdout.decode())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+CFG benchmark: build the CFGs of functions with tens of thousands of blocks with `CFGBuilder`, into adjacency arrays,
+and with the builder and the `CFG` of sets they replaced, which copied the instructions of every block.
+The time and the `tracemalloc` peak of the construction are reported, then the time of the orders and of the analyses
+`CFG` computes lazily: reverse postorder, dominators and natural loops. Both graphs are checked to be identical.
+
+The functions are generated programs (`benchmarks.generate.program`), after instruction selection,
+and synthetic ones of nested loops (the generated programs only `break` out of their loops).
+"""
+
+import argparse
+import random
+from typing import Callable
+
+import main as driver
+from backend.dataflow.basicblock import BasicBlock, BlockKind
+from backend.dataflow.cfg import CFG
+from backend.dataflow.cfgbuilder import CFGBuilder
+from backend.dataflow.loc import Loc
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from benchmarks.generate import program
+from benchmarks.harness import timed, traced
+from benchmarks.liveness import ARGS
+from utils.label.blocklabel import BlockLabel
+from utils.label.funclabel import MAIN_LABEL
+from utils.riscv import Riscv
+from utils.tac.tacinstr import InstrKind, TACInstr
+from utils.tac.tacop import BinaryOp
+from utils.tac.temp import Temp
+
+
+class SetCFG:
+    "The CFG as it was: a pair of sets of predecessors and successors per block, and no order cached."
+
+    def __init__(self, nodes: list[BasicBlock], edges: list[tuple[int, int]]) -> None:
+        self.nodes = nodes
+        self.edges = edges
+        self.links: list[tuple[set[int], set[int]]] = []
+        for i in range(len(nodes)):
+            self.links.append((set(), set()))
+        for u, v in edges:
+            self.links[u][1].add(v)
+            self.links[v][0].add(u)
+
+    def getPrev(self, id):
+        return self.links[id][0]
+
+    def getSucc(self, id):
+        return self.links[id][1]
+
+    def reversePostorder(self) -> list[int]:
+        order = []
+        visited = [False] * len(self.nodes)
+        for root in range(len(self.nodes)):
+            if visited[root]:
+                continue
+            visited[root] = True
+            stack = [(root, iter(sorted(self.getSucc(root))))]
+            while stack:
+                node, succs = stack[-1]
+                for succ in succs:
+                    if not visited[succ]:
+                        visited[succ] = True
+                        stack.append((succ, iter(sorted(self.getSucc(succ)))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(node)
+            if root == 0:
+                entry = order
+                order = []
+        return entry[::-1] + order[::-1] if self.nodes else []
+
+
+def setCFG(seq: list[TACInstr]) -> SetCFG:
+    "`CFGBuilder.buildFrom` as it was: the buffer of instructions is copied into every block."
+    bbs: list[BasicBlock] = []
+    buf: list[Loc] = []
+    label = None
+    labelsToBBs = {}
+
+    def save(kind: BlockKind) -> None:
+        nonlocal label
+        bb = BasicBlock(kind, len(bbs), label, buf.copy())
+        bbs.append(bb)
+        buf.clear()
+        label = None
+        if bb.label is not None:
+            labelsToBBs[bb.label] = bb.id
+
+    for item in seq:
+        if item.isLabel():
+            if not item.label.isFunc():
+                save(BlockKind.CONTINUOUS)
+                label = item.label
+        else:
+            buf.append(Loc(item))
+            if not item.isSequential():
+                save(
+                    {
+                        InstrKind.JMP: BlockKind.END_BY_JUMP,
+                        InstrKind.COND_JMP: BlockKind.END_BY_COND_JUMP,
+                        InstrKind.RET: BlockKind.END_BY_RETURN,
+                    }[item.kind]
+                )
+
+    edges = []
+    for now, bb in enumerate(bbs, 1):
+        if bb.kind is BlockKind.END_BY_JUMP:
+            assert labelsToBBs.get(bb.getLastInstr().label) is not None
+            edges.append((bb.id, labelsToBBs.get(bb.getLastInstr().label)))
+        elif bb.kind is BlockKind.END_BY_COND_JUMP:
+            assert labelsToBBs.get(bb.getLastInstr().label) is not None
+            edges.append((bb.id, labelsToBBs.get(bb.getLastInstr().label)))
+            if now < len(bbs) - 1:
+                edges.append((bb.id, bb.id + 1))
+        elif bb.kind is BlockKind.CONTINUOUS and now < len(bbs):
+            edges.append((bb.id, bb.id + 1))
+    return SetCFG(bbs, edges)
+
+
+def generated(statements: int, seed: int) -> list[TACInstr]:
+    driver.reset()
+    code = program(
+        statements, depth=2, nesting=3, loops=statements // 4, width=12, seed=seed
+    )
+    func = driver.step_tac(driver.parseCode(code, ARGS)).funcs[0]
+    emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
+    return emitter.selectInstr(func)[0]
+
+
+def loops(blocks: int, seed: int) -> list[TACInstr]:
+    "A function of `blocks` blocks in nested loops, each block branching back to an enclosing loop header at random."
+    rng = random.Random(seed)
+    labels = [BlockLabel(f"B{i}") for i in range(blocks)]
+    seq: list[TACInstr] = []
+    headers: list[int] = []
+    for i in range(blocks):
+        seq.append(Riscv.RiscvLabel(labels[i]))
+        seq.append(Riscv.Binary(BinaryOp.ADD, Temp(i), Temp(i), Temp(i)))
+        if headers and rng.random() < 0.3:
+            seq.append(Riscv.Branch(Temp(i), labels[rng.choice(headers)]))
+            if rng.random() < 0.5:
+                headers.pop()
+        elif len(headers) < 8 and rng.random() < 0.3:
+            headers.append(i)
+    seq.append(Riscv.JumpToEpilogue(MAIN_LABEL))
+    return seq
+
+
+def measure(title: str, run: Callable[[], object], repeat: int) -> object:
+    "The best time of `repeat` runs, then the peak of one more, traced by `tracemalloc`."
+    elapsed, _ = timed(run, repeat)
+    kept, _, peak, _ = traced(run)
+    print(f"  {title:<28} {elapsed:8.3f} s {peak / 2**20:10.1f} MiB")
+    return kept
+
+
+def once(title: str, run: Callable[[], object]) -> None:
+    elapsed, _ = timed(run)
+    print(f"  {title:<28} {elapsed:8.3f} s")
+
+
+def compare(title: str, seqs: list[list[TACInstr]], repeat: int) -> None:
+    print(f"{title}: {len(seqs)} functions, {sum(map(len, seqs))} instructions")
+    print(f"  {'':<28} {'time':>10} {'peak':>14}")
+    old: list[SetCFG] = measure(  # type: ignore
+        "sets, copied", lambda: [setCFG(seq) for seq in seqs], repeat
+    )
+    new: list[CFG] = measure(  # type: ignore
+        "arrays", lambda: [CFGBuilder().buildFrom(seq) for seq in seqs], repeat
+    )
+    print(f"  {sum(len(graph.nodes) for graph in new)} blocks")
+
+    once("reverse postorder, sets", lambda: [graph.reversePostorder() for graph in old])
+    once("reverse postorder", lambda: [graph.reversePostorder() for graph in new])
+    once(
+        "reverse postorder, cached", lambda: [graph.reversePostorder() for graph in new]
+    )
+    once("dominators", lambda: [graph.computeDominators() for graph in new])
+    once("loops", lambda: [graph.computeLoops() for graph in new])
+    depths = [graph.getLoopDepth(id) for graph in new for id in range(len(graph.nodes))]
+    print(
+        f"  {sum(len(graph.loops()) for graph in new)} loops,"
+        f" loop depth {max(depths, default=0)} at most, {sum(depths) / max(len(depths), 1):.2f} on average"
+    )
+
+    for before, after in zip(old, new):
+        assert len(before.nodes) == len(after.nodes)
+        for id in range(len(after.nodes)):
+            assert before.getSucc(id) == set(after.getSucc(id))
+            assert before.getPrev(id) == set(after.getPrev(id))
+        assert before.reversePostorder() == after.reversePostorder()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--statements", type=int, default=6000)
+    argparser.add_argument("--blocks", type=int, default=50000)
+    argparser.add_argument("--functions", type=int, default=2)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    compare(
+        "generated",
+        [generated(args.statements, seed) for seed in range(args.functions)],
+        args.repeat,
+    )
+    compare(
+        "loops",
+        [loops(args.blocks, seed) for seed in range(args.functions)],
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark: spawn one compiler process per run, as the test scripts do,
+and compare PLY's default table handling with the persisted table cache (see `utils.tablecache`).
+
+Three configurations are measured:
+    regenerate: PLY without any table file, i.e. a fresh checkout or a read-only source tree.
+    ply reuse:  PLY reusing the `parsetab.py` it wrote next to the parser, after validating the grammar.
+    cached:     tables loaded from the cache through PLY's optimized path.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import report, timed
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE = "int main() {\n    return 1 + 2;\n}\n"
+
+
+LEFTOVERS = [
+    os.path.join(ROOT_DIR, "frontend", "parser", name)
+    for name in ("parser.out", "parsetab.py")
+]
+
+
+def cleanup() -> None:
+    for path in LEFTOVERS:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run(
+    runs: int, inputFile: str, env: dict[str, str], fresh: bool = False
+) -> list[float]:
+    times = []
+    for _ in range(runs):
+        if fresh:
+            cleanup()
+        elapsed, _ = timed(
+            lambda: subprocess.run(
+                [sys.executable, "main.py", "--input", inputFile, "--riscv"],
+                cwd=ROOT_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+        )
+        times.append(elapsed)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputFile = os.path.join(tmp, "input.c")
+        with open(inputFile, "w") as f:
+            f.write(SOURCE)
+
+        uncached = dict(os.environ, MINIDECAF_NO_TABLE_CACHE="1")
+        cached = dict(os.environ, MINIDECAF_TABLE_DIR=os.path.join(tmp, "tables"))
+        cached.pop("MINIDECAF_NO_TABLE_CACHE", None)
+
+        try:
+            regenerate = report(
+                "regenerate", run(args.runs, inputFile, uncached, fresh=True), 24
+            )
+            reuse = report("ply reuse", run(args.runs, inputFile, uncached), 24)
+
+            # warm up the cache once
+            run(1, inputFile, cached)
+            after = report("cached", run(args.runs, inputFile, cached), 24)
+        finally:
+            # PLY's default behaviour writes parser.out/parsetab.py next to the parser, keep them out of the tree.
+            cleanup()
+
+        print(
+            f"speedup: {regenerate / after:.2f}x over regenerate, {reuse / after:.2f}x over ply reuse"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Dataflow benchmark: analyze the liveness of the CFGs of the corpus with `LivenessAnalyzer`, which solves a
+`LivenessProblem` with the dataflow framework (`backend.dataflow.framework`), and with the hand-rolled worklist
+it replaced, then solve reaching definitions and available expressions over the same CFGs.
+
+The time of each is reported, the liveness with the sets of every instruction computed afterwards
+(as the register allocator needs them), with the convergence statistics of the framework, and the results of both liveness analyses are checked to be identical.
+
+The corpus is the one of `benchmarks.quality`, with large generated functions and synthetic ones
+(see `benchmarks.liveness`) added, as the programs of the corpus are small.
+"""
+
+import argparse
+import os
+from collections import deque
+from typing import Callable
+
+import main as driver
+from backend.dataflow.cfg import CFG
+from backend.dataflow.cfgbuilder import CFGBuilder
+from backend.dataflow.framework import DataflowAnalyzer, DataflowProblem, DataflowStats
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.dataflow.problems import (
+    AvailableExpressions,
+    LivenessProblem,
+    ReachingDefinitions,
+)
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from benchmarks.harness import timed
+from benchmarks.liveness import cfgs, synthetic
+from benchmarks.quality import ARGS, ROOT_DIR, corpus
+from utils.riscv import Riscv
+
+
+class HandRolledLiveness:
+    "The analysis `LivenessAnalyzer` used to do, with the sets of the blocks and of the instructions as bit vectors."
+
+    def __init__(self, graph: CFG) -> None:
+        self.graph = graph
+        uses: list[list[int]] = []
+        defines: list[set[int]] = []
+        for bb in graph.nodes:
+            use, define = LivenessProblem.useAndDefine(bb)
+            uses.append(use)
+            defines.append(define)
+
+        self.temps: list[int] = []
+        self.numbering: dict[int, int] = {}
+        for use in uses:
+            for v in use:
+                if v not in self.numbering:
+                    self.numbering[v] = len(self.temps)
+                    self.temps.append(v)
+
+        def bits(vs) -> int:
+            result = 0
+            for v in vs:
+                number = self.numbering.get(v)
+                if number is not None:
+                    result |= 1 << number
+            return result
+
+        liveUse = [bits(use) for use in uses]
+        define = [bits(define) for define in defines]
+        self.liveIn = liveUse.copy()
+        self.liveOut = [0] * len(graph.nodes)
+        succs = [list(graph.getSucc(i)) for i in range(len(graph.nodes))]
+        preds = [list(graph.getPrev(i)) for i in range(len(graph.nodes))]
+
+        worklist = deque(reversed(graph.reversePostorder()))
+        queued = [True] * len(graph.nodes)
+        while worklist:
+            id = worklist.popleft()
+            queued[id] = False
+            out = 0
+            for next in succs[id]:
+                out |= self.liveIn[next]
+            self.liveOut[id] = out
+            live = liveUse[id] | (out & ~define[id])
+            if live != self.liveIn[id]:
+                self.liveIn[id] = live
+                for prev in preds[id]:
+                    if not queued[prev]:
+                        queued[prev] = True
+                        worklist.append(prev)
+
+    def locLiveIns(self, id: int) -> tuple[list[int], list[int]]:
+        "The live-in sets of the instructions of a block, and their temps, numbered from its live-out set as they were."
+        temps = [
+            self.temps[i] for i in range(len(self.temps)) if (self.liveOut[id] >> i) & 1
+        ]
+        numbering = {temp: number for number, temp in enumerate(temps)}
+
+        def number(temp: int) -> int:
+            if temp not in numbering:
+                numbering[temp] = len(temps)
+                temps.append(temp)
+            return numbering[temp]
+
+        live = (1 << len(temps)) - 1
+        sets = []
+        for loc in self.graph.nodes[id].backwardIterator():
+            for v in loc.instr.getWritten():
+                live &= ~(1 << number(v))
+            for v in loc.instr.getRead():
+                live |= 1 << number(v)
+            sets.append(live)
+        sets.reverse()
+        return sets, temps
+
+
+def members(bits: int, temps: list[int]) -> set[int]:
+    return {temps[i] for i in range(len(temps)) if (bits >> i) & 1}
+
+
+def functions(code: str) -> list[CFG]:
+    "The CFGs of the functions of a program, after instruction selection."
+    driver.reset()
+    graphs = []
+    for func in driver.step_tac(driver.parseCode(code, ARGS)).funcs:
+        emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
+        graphs.append(CFGBuilder().buildFrom(emitter.selectInstr(func)[0]))
+    return graphs
+
+
+def measure(title: str, run: Callable[[], object], repeat: int) -> None:
+    best, _ = timed(run, repeat)
+    print(f"  {title:<28} {best:8.3f} s")
+
+
+def solve(problem: Callable[[], DataflowProblem], graphs: list[CFG]) -> DataflowStats:
+    "Solve a problem over every graph, and sum up the convergence statistics."
+    blocks = visits = changes = maxVisits = 0
+    for graph in graphs:
+        stats = DataflowAnalyzer(problem()).accept(graph).stats
+        blocks += stats.blocks
+        visits += stats.visits
+        changes += stats.changes
+        maxVisits = max(maxVisits, stats.maxVisits)
+    return DataflowStats(blocks, visits, changes, maxVisits)
+
+
+def compare(title: str, graphs: list[CFG], repeat: int) -> None:
+    blocks = sum(len(graph.nodes) for graph in graphs)
+    locs = sum(len(bb.locs) for graph in graphs for bb in graph.nodes)
+    print(f"{title}: {len(graphs)} functions, {blocks} blocks, {locs} instructions")
+
+    analyzer = LivenessAnalyzer()
+
+    def framework():
+        for graph in graphs:
+            analyzer.accept(graph)
+            analyzer.liveIns
+
+    def handRolled():
+        for graph in graphs:
+            liveness = HandRolledLiveness(graph)
+            for id in range(len(graph.nodes)):
+                sum(bits.bit_count() for bits in liveness.locLiveIns(id)[0])
+
+    measure("liveness, hand-rolled", handRolled, repeat)
+    measure("liveness, framework", framework, repeat)
+    for problem in (ReachingDefinitions, AvailableExpressions):
+        measure(problem.__name__, lambda: solve(problem, graphs), repeat)
+
+    for problem in (LivenessProblem, ReachingDefinitions, AvailableExpressions):
+        stats = solve(problem, graphs)
+        print(
+            f"  {problem.__name__:<28} {stats.visits / max(stats.blocks, 1):8.2f} visits per block,"
+            f" {stats.changes} changes, at most {stats.maxVisits} visits"
+        )
+
+    for graph in graphs:
+        expected = HandRolledLiveness(graph)
+        analyzer.accept(graph)
+        for bb in graph.nodes:
+            assert set(bb.liveIn) == members(expected.liveIn[bb.id], expected.temps)
+            assert set(bb.liveOut) == members(expected.liveOut[bb.id], expected.temps)
+            sets, temps = expected.locLiveIns(bb.id)
+            assert [set(loc.liveIn) for loc in bb.iterator()] == [
+                members(bits, temps) for bits in sets
+            ]
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument(
+        "--corpus",
+        type=str,
+        default=os.path.join(ROOT_DIR, "minidecaf-tests", "testcases"),
+    )
+    argparser.add_argument("--statements", type=int, default=2000)
+    argparser.add_argument("--functions", type=int, default=3)
+    argparser.add_argument("--blocks", type=int, default=1000)
+    argparser.add_argument("--temps", type=int, default=200)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    graphs = []
+    for code in corpus(args.corpus).values():
+        try:
+            graphs.extend(functions(code))
+        except Exception:
+            pass
+    compare("corpus", graphs, args.repeat)
+    compare("generated", cfgs(args.statements, args.functions), args.repeat)
+    compare(
+        "synthetic",
+        [synthetic(args.blocks, args.temps, seed) for seed in range(args.functions)],
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Diagnostics benchmark: parse a large generated program containing thousands of syntax and lexical errors,
+with every parser, and report the time taken along with the number of errors reported.
+"""
+
+import argparse
+import random
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import expression
+from benchmarks.harness import timed
+from frontend.lexer import dfa_lexer, lexer
+from frontend.parser import flat, generated_parser, parser, pratt
+
+
+def erroneous(count: int, errors: int, seed: int = 0) -> str:
+    "A `main` function of `count` statements, `errors` of which are erroneous."
+    rng = random.Random(seed)
+    wrong = set(rng.sample(range(count), errors))
+    lines = ["int main() {"]
+    for i in range(count):
+        if i not in wrong:
+            lines.append(f"    {expression(2, rng)};")
+        elif rng.random() < 0.8:
+            lines.append(f"    {expression(1, rng)} + ;")
+        else:
+            lines.append(f"    {expression(1, rng)} @ 1;")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def reset(lexer) -> None:
+    lexer.lineno = 1
+    lexer.error_stack.clear()
+    if hasattr(lexer, "begin"):
+        lexer.begin("INITIAL")
+
+
+PARSERS = {
+    "lalr": (parser, lambda code, lexer: parser.parse(code, lexer=lexer)),
+    "pratt": (parser, lambda code, lexer: pratt.parse(parser, code, lexer)),
+    "codegen": (
+        generated_parser,
+        lambda code, lexer: generated_parser.parse(code, lexer=lexer),
+    ),
+    "flat": (generated_parser, flat.parse),
+}
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=50_000)
+    argparser.add_argument("--errors", type=int, default=5_000)
+    args = argparser.parse_args()
+
+    code = erroneous(args.lines, args.errors)
+    print(f"input: {args.lines} lines, {args.errors} erroneous")
+    for lexerName, lex in (("ply", lexer), ("dfa", dfa_lexer)):
+        for name, (chosen, parse) in PARSERS.items():
+            reset(lex)
+            chosen.error_stack.clear()
+            elapsed, _ = timed(lambda: parse(code, lex))
+            print(
+                f"{lexerName:<4}{name:<8} {elapsed:8.3f} s   "
+                f"{len(chosen.error_stack)} syntax errors, {len(lex.error_stack)} lex errors"
+            )
+
+
+if __name__ == "__main__":
+    main()
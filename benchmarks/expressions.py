@@ -0,0 +1,45 @@
+"""
+Expression parsing benchmark: parse long arithmetic expressions with the LALR grammar alone,
+and with expressions parsed by precedence climbing (`frontend.parser.pratt`).
+"""
+
+import argparse
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import long_expression, statements
+from benchmarks.harness import timed
+from frontend.lexer import dfa_lexer
+from frontend.parser import parser, pratt
+
+
+def measure(title: str, job) -> float:
+    elapsed, result = timed(job)
+    assert result is not None and not parser.error_stack
+    print(f"  {title:<6} {elapsed:8.3f} s")
+    return elapsed
+
+
+def compare(title: str, code: str) -> None:
+    print(title)
+    lalr = measure("lalr", lambda: parser.parse(code, lexer=dfa_lexer))
+    fast = measure("pratt", lambda: pratt.parse(parser, code, dfa_lexer))
+    print(f"  speedup: {lalr / fast:.2f}x")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--terms", type=int, default=100_000)
+    argparser.add_argument("--lines", type=int, default=20_000)
+    args = argparser.parse_args()
+
+    # The DFA lexer is used in both cases, to measure the parser only.
+    compare(f"{args.terms} terms joined by +", long_expression(args.terms, "+"))
+    compare(
+        f"{args.terms} terms joined by + and *",
+        long_expression(args.terms, "+").replace("+", "*", args.terms // 2),
+    )
+    compare(f"{args.lines} statements", statements(args.lines, depth=3))
+
+
+if __name__ == "__main__":
+    main()
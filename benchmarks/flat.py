@@ -0,0 +1,60 @@
+"""
+Flat AST benchmark: parse a generated program of about a million nodes into node objects (the generated parser)
+and into a `FlatTree` (`frontend.parser.flat`), and compare parse time, peak and retained memory (tracemalloc),
+and the pause of a full garbage collection while the AST is alive.
+"""
+
+import argparse
+import gc
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import nested
+from benchmarks.harness import timed, traced
+from benchmarks.traversal import count
+from frontend.lexer import dfa_lexer
+from frontend.parser import flat, generated_parser
+
+
+def parseObjects(code: str):
+    tree = generated_parser.parse(code, lexer=dfa_lexer)
+    assert tree is not None and not generated_parser.error_stack
+    # The DFA lexer keeps its token arrays until the next input, which would be counted as the AST.
+    dfa_lexer.input("")
+    return tree
+
+
+def parseFlat(code: str):
+    tree = flat.parse(code, lexer=dfa_lexer)
+    assert tree is not None and not generated_parser.error_stack
+    dfa_lexer.input("")
+    return tree
+
+
+def measure(title: str, parse, code: str) -> int:
+    elapsed, tree = timed(lambda: parse(code), collect=True)
+    pause, _ = timed(gc.collect)
+    nodes = count(tree)
+    del tree
+
+    memory = traced(lambda: parse(code), collect=True)
+    print(
+        f"{title:<8} parse {elapsed:7.3f} s   peak {memory.peak / 2**20:8.2f} MiB"
+        f"   AST {memory.retained / 2**20:8.2f} MiB   full GC {pause * 1e3:7.1f} ms"
+    )
+    return nodes
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=28_000)
+    args = argparser.parse_args()
+
+    code = nested(args.lines, depth=4)
+    print(f"input: {args.lines} statements, {len(code) / 2**20:.1f} MiB")
+    nodes = measure("objects", parseObjects, code)
+    assert nodes == measure("flat", parseFlat, code), "node counts differ"
+    print(f"nodes: {nodes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Generator of synthetic MiniDecaf programs used by the benchmarks.
+Only constructs the frontend and backend both support are emitted.
+"""
+
+import random
+
+
+def expression(depth: int, rng: random.Random) -> str:
+    "A random arithmetic expression with roughly `depth` levels of nesting."
+    if depth <= 0:
+        return str(rng.randint(0, 1000))
+    op = rng.choice(["+", "+", "-", "*", "<", "=="])
+    if op == "-" and rng.random() < 0.3:
+        return f"-({expression(depth - 1, rng)})"
+    return f"({expression(depth - 1, rng)} {op} {expression(depth - 1, rng)})"
+
+
+def statements(count: int, depth: int = 2, seed: int = 0) -> str:
+    """
+    A `main` function made of `count` simple statements, one or a few per line,
+    with comments sprinkled in as the test programs have.
+    """
+    rng = random.Random(seed)
+    lines = ["int main() {"]
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            lines.append(f"    {expression(depth, rng)};")
+        elif kind < 0.75:
+            lines.append(
+                f"    if ({expression(depth, rng)}) {expression(depth, rng)}; // branch {i}"
+            )
+        elif kind < 0.85:
+            lines.append(
+                f"    while ({expression(1, rng)}) {{ {expression(depth, rng)}; break; }}"
+            )
+        elif kind < 0.95:
+            lines.append(f"    /* statement {i} */ {{ {expression(depth, rng)}; }}")
+        else:
+            lines.append(f"    int x{i} = {expression(depth, rng)};")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def arithmetic(depth: int, rng: random.Random) -> str:
+    "A random expression of the operators the TAC generation supports: `+` and unary `-`."
+    if depth <= 0:
+        return str(rng.randint(0, 1000))
+    if rng.random() < 0.2:
+        return f"-({arithmetic(depth - 1, rng)})"
+    return f"({arithmetic(depth - 1, rng)} + {arithmetic(depth - 1, rng)})"
+
+
+def nested(count: int, depth: int = 3, seed: int = 0) -> str:
+    """
+    A `main` function made of `count` random statements, which nest blocks, `if`s and `while`s up to `depth` levels,
+    and that the whole compiler supports.
+    """
+    rng = random.Random(seed)
+
+    def statement(depth: int) -> str:
+        kind = rng.random()
+        if depth <= 0 or kind < 0.4:
+            return f"{arithmetic(2, rng)};"
+        if kind < 0.6:
+            return f"if ({arithmetic(1, rng)}) {statement(depth - 1)} else {statement(depth - 1)}"
+        if kind < 0.8:
+            return f"while ({arithmetic(1, rng)}) {{ {statement(depth - 1)} break; }}"
+        return "{ " + " ".join(statement(depth - 1) for _ in range(3)) + " }"
+
+    lines = ["int main() {"]
+    lines.extend(f"    {statement(depth)}" for _ in range(count))
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def long_expression(terms: int, op: str = "+") -> str:
+    "A `main` returning `1 op 2 op ... op terms`."
+    return (
+        "int main() {\n    return "
+        + f" {op} ".join(str(i % 1000) for i in range(1, terms + 1))
+        + ";\n}\n"
+    )
+
+
+def pressure(width: int, rng: random.Random) -> str:
+    """
+    An expression nested to the right, `a + (b + (c + ...))`, which keeps `width` temps live at once:
+    the left operands are evaluated first and wait for the sum on their right.
+    Variables are not translated to TAC yet, so this is how live-variable pressure is generated.
+    """
+    return (
+        "(" + " + (".join(str(rng.randint(0, 1000)) for _ in range(width)) + ")" * width
+    )
+
+
+def program(
+    statements: int,
+    depth: int = 2,
+    nesting: int = 2,
+    loops: int = 0,
+    width: int = 0,
+    seed: int = 0,
+) -> str:
+    """
+    A `main` function that the whole compiler supports, made of `statements` statements:
+    expressions `depth` levels deep, in blocks and `if`s nested `nesting` levels deep,
+    of which `loops` are wrapped in a `while`, and each of which also adds an expression keeping `width` temps live.
+    """
+    rng = random.Random(seed)
+    looping = set(rng.sample(range(statements), min(loops, statements)))
+
+    def statement(nesting: int) -> str:
+        stmt = f"{arithmetic(depth, rng)};"
+        if width > 0:
+            stmt += f" {pressure(width, rng)};"
+        for level in range(nesting):
+            if level % 2 == 0:
+                stmt = f"{{ {stmt} }}"
+            else:
+                stmt = f"if ({arithmetic(1, rng)}) {stmt} else {{ }}"
+        return stmt
+
+    lines = ["int main() {"]
+    for i in range(statements):
+        stmt = statement(nesting)
+        if i in looping:
+            stmt = f"while ({arithmetic(1, rng)}) {{ {stmt} break; }}"
+        lines.append(f"    {stmt}")
+    lines.append("    return 0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
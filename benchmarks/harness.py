@@ -0,0 +1,86 @@
+"""
+The harness of the benchmarks: `timed` and `timings` time a job, `traced` measures its memory with `tracemalloc`,
+and `report` summarizes the times of a job run several times.
+"""
+
+import gc
+import math
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+def timed(
+    job: Callable[[], T], repeat: int = 1, collect: bool = False
+) -> tuple[float, T]:
+    """
+    The best time of `repeat` runs of `job`, and the result of the last one. With `collect`, a full collection
+    precedes every run, and the garbage collector is disabled while timing, as `timeit` does.
+    """
+    best = math.inf
+    result: Any = None
+    for _ in range(repeat):
+        # The result of a run is dropped before the next one.
+        result = None
+        if collect:
+            gc.collect()
+            gc.disable()
+        try:
+            start = time.perf_counter()
+            result = job()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            if collect:
+                gc.enable()
+    return best, result
+
+
+def timings(job: Callable[[], T], runs: int) -> tuple[list[float], T]:
+    "The time of each of `runs` runs of `job`, and the result of the last one."
+    times = []
+    result: Any = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = job()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+class Traced(NamedTuple):
+    "A run traced by `tracemalloc`, which slows it down. The memory is counted in bytes, above the one before the run."
+
+    result: Any
+    time: float
+    peak: int
+    # What is still allocated after the run, its result included.
+    retained: int
+
+
+def traced(job: Callable[[], Any], collect: bool = False) -> Traced:
+    "Run `job` traced by `tracemalloc`. With `collect`, a full collection precedes the run, and follows it."
+    if collect:
+        gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        result = job()
+        elapsed = time.perf_counter() - start
+        if collect:
+            gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Traced(result, elapsed, peak - before, retained - before)
+
+
+def report(title: str, times: list[float], width: int = 10) -> float:
+    "Print the mean and the minimum of `times`, and return the mean."
+    mean = statistics.mean(times)
+    print(
+        f"{title:<{width}} mean {mean * 1000:8.2f} ms   min {min(times) * 1000:8.2f} ms"
+    )
+    return mean
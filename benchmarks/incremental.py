@@ -0,0 +1,63 @@
+"""
+Incremental compilation benchmark: compile a large generated program to RISC-V from scratch,
+then with `utils.incremental` on a cold cache, after an edit that leaves its functions unchanged (a comment),
+and after an edit of a function. Outputs are checked to be identical to the ones compiled from scratch.
+
+The language accepted by the parser so far has a single function per program (`main`),
+so an edit of a function recompiles the whole program, and an edit elsewhere only reparses it.
+"""
+
+import argparse
+import os
+import tempfile
+
+import main as driver
+from benchmarks.generate import nested
+from benchmarks.harness import timed
+from utils.incremental import IncrementalCompiler
+
+ARGS = argparse.Namespace(
+    lexer="dfa", parser="codegen", riscv=True, tac=False, parse=False
+)
+
+
+def measure(title: str, compile, code: str) -> tuple[float, str]:
+    elapsed, output = timed(lambda: compile(code))
+    print(f"{title:<20} {elapsed:8.3f} s")
+    return elapsed, output
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=3000)
+    args = argparser.parse_args()
+
+    code = nested(args.lines)
+    commented = code + "// an edit outside of any function\n"
+    edited = code.replace("return", "return 1 +", 1)
+    print(f"input: {args.lines} statements")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compiler = IncrementalCompiler(os.path.join(tmp, "cache"))
+
+        def incremental(code: str) -> str:
+            driver.reset()
+            return compiler.compile(driver.parseCode(code, ARGS), "riscv")
+
+        def scratch(code: str) -> str:
+            return driver.compileCode(code, ARGS)
+
+        _, expected = measure("from scratch", scratch, code)
+        _, output = measure("cold cache", incremental, code)
+        assert output == expected
+        reused, output = measure("comment edited", incremental, commented)
+        assert output == expected and compiler.reused == ["main"]
+        recompiled, output = measure("function edited", incremental, edited)
+        assert output == scratch(edited) and compiler.compiled == ["main"]
+        print(
+            f"no function changed: {recompiled / reused:.2f}x faster than recompiling"
+        )
+
+
+if __name__ == "__main__":
+    main()
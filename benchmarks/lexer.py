@@ -0,0 +1,51 @@
+"""
+Lexer benchmark: tokenize a large generated input with the PLY lexer and the table-driven DFA lexer,
+and compare time and peak memory (tracemalloc) of holding all tokens.
+"""
+
+import argparse
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import statements
+from benchmarks.harness import timed, traced
+from frontend.lexer import dfa_lexer, ply_lexer
+
+
+def tokenizePLY(code: str):
+    ply_lexer.begin("INITIAL")
+    ply_lexer.lineno = 1
+    ply_lexer.input(code)
+    return list(ply_lexer)
+
+
+def tokenizeDFA(code: str):
+    dfa_lexer.input(code)
+    return dfa_lexer.kinds, dfa_lexer.starts, dfa_lexer.lines
+
+
+def measure(title: str, job, code: str):
+    elapsed, _ = timed(lambda: job(code), collect=True)
+    peak = traced(lambda: job(code), collect=True).peak
+    print(f"{title:<6} {elapsed:8.3f} s   peak {peak / 2**20:9.2f} MiB")
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    code = statements(args.lines)
+    print(f"input: {args.lines} lines, {len(code) / 2**20:.1f} MiB")
+
+    plyTime, plyPeak = measure("ply", tokenizePLY, code)
+    dfaTime, dfaPeak = measure("dfa", tokenizeDFA, code)
+
+    tokens = len(dfa_lexer.kinds)
+    assert tokens == len(tokenizePLY(code)), "token counts differ"
+    print(f"tokens: {tokens}")
+    print(f"speedup: {plyTime / dfaTime:.2f}x, memory: {plyPeak / dfaPeak:.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Liveness benchmark: analyze the CFGs of large generated functions with `LivenessAnalyzer`, which computes bit vectors
+over a worklist and the sets of the instructions on demand, and with the set-based analysis it replaced,
+which iterated until nothing changed and stored two sets on every instruction.
+
+The time and the `tracemalloc` peak of both are reported, the bit vectors with and without the sets of every instruction
+being queried afterwards (as the register allocator does), and their results are checked to be identical.
+
+The generated functions have no variables yet, thus no temp live across blocks. The benchmark also runs
+on synthetic functions, of blocks reading and writing temps picked at random, and branching back at random.
+"""
+
+import argparse
+import random
+
+import main as driver
+from backend.dataflow.cfg import CFG
+from backend.dataflow.cfgbuilder import CFGBuilder
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from benchmarks.generate import program
+from benchmarks.harness import timed, traced
+from utils.label.blocklabel import BlockLabel
+from utils.label.funclabel import MAIN_LABEL
+from utils.riscv import Riscv
+from utils.tac.tacop import BinaryOp
+from utils.tac.temp import Temp
+
+ARGS = argparse.Namespace(
+    lexer="dfa", parser="codegen", riscv=True, tac=False, parse=False
+)
+
+
+class SetLiveness:
+    "The analysis `LivenessAnalyzer` used to do, with its results by block id and by instruction."
+
+    def __init__(self, graph: CFG) -> None:
+        self.liveIn: dict[int, set[int]] = {}
+        self.liveOut: dict[int, set[int]] = {}
+        self.locs: list[tuple[set[int], set[int]]] = []
+        define: dict[int, set[int]] = {}
+        for bb in graph.nodes:
+            define[bb.id] = set()
+            liveUse = set()
+            for loc in bb.iterator():
+                for read in loc.instr.getRead():
+                    if not read in define[bb.id]:
+                        liveUse.add(read)
+                define[bb.id].update(loc.instr.getWritten())
+            self.liveIn[bb.id] = set(liveUse)
+            self.liveOut[bb.id] = set()
+
+        changed = True
+        while changed:
+            changed = False
+            for bb in graph.nodes:
+                for next in graph.getSucc(bb.id):
+                    self.liveOut[bb.id].update(self.liveIn[next])
+                liveOut = self.liveOut[bb.id].copy()
+                for v in define[bb.id]:
+                    liveOut.discard(v)
+                before = len(self.liveIn[bb.id])
+                self.liveIn[bb.id].update(liveOut)
+                if before != len(self.liveIn[bb.id]):
+                    changed = True
+
+        for bb in graph.nodes:
+            liveOut = self.liveOut[bb.id].copy()
+            locs = []
+            for loc in bb.backwardIterator():
+                out = liveOut.copy()
+                for v in loc.instr.getWritten():
+                    liveOut.discard(v)
+                liveOut.update(loc.instr.getRead())
+                locs.append((liveOut.copy(), out))
+            self.locs.extend(reversed(locs))
+
+
+def cfgs(statements: int, functions: int) -> list[CFG]:
+    graphs = []
+    for seed in range(functions):
+        driver.reset()
+        code = program(
+            statements, depth=2, nesting=3, loops=statements // 4, width=12, seed=seed
+        )
+        func = driver.step_tac(driver.parseCode(code, ARGS)).funcs[0]
+        emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
+        graphs.append(CFGBuilder().buildFrom(emitter.selectInstr(func)[0]))
+    return graphs
+
+
+def synthetic(blocks: int, temps: int, seed: int) -> CFG:
+    rng = random.Random(seed)
+    labels = [BlockLabel(str(i)) for i in range(blocks)]
+    seq = []
+    for i in range(blocks):
+        seq.append(Riscv.RiscvLabel(labels[i]))
+        for _ in range(4):
+            src0, src1, dst = (Temp(rng.randrange(temps)) for _ in range(3))
+            seq.append(Riscv.Binary(BinaryOp.ADD, dst, src0, src1))
+        if i > 0 and rng.random() < 0.3:
+            seq.append(
+                Riscv.Branch(Temp(rng.randrange(temps)), labels[rng.randrange(i)])
+            )
+    seq.append(Riscv.JumpToEpilogue(MAIN_LABEL))
+    return CFGBuilder().buildFrom(seq)
+
+
+def queried(graph: CFG) -> int:
+    "Query the sets of every instruction, as the register allocator does."
+    return sum(len(loc.liveIn) for bb in graph.nodes for loc in bb.iterator())
+
+
+def measure(title: str, run) -> None:
+    elapsed, _ = timed(run)
+    peak = traced(run).peak
+    print(f"{title:<24} {elapsed:8.3f} s {peak / 2**20:10.1f} MiB")
+
+
+def compare(title: str, graphs: list[CFG]) -> None:
+    blocks = sum(len(graph.nodes) for graph in graphs)
+    locs = sum(len(bb.locs) for graph in graphs for bb in graph.nodes)
+    print(f"{title}: {len(graphs)} functions, {blocks} blocks, {locs} instructions")
+
+    analyzer = LivenessAnalyzer()
+
+    def bitVectors():
+        for graph in graphs:
+            analyzer.accept(graph)
+        return [bb.liveness for graph in graphs for bb in graph.nodes]
+
+    def bitVectorsQueried():
+        for graph in graphs:
+            analyzer.accept(graph)
+            queried(graph)
+        return [bb.liveness for graph in graphs for bb in graph.nodes]
+
+    def sets():
+        return [SetLiveness(graph) for graph in graphs]
+
+    print(f"{'':<24} {'time':>10} {'peak':>14}")
+    measure("sets", sets)
+    measure("bit vectors", bitVectors)
+    measure("bit vectors, queried", bitVectorsQueried)
+
+    for graph, expected in zip(graphs, sets()):
+        analyzer.accept(graph)
+        assert all(bb.liveIn == expected.liveIn[bb.id] for bb in graph.nodes)
+        assert all(bb.liveOut == expected.liveOut[bb.id] for bb in graph.nodes)
+        locs = [loc for bb in graph.nodes for loc in bb.iterator()]
+        assert all(
+            loc.liveIn == liveIn and loc.liveOut == liveOut
+            for loc, (liveIn, liveOut) in zip(locs, expected.locs)
+        )
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--statements", type=int, default=2000)
+    argparser.add_argument("--functions", type=int, default=3)
+    argparser.add_argument("--blocks", type=int, default=1000)
+    argparser.add_argument("--temps", type=int, default=200)
+    args = argparser.parse_args()
+
+    compare("generated", cfgs(args.statements, args.functions))
+    compare(
+        "synthetic",
+        [synthetic(args.blocks, args.temps, seed) for seed in range(args.functions)],
+    )
+
+
+if __name__ == "__main__":
+    main()
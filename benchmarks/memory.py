@@ -0,0 +1,46 @@
+"""
+AST memory benchmark: tracemalloc peak of parsing a large generated program,
+and the size of the resulting AST, both per 10k statements.
+Run it before and after a change of the node classes to compare their footprint.
+"""
+
+import argparse
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import statements
+from benchmarks.harness import traced
+from benchmarks.traversal import count
+from frontend.lexer import dfa_lexer
+from frontend.parser import generated_parser
+
+
+def parse(code: str):
+    tree = generated_parser.parse(code, lexer=dfa_lexer)
+    assert tree is not None and not generated_parser.error_stack
+    # The DFA lexer keeps its token arrays until the next input, which would be counted as the AST.
+    dfa_lexer.input("")
+    return tree
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=100_000)
+    args = argparser.parse_args()
+
+    code = statements(args.lines)
+    per10k = args.lines / 10_000
+    print(f"input: {args.lines} statements, {len(code) / 2**20:.1f} MiB")
+
+    parse(code)
+    tree, _, peak, size = traced(lambda: parse(code), collect=True)
+
+    nodes = count(tree)
+    print(f"nodes: {nodes}")
+    print(f"peak  {peak / per10k / 2**20:8.2f} MiB per 10k statements")
+    print(
+        f"AST   {size / per10k / 2**20:8.2f} MiB per 10k statements, {size / nodes:.0f} bytes/node"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Parser benchmark: parse large programs with PLY, and with the parser generated from the same grammar
+(`frontend.parser.codegen`), both alone and with expressions parsed by precedence climbing.
+"""
+
+import argparse
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import long_expression, statements
+from benchmarks.harness import timed
+from frontend.lexer import dfa_lexer
+from frontend.parser import generated_parser, parser, pratt
+
+
+def measure(title: str, chosen, job, repeat: int = 3) -> float:
+    """
+    The best time of `repeat` runs. As `timeit` does, the garbage collector is disabled while timing:
+    PLY keeps the symbols of its last parse alive, which changes how often full collections happen.
+    """
+
+    def checked():
+        result = job()
+        assert result is not None and not chosen.error_stack
+        return result
+
+    elapsed, _ = timed(checked, repeat, collect=True)
+    print(f"  {title:<16} {elapsed:8.3f} s")
+    return elapsed
+
+
+def compare(title: str, code: str) -> None:
+    print(title)
+    ply = measure("ply", parser, lambda: parser.parse(code, lexer=dfa_lexer))
+    generated = measure(
+        "codegen",
+        generated_parser,
+        lambda: generated_parser.parse(code, lexer=dfa_lexer),
+    )
+    print(f"  speedup: {ply / generated:.2f}x")
+    ply = measure("ply + pratt", parser, lambda: pratt.parse(parser, code, dfa_lexer))
+    generated = measure(
+        "codegen + pratt",
+        generated_parser,
+        lambda: pratt.parse(generated_parser, code, dfa_lexer),
+    )
+    print(f"  speedup: {ply / generated:.2f}x")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--terms", type=int, default=100_000)
+    argparser.add_argument("--lines", type=int, default=20_000)
+    args = argparser.parse_args()
+
+    # The DFA lexer is used in all cases, to measure the parser only.
+    compare(f"{args.terms} terms joined by +", long_expression(args.terms, "+"))
+    compare(f"{args.lines} statements", statements(args.lines, depth=3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Pipeline memory benchmark: compile a program of thousands of functions to RISC-V, generating the TAC of the whole
+program before the backend runs, and one function at a time (`main.step_pipeline`).
+The time and the `tracemalloc` peak of each are reported, and their outputs are checked to be identical.
+
+The parser only accepts `main` so far, thus every function is parsed as a `main` of its own, then renamed,
+and the functions are gathered in one `Program`. The output is hashed as it is written, not to count it as resident.
+"""
+
+import argparse
+import hashlib
+
+import main as driver
+from benchmarks.generate import nested
+from benchmarks.harness import traced
+from frontend.ast.tree import Identifier, Program
+
+ARGS = argparse.Namespace(
+    lexer="dfa", parser="codegen", riscv=True, tac=False, parse=False
+)
+
+
+class HashWriter:
+    def __init__(self) -> None:
+        self.hash = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        self.hash.update(text.encode())
+        return len(text)
+
+
+def program(functions: int, statements: int) -> Program:
+    funcs = []
+    for i in range(functions):
+        driver.reset()
+        func = driver.parseCode(nested(statements, seed=i), ARGS).mainFunc()
+        if i < functions - 1:
+            func.ident = Identifier(f"f{i}")
+        funcs.append(func)
+    return Program(*funcs)
+
+
+def measure(title: str, compile, functions: int, statements: int) -> str:
+    tree = program(functions, statements)
+    driver.reset()
+    out = HashWriter()
+    run = traced(lambda: compile(tree, out))
+    print(f"{title:<16} {run.time:8.3f} s {run.peak / 2**20:10.1f} MiB")
+    return out.hash.hexdigest()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--functions", type=int, default=2000)
+    argparser.add_argument("--statements", type=int, default=5)
+    args = argparser.parse_args()
+
+    print(f"input: {args.functions} functions of {args.statements} statements")
+    print(f"{'':<16} {'time':>10} {'peak':>14}")
+    whole = measure(
+        "whole program",
+        lambda tree, out: driver.step_asm(driver.step_tac(tree), out=out),
+        args.functions,
+        args.statements,
+    )
+    pipelined = measure(
+        "per function",
+        lambda tree, out: driver.step_pipeline(tree, out=out),
+        args.functions,
+        args.statements,
+    )
+    assert whole == pipelined
+
+
+if __name__ == "__main__":
+    main()
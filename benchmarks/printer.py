@@ -0,0 +1,97 @@
+"""
+Assembly printer benchmark: print millions of lines through `AsmCodePrinter`, function by function as the emitter does,
+into a string (`close`), streamed to a file, and with the string concatenation the printer used to do.
+The time and the `tracemalloc` peak of each are reported, and the outputs are checked to be identical.
+
+Concatenating is quadratic at worst, so it only prints the first `--concatenated` lines.
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Callable, Optional, TextIO
+
+from benchmarks.harness import timed, traced
+from utils.asmcodeprinter import AsmCodePrinter
+from utils.riscv import Riscv
+
+# What a function prints per line of its body: a store and a load of the stack, as spilled code does.
+BODY = [
+    Riscv.NativeStoreWord(Riscv.T0, Riscv.SP, 48),
+    Riscv.NativeLoadWord(Riscv.T1, Riscv.SP, 52),
+]
+
+
+class ConcatenatingPrinter(AsmCodePrinter):
+    "The printer as it was: every line is concatenated to the output."
+
+    def __init__(self, out: Optional[TextIO] = None) -> None:
+        super().__init__(out)
+        self.buffer = ""
+
+    def write(self, text: str):
+        self.buffer += text
+
+    def flush(self):
+        pass
+
+    def close(self) -> str:
+        return self.buffer
+
+
+def emit(printer: AsmCodePrinter, lines: int, functionLines: int) -> str:
+    printer.println(".text")
+    printer.println(".global main")
+    for start in range(0, lines, functionLines):
+        printer.printComment(f"function {start // functionLines}")
+        for i in range(min(functionLines, lines - start)):
+            printer.printInstr(BODY[i % len(BODY)])
+        printer.printInstr(Riscv.NativeReturn())
+        printer.flush()
+    return printer.close()
+
+
+def measure(title: str, run: Callable[[], str]) -> str:
+    "Time `run`, then run it again traced by `tracemalloc` for its memory peak, which slows it down."
+    elapsed, output = timed(run)
+    peak = traced(run).peak
+    print(f"{title:<24} {elapsed:8.3f} s {peak / 2**20:10.1f} MiB")
+    return output
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=2_000_000)
+    argparser.add_argument("--function-lines", type=int, default=1000)
+    argparser.add_argument("--concatenated", type=int, default=100_000)
+    args = argparser.parse_args()
+
+    print(f"output: {args.lines} lines, in functions of {args.function_lines}")
+    print(f"{'':<24} {'time':>10} {'peak':>14}")
+    chunked = measure(
+        "string",
+        lambda: emit(AsmCodePrinter(), args.lines, args.function_lines),
+    )
+    print(f"  {len(chunked) / 2**20:.1f} MiB of assembly")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.s")
+
+        def streamed() -> str:
+            with open(path, "w") as f:
+                return emit(AsmCodePrinter(f), args.lines, args.function_lines)
+
+        measure("streamed to a file", streamed)
+        with open(path, "r") as f:
+            assert f.read() == chunked
+
+    lines = min(args.concatenated, args.lines)
+    concatenated = measure(
+        f"concatenated ({lines})",
+        lambda: emit(ConcatenatingPrinter(), lines, args.function_lines),
+    )
+    assert concatenated == emit(AsmCodePrinter(), lines, args.function_lines)
+
+
+if __name__ == "__main__":
+    main()
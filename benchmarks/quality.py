@@ -0,0 +1,216 @@
+"""
+Generated-code quality benchmark: compile every program of the corpus to RISC-V, run it in `simulator`,
+and record per program its static and dynamic instruction counts, stack loads and stores, cycles and frame size.
+
+Results can be stored as a baseline (`--output`), and compared with one (`--baseline`): the benchmark fails
+if a metric of a program grows by more than `--threshold`, or if its exit value changes,
+and summarizes the change of every metric as the geometric mean of its ratios over the programs.
+
+The corpus is the `.c` files under `--corpus` (`minidecaf-tests/testcases` by default). When the directory is missing,
+as when the submodule is not checked out, programs generated by `benchmarks.generate.program` are used instead.
+Programs the compiler does not support yet are reported and skipped. A program that fails to assemble or to run
+in the simulator, and a program of the baseline missing from the results, fail the benchmark.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Any, Optional
+
+import main as driver
+from benchmarks.generate import program
+from benchmarks.scaling import revision
+from simulator import AssemblerError, SimulationError, assemble, run
+
+ARGS = argparse.Namespace(
+    lexer="dfa", parser="codegen", riscv=True, tac=False, parse=False
+)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# All of them are better lower. Every memory access the compiler emits is relative to `sp`.
+METRICS = (
+    "staticInstrs",
+    "dynamicInstrs",
+    "cycles",
+    "stackLoads",
+    "stackStores",
+    "frameSize",
+)
+
+# The generated corpus: (statements, depth, nesting, loops, width), each with a few seeds.
+GENERATED = [
+    (20, 2, 2, 0, 0),
+    (20, 3, 1, 5, 0),
+    (40, 2, 3, 10, 4),
+    (40, 1, 2, 20, 12),
+    (80, 3, 2, 10, 8),
+]
+
+
+def corpus(directory: str) -> dict[str, str]:
+    "The programs to compile, by name."
+    if not os.path.isdir(directory):
+        print(f"{directory} not found, using generated programs", file=sys.stderr)
+        return {
+            f"generated-{'-'.join(map(str, parameters))}-{seed}": program(
+                *parameters, seed=seed
+            )
+            for parameters in GENERATED
+            for seed in range(3)
+        }
+    programs = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".c"):
+                path = os.path.join(dirpath, filename)
+                with open(path, "r") as f:
+                    programs[os.path.relpath(path, directory)] = f.read()
+    return programs
+
+
+# The errors of the programs the compiler does not support yet: the syntax it does not parse, the semantic errors
+# (some programs of the corpus are meant not to compile), and the operators missing from the tables of the TAC generator
+# and of the instruction selection.
+UNSUPPORTED: tuple[type[Exception], ...] = (*driver.DIAGNOSTICS, KeyError)
+
+
+def compileProgram(code: str) -> tuple[str, list[dict[str, Any]]]:
+    "The assembly of a program, and the statistics of its functions."
+    driver.reset()
+    stats: list[dict[str, Any]] = []
+    asm = str(
+        driver.step_asm(driver.step_tac(driver.parseCode(code, ARGS)), stats=stats)
+    )
+    return asm, stats
+
+
+def measure(asm: str, stats: list[dict[str, Any]]) -> dict[str, Any]:
+    assembled = assemble(asm)
+    result = run(assembled)
+    return {
+        "exitValue": result.exitValue,
+        "staticInstrs": len(assembled.instrs),
+        "dynamicInstrs": result.instrs,
+        "cycles": result.cycles,
+        "stackLoads": result.loads,
+        "stackStores": result.stores,
+        "frameSize": sum(function["frameSize"] for function in stats),
+    }
+
+
+def describe(name: str, e: Exception) -> str:
+    "A line reporting the error `e` of a program."
+    message: Optional[str] = str(e).splitlines()[0] if str(e) else None
+    return f"{name}: {type(e).__name__}{f': {message}' if message else ''}"
+
+
+def geomean(ratios: list[float]) -> float:
+    return math.exp(sum(map(math.log, ratios)) / len(ratios)) if ratios else 1.0
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float,
+) -> bool:
+    "Print the changes from `baseline`, and whether none of them is a regression."
+    ok = True
+    for name in baseline:
+        if name not in results:
+            print(f"{name}: missing from the results")
+            ok = False
+    ratios: dict[str, list[float]] = {metric: [] for metric in METRICS}
+    for name, metrics in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if metrics["exitValue"] != old["exitValue"]:
+            print(f"{name}: exit value {old['exitValue']} -> {metrics['exitValue']}")
+            ok = False
+        for metric in METRICS:
+            before, after = old[metric], metrics[metric]
+            if before > 0 and after > 0:
+                ratios[metric].append(after / before)
+            if after > before * (1 + threshold):
+                print(f"{name}: {metric} regressed, {before} -> {after}")
+                ok = False
+
+    print(f"{'metric':<14} {'geomean':>8}")
+    for metric in METRICS:
+        mean = geomean(ratios[metric])
+        change = (
+            f"  {1 - mean:.1%} better"
+            if mean < 1
+            else (f"  {mean - 1:.1%} worse" if mean > 1 else "")
+        )
+        print(f"{metric:<14} {mean:8.3f}{change}")
+    return ok
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument(
+        "--corpus",
+        type=str,
+        default=os.path.join(ROOT_DIR, "minidecaf-tests", "testcases"),
+    )
+    argparser.add_argument(
+        "--output", type=str, help="store the results in this JSON file"
+    )
+    argparser.add_argument(
+        "--baseline", type=str, help="compare with the results stored in this JSON file"
+    )
+    argparser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.0,
+        help="how much a metric may grow, relatively, before it is a regression",
+    )
+    args = argparser.parse_args()
+
+    results: dict[str, dict[str, Any]] = {}
+    skipped: list[str] = []
+    failed: list[str] = []
+    for name, code in corpus(args.corpus).items():
+        try:
+            asm, stats = compileProgram(code)
+        except UNSUPPORTED as e:
+            skipped.append(describe(name, e))
+            continue
+        try:
+            results[name] = measure(asm, stats)
+        except (AssemblerError, SimulationError) as e:
+            failed.append(describe(name, e))
+
+    print(f"{'program':<32} " + " ".join(f"{metric:>13}" for metric in METRICS))
+    for name, metrics in results.items():
+        print(f"{name:<32} " + " ".join(f"{metrics[m]:13}" for m in METRICS))
+    if skipped:
+        print(f"skipped {len(skipped)} programs:")
+        for line in skipped:
+            print(f"  {line}")
+    if failed:
+        print(f"{len(failed)} programs failed in the simulator:")
+        for line in failed:
+            print(f"  {line}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"revision": revision(), "programs": results}, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        print(f"against {baseline.get('revision') or args.baseline}:")
+        if not compare(results, baseline["programs"], args.threshold):
+            sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
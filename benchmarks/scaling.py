@@ -0,0 +1,180 @@
+"""
+Compile-time scaling benchmark: compile generated programs of growing size to RISC-V, measure every pass
+(see `utils.passtimer`), and fit the growth of its time and memory peak against the size, as the exponent `k` of `size^k`.
+A pass whose time grows faster than its declared bound (plus some slack for noise) is flagged.
+
+One parameter of `benchmarks.generate.program` is varied at a time (`--vary`), the others keep their value.
+Results can be stored as JSON (`--output`), and compared with previous ones (`--baseline`).
+"""
+
+import argparse
+import json
+import math
+import platform
+import subprocess
+
+import main as driver
+from benchmarks.generate import program
+from benchmarks.harness import timed
+from utils.passtimer import PassTimer
+
+ARGS = argparse.Namespace(
+    lexer="dfa", parser="codegen", riscv=True, tac=False, parse=False
+)
+
+# The growth each pass is expected to have, as an exponent of the size of its input: all of them should be linear.
+BOUNDS = {
+    "parse": 1.0,
+    "namer": 1.0,
+    "typer": 1.0,
+    "tacgen": 1.0,
+    "selectInstr": 1.0,
+    "buildCFG": 1.0,
+    "liveness": 1.0,
+    "regAlloc": 1.0,
+}
+
+# Passes faster than this at the largest size are too noisy for their growth to be checked.
+MIN_TIME = 0.005
+
+
+def exponent(sizes: list[int], values: list[float]) -> float:
+    "The slope of the least-squares line through the points (log size, log value)."
+    points = [(math.log(x), math.log(y)) for x, y in zip(sizes, values) if y > 0]
+    if len(points) < 2:
+        return 0.0
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    sxy = sum((x - mx) * (y - my) for x, y in points)
+    return sxy / sxx if sxx else 0.0
+
+
+def measure(code: str, repeat: int) -> tuple[dict[str, float], dict[str, int]]:
+    "The best time of every pass over `repeat` runs, then its memory peak, in a separate run traced by `tracemalloc`."
+    times: dict[str, float] = {}
+    for _ in range(repeat):
+        timer = PassTimer()
+        driver.compileCode(code, ARGS, timer)
+        for name, record in timer.totals().items():
+            times[name] = min(times.get(name, math.inf), record.wall)
+
+    timer = PassTimer()
+    timer.start()
+    try:
+        driver.compileCode(code, ARGS, timer)
+    finally:
+        timer.stop()
+    return times, {name: record.peak for name, record in timer.totals().items()}
+
+
+def revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument(
+        "--vary",
+        choices=("statements", "depth", "nesting", "loops", "width"),
+        default="statements",
+    )
+    argparser.add_argument(
+        "--sizes", type=int, nargs="+", default=[200, 400, 800, 1600]
+    )
+    argparser.add_argument("--statements", type=int, default=400)
+    argparser.add_argument("--depth", type=int, default=2)
+    argparser.add_argument("--nesting", type=int, default=2)
+    argparser.add_argument("--loops", type=int, default=40)
+    argparser.add_argument("--width", type=int, default=4)
+    argparser.add_argument("--repeat", type=int, default=1)
+    argparser.add_argument(
+        "--slack",
+        type=float,
+        default=0.25,
+        help="how much the exponent of a pass may exceed its bound before it is flagged",
+    )
+    argparser.add_argument(
+        "--output", type=str, help="store the results in this JSON file"
+    )
+    argparser.add_argument(
+        "--baseline", type=str, help="compare with the results stored in this JSON file"
+    )
+    args = argparser.parse_args()
+
+    parameters = {
+        name: getattr(args, name)
+        for name in ("statements", "depth", "nesting", "loops", "width")
+    }
+    times: dict[str, list[float]] = {name: [] for name in BOUNDS}
+    peaks: dict[str, list[int]] = {name: [] for name in BOUNDS}
+    print(f"varying {args.vary} over {args.sizes}, with {parameters}")
+    for size in args.sizes:
+        code = program(**{**parameters, args.vary: size})
+        elapsed, (sizeTimes, sizePeaks) = timed(lambda: measure(code, args.repeat))
+        for name in BOUNDS:
+            times[name].append(sizeTimes[name])
+            peaks[name].append(sizePeaks[name])
+        print(f"{args.vary} = {size}: {elapsed:.2f} s")
+
+    stages = {}
+    print(
+        f"{'pass':<12} {'time (s)':>10} {'time k':>7} {'peak (MiB)':>11} {'peak k':>7}"
+    )
+    for name, bound in BOUNDS.items():
+        timeK = exponent(args.sizes, times[name])
+        peakK = exponent(args.sizes, peaks[name])
+        checked = times[name][-1] >= MIN_TIME
+        flagged = checked and timeK > bound + args.slack
+        stages[name] = {
+            "times": times[name],
+            "peaks": peaks[name],
+            "timeExponent": timeK,
+            "peakExponent": peakK,
+            "bound": bound,
+            "flagged": flagged,
+        }
+        note = "  exceeds its bound" if flagged else ("" if checked else "  (too fast)")
+        print(
+            f"{name:<12} {times[name][-1]:10.3f} {timeK:7.2f} {peaks[name][-1] / 2**20:11.2f} {peakK:7.2f}{note}"
+        )
+
+    results = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "vary": args.vary,
+        "sizes": args.sizes,
+        "parameters": parameters,
+        "stages": stages,
+    }
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        print(f"against {baseline.get('revision') or args.baseline}:")
+        for key in ("vary", "sizes", "parameters"):
+            if baseline.get(key) != results[key]:
+                print(f"  (the {key} differ: {baseline.get(key)})")
+        for name, stage in stages.items():
+            old = baseline["stages"].get(name)
+            if old is None:
+                continue
+            print(
+                f"{name:<12} time k {old['timeExponent']:5.2f} -> {stage['timeExponent']:5.2f}"
+                f"   time {old['times'][-1]:8.3f} -> {stage['times'][-1]:8.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
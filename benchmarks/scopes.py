@@ -0,0 +1,102 @@
+"""
+Name resolution benchmark: `ScopeStack` against `ShadowingScopeStack`, with scopes nested up to the maximum depth (256).
+
+Every nested scope declares a few variables (some of them shadowing outer ones),
+and a number of identifiers are resolved in it: variables of random enclosing scopes, globals, and undeclared names,
+along with the conflict check of every declaration.
+"""
+
+import argparse
+import random
+
+from benchmarks.harness import timed
+from frontend.scope.scope import Scope, ScopeKind
+from frontend.scope.scopestack import ScopeStack, ShadowingScopeStack
+from frontend.symbol.varsymbol import VarSymbol
+from frontend.type import INT
+
+
+def plan(args: argparse.Namespace, depths: int) -> list[tuple[list[str], list[str]]]:
+    "The names declared and the ones looked up in each nested scope."
+    rng = random.Random(0)
+    scopes = []
+    for depth in range(1, depths):
+        # Every other variable shadows the one of the enclosing scope.
+        declared = [
+            f"v{i}" if i % 2 == 0 else f"v{depth}_{i}" for i in range(args.declarations)
+        ]
+        used = []
+        for _ in range(args.identifiers):
+            kind = rng.random()
+            if kind < 0.6:
+                i = rng.randrange(1, args.declarations, 2)
+                used.append(f"v{rng.randint(1, depth)}_{i}")
+            elif kind < 0.8:
+                used.append(f"v{rng.randrange(0, args.declarations, 2)}")
+            elif kind < 0.95:
+                used.append(f"g{rng.randrange(args.globals)}")
+            else:
+                used.append("undeclared")
+        scopes.append((declared, used))
+    return scopes
+
+
+def run(
+    stackType: type[ScopeStack], args: argparse.Namespace, scopes
+) -> tuple[float, list]:
+    globalscope = Scope(ScopeKind.GLOBAL)
+    for i in range(args.globals):
+        globalscope.declare(VarSymbol(f"g{i}", INT, True))
+    stack = stackType(globalscope)
+    symbols = [[VarSymbol(name, INT) for name in declared] for declared, _ in scopes]
+
+    def resolve() -> list:
+        found = []
+        for (declared, used), declaring in zip(scopes, symbols):
+            stack.open(Scope(ScopeKind.LOCAL))
+            for symbol in declaring:
+                assert stack.findConflict(symbol.name) is None
+                stack.declare(symbol)
+            found.extend(map(stack.lookup, used))
+        for _ in scopes:
+            stack.close()
+        return found
+
+    elapsed, found = timed(resolve)
+
+    # The depth of the scope of every symbol found, to compare the results of both stacks.
+    depths = {id(globalscope): 0}
+    for depth, declaring in enumerate(symbols, 1):
+        for symbol in declaring:
+            depths[id(symbol.domain)] = depth
+    return elapsed, [
+        None if symbol is None else (symbol.name, depths[id(symbol.domain)])
+        for symbol in found
+    ]
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--globals", type=int, default=100)
+    argparser.add_argument("--declarations", type=int, default=8)
+    argparser.add_argument("--identifiers", type=int, default=2000)
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    lookups = (ScopeStack.defaultMaxScopeDepth - 1) * args.identifiers
+    print(f"{lookups} lookups, scopes nested {ScopeStack.defaultMaxScopeDepth} deep")
+    scopes = plan(args, ScopeStack.defaultMaxScopeDepth)
+    results = {}
+    for stackType in (ScopeStack, ShadowingScopeStack):
+        runs = [run(stackType, args, scopes) for _ in range(args.repeat)]
+        best = min(elapsed for elapsed, _ in runs)
+        found = runs[0][1]
+        results[stackType] = found
+        print(
+            f"{stackType.__name__:<20} {best:8.3f} s  {best / lookups * 1e9:6.0f} ns/lookup"
+        )
+    assert results[ScopeStack] == results[ShadowingScopeStack], "resolutions differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compile server benchmark: the latency of compiling a small program to RISC-V
+with a cold `main.py` process, with a `client.py` process talking to a running server (`main.py --serve`),
+and with a request sent directly on the socket, i.e. the time spent by the server itself.
+Requests are also sent concurrently, to check that the outputs do not depend on each other.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.generate import nested
+from benchmarks.harness import report, timed, timings
+from client import request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(script: str, *args: str) -> bytes:
+    return subprocess.run(
+        [sys.executable, script, *args],
+        cwd=ROOT_DIR,
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--runs", type=int, default=20)
+    argparser.add_argument("--lines", type=int, default=10)
+    argparser.add_argument("--concurrency", type=int, default=8)
+    args = argparser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputFile = os.path.join(tmp, "input.c")
+        code = nested(args.lines)
+        with open(inputFile, "w") as f:
+            f.write(code)
+        path = os.path.join(tmp, "server.sock")
+
+        server = subprocess.Popen(
+            [sys.executable, "main.py", "--serve", path], cwd=ROOT_DIR
+        )
+        try:
+            while not os.path.exists(path):
+                time.sleep(0.01)
+
+            cold, expected = timings(
+                lambda: run("main.py", "--input", inputFile, "--riscv"), args.runs
+            )
+            client, output = timings(
+                lambda: run(
+                    "client.py", "--socket", path, "--input", inputFile, "--riscv"
+                ),
+                args.runs,
+            )
+            assert output == expected, "the outputs of the client and main.py differ"
+
+            payload = {"code": code, "mode": "riscv"}
+            direct, response = timings(lambda: request(path, payload), args.runs)
+            assert response["output"].encode() == expected
+
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                elapsed, responses = timed(
+                    lambda: list(
+                        pool.map(lambda _: request(path, payload), range(args.runs))
+                    )
+                )
+                concurrent = elapsed / args.runs
+            assert all(r["output"].encode() == expected for r in responses)
+
+            base = report("cold CLI", cold)
+            print(f"speedup: {base / report('client', client):.2f}x")
+            print(f"speedup: {base / report('request', direct):.2f}x")
+            print(
+                f"{args.concurrency} concurrent requests: {concurrent * 1000:.2f} ms/request"
+            )
+        finally:
+            request(path, {"shutdown": True})
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
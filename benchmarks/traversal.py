@@ -0,0 +1,120 @@
+"""
+AST traversal benchmark: the iterative traversal of `frontend.ast.visitor.IterativeVisitor`
+against the recursive one through `Node.accept` (as `RecursiveVisitor` used to do),
+on a large program and on deep ones, with the default recursion limit.
+"""
+
+import argparse
+import contextlib
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import long_expression, nested
+from benchmarks.harness import timed
+from frontend.ast.visitor import RecursiveVisitor, Visitor, accept
+from frontend.lexer import dfa_lexer
+from frontend.parser import generated_parser
+from frontend.tacgen.tacgen import TACGen
+from frontend.typecheck.namer import Namer
+from utils.printtree import TreePrinter
+
+
+class Recursive(Visitor):
+    "The former `RecursiveVisitor`."
+
+    def visitOther(self, node, ctx):
+        ret = tuple(map(accept(self, ctx), node))
+        return ret if ret and ret.count(None) == len(ret) else None
+
+
+class _Discard:
+    "Swallows the output of `TreePrinter`."
+
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+def count(tree) -> int:
+    nodes = 0
+    stack = [tree]
+    while stack:
+        nodes += 1
+        stack.extend(stack.pop())
+    return nodes
+
+
+def parse(code: str):
+    tree = generated_parser.parse(code, lexer=dfa_lexer)
+    assert tree is not None and not generated_parser.error_stack
+    return tree
+
+
+def traverse(title: str, visit, tree) -> None:
+    try:
+        elapsed, _ = timed(lambda: visit(tree, None))
+    except RecursionError:
+        print(f"  {title:<12} RecursionError")
+        return
+    nodes = count(tree)
+    print(
+        f"  {title:<12} {elapsed:8.3f} s  {elapsed / nodes * 1e9:6.0f} ns/node  ({nodes} nodes)"
+    )
+
+
+def run(title: str, job) -> None:
+    try:
+        elapsed, _ = timed(job)
+    except RecursionError:
+        print(f"  {title:<12} RecursionError")
+        return
+    print(f"  {title:<12} {elapsed:8.3f} s")
+
+
+def compare(title: str, code: str, printTree: bool = True) -> None:
+    """
+    `printTree` is to be turned off for the very deep trees, whose indented dump is quadratic in size.
+    """
+    print(title)
+    traverse("recursive", lambda tree, ctx: tree.accept(Recursive(), ctx), parse(code))
+    traverse("iterative", RecursiveVisitor().run, parse(code))
+
+    def dump():
+        with contextlib.redirect_stdout(_Discard()):
+            TreePrinter(indentLen=2).work(parse(code))
+
+    def passes():
+        tree = Namer().transform(parse(code))
+        TACGen().transform(tree)
+
+    if printTree:
+        run("TreePrinter", dump)
+    run("Namer+TACGen", passes)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=20_000)
+    argparser.add_argument("--terms", type=int, default=100_000)
+    argparser.add_argument("--depth", type=int, default=10_000)
+    args = argparser.parse_args()
+
+    compare(f"{args.lines} statements", nested(args.lines, depth=4))
+    compare(
+        f"{args.terms} terms joined by +",
+        long_expression(args.terms, "+"),
+        printTree=False,
+    )
+    compare(
+        f"{args.depth} nested blocks",
+        "int main() {\n" + "{" * args.depth + "return 0;" + "}" * args.depth + "\n}\n",
+    )
+    compare(
+        f"{args.depth} nested ifs",
+        "int main() {\n" + "if (1) " * args.depth + "return 0;\nreturn 1;\n}\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-node overhead microbenchmark: iterating the children of every node, a `RecursiveVisitor` traversal,
+and `TreePrinter` (with its output discarded), in ns per node, best of a few runs.
+"""
+
+import argparse
+import contextlib
+
+import frontend.ast.tree  # noqa: F401, resolves the import cycle between the AST and the lexer
+from benchmarks.generate import nested
+from benchmarks.harness import timed
+from benchmarks.traversal import _Discard, count, parse
+from frontend.ast.visitor import RecursiveVisitor
+from utils.printtree import TreePrinter
+
+
+def iterate(tree) -> None:
+    stack = [tree]
+    while stack:
+        stack.extend(stack.pop())
+
+
+def visit(tree) -> None:
+    RecursiveVisitor().run(tree, None)
+
+
+def dump(tree) -> None:
+    with contextlib.redirect_stdout(_Discard()):
+        TreePrinter(indentLen=2).work(tree)
+
+
+def measure(title: str, job, tree, nodes: int, repeat: int) -> None:
+    best, _ = timed(lambda: job(tree), repeat, collect=True)
+    print(f"{title:<12} {best:8.3f} s  {best / nodes * 1e9:6.0f} ns/node")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--lines", type=int, default=20_000)
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    tree = parse(nested(args.lines, depth=4))
+    nodes = count(tree)
+    print(f"{args.lines} statements, {nodes} nodes")
+    measure("iterate", iterate, tree, nodes, args.repeat)
+    measure("visit", visit, tree, nodes, args.repeat)
+    measure("TreePrinter", dump, tree, nodes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Client of the compile server (`main.py --serve SOCKET`), taking the same arguments as `main.py`:
+
+    python3 client.py --input <testcase.c> [--riscv/--tac/--parse]
+
+It prints the output and the diagnostics of the server, and exits with the status `main.py` would.
+The socket is given by `--socket`, or else by the MINIDECAF_SOCKET environment variable;
+when no server listens on it, the input is compiled by running `main.py` instead.
+Only the standard library is imported, so that the client starts fast.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def request(path: str, payload: dict) -> dict:
+    with socket.socket(socket.AF_UNIX) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps(payload).encode())
+        connection.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := connection.recv(1 << 16):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="MiniDecaf compiler client")
+    parser.add_argument("--input", type=str, help="the input C file")
+    parser.add_argument("--parse", action="store_true", help="output parsed AST")
+    parser.add_argument("--tac", action="store_true", help="output transformed TAC")
+    parser.add_argument("--riscv", action="store_true", help="output generated RISC-V")
+    parser.add_argument(
+        "--lexer", type=str, default="ply", help="the lexer implementation"
+    )
+    parser.add_argument("--parser", type=str, default="lalr", help="the parser")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=os.environ.get("MINIDECAF_SOCKET"),
+        help="the socket of the server (default: $MINIDECAF_SOCKET)",
+    )
+    parser.add_argument(
+        "--shutdown",
+        action="store_true",
+        help="stop the server, once it has answered the requests it is handling",
+    )
+    args = parser.parse_args()
+    if args.shutdown and args.socket is None:
+        parser.error(
+            "--shutdown needs the socket of the server: --socket or $MINIDECAF_SOCKET"
+        )
+    return args
+
+
+# Run `main.py` in place of the client.
+def fallback(args: argparse.Namespace):
+    argv = [sys.executable, os.path.join(ROOT_DIR, "main.py")]
+    argv += ["--input", args.input, "--lexer", args.lexer, "--parser", args.parser]
+    argv += [f"--{mode}" for mode in ("riscv", "tac", "parse") if getattr(args, mode)]
+    sys.stdout.flush()
+    os.execv(sys.executable, argv)
+
+
+def main():
+    args = parseArgs()
+    if args.shutdown:
+        request(args.socket, {"shutdown": True})
+        return
+
+    mode = next(
+        (mode for mode in ("riscv", "tac", "parse") if getattr(args, mode)), None
+    )
+    if mode is None:
+        return
+    with open(args.input, "r") as f:
+        code = f.read()
+
+    payload = {"code": code, "mode": mode, "lexer": args.lexer, "parser": args.parser}
+    try:
+        if args.socket is None:
+            raise FileNotFoundError
+        response = request(args.socket, payload)
+    except (FileNotFoundError, ConnectionRefusedError):
+        fallback(args)
+
+    sys.stdout.write(response["output"])
+    if response["errors"]:
+        print(response["errors"], file=sys.stderr)
+    exit(response["status"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Module that defines a flat, array-backed storage of the AST, for very large translation units.
+
+A `FlatTree` keeps its nodes in struct-of-arrays form: node `i` has the kind `kinds[i]` (an index into `KINDS`),
+its children are `edges[first[i] : first[i] + count[i]]` (`-1` standing for `NULL`),
+and its payload is `values[i]`: the value of an int literal, the id of an interned identifier, or the code of an operator.
+Thus a node takes a few dozen bytes in a handful of arrays, instead of being a Python object the GC has to track.
+
+The tree is read through views: `tree.view(i)` is an instance of a subclass of the node class of kind `kinds[i]`,
+which reads its children and fields from the arrays, so the passes (and `accept`, `TreePrinter`, ...) work on it unchanged.
+Views are made on the fly and are not kept, thus they must not be compared with `is`,
+and the additional information set on them (`setattr`, `symbol`, `val`, `type`, ...) is stored in the tree, by node.
+The structure of the tree cannot be changed through views.
+
+Trees are built bottom-up: `add` appends a node object along with its subtree,
+and the functions of `constructors` mirror the node constructors, so that the parser can build directly into a tree.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Optional, Sequence, Union
+
+from frontend.type import INT
+
+from .node import NULL, BinaryOp, Node, UnaryOp
+from .tree import *
+
+# Every kind of node, whose index in this tuple is its code in `FlatTree.kinds`.
+KINDS: tuple[type[Node], ...] = (
+    Program,
+    Function,
+    Return,
+    If,
+    While,
+    Break,
+    Block,
+    Declaration,
+    Unary,
+    Binary,
+    Assignment,
+    ConditionExpression,
+    Identifier,
+    IntLiteral,
+    TInt,
+)
+_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+UNARY_OPS = tuple(UnaryOp)
+BINARY_OPS = tuple(BinaryOp)
+_OP_CODES = {
+    **{op: code for code, op in enumerate(UNARY_OPS)},
+    **{op: code for code, op in enumerate(BINARY_OPS)},
+}
+
+_NULL = -1
+
+# An argument of the functions of `FlatTree.constructors`.
+Child = Union[int, Node, "_OpenBlock"]
+
+
+class FlatTree:
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.first = array("I")
+        self.count = array("I")
+        self.values = array("q")
+        self.edges = array("i")
+
+        self.names: list[str] = []
+        self.nameIds: dict[str, int] = {}
+        # Int literals that do not fit in `values`, by node.
+        self.large: dict[int, int] = {}
+        # Additional information on nodes, by name and then by node.
+        self.attrs: dict[str, dict[int, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def view(self, index: int) -> Node:
+        "The node `index`."
+        if index == _NULL:
+            return NULL
+        return _VIEWS[self.kinds[index]](self, index)
+
+    def children(self, index: int) -> list[Node]:
+        first = self.first[index]
+        return list(map(self.view, self.edges[first : first + self.count[index]]))
+
+    def child(self, index: int, position: int) -> Node:
+        return self.view(self.edges[self.first[index] + position])
+
+    def intern(self, name: str) -> int:
+        id = self.nameIds.get(name)
+        if id is None:
+            id = self.nameIds[name] = len(self.names)
+            self.names.append(name)
+        return id
+
+    def append(self, kind: type[Node], value: int, children: Sequence[int]) -> int:
+        "Append a node, whose children have already been appended, and return its index."
+        index = len(self.kinds)
+        self.kinds.append(_CODES[kind])
+        self.first.append(len(self.edges))
+        self.count.append(len(children))
+        try:
+            self.values.append(value)
+        except OverflowError:
+            self.values.append(0)
+            self.large[index] = value
+        self.edges.extend(children)
+        return index
+
+    def add(self, node: Child) -> int:
+        """
+        Append `node` and its subtree, if it is a node object, and return its index.
+        """
+        kind = type(node)
+        if kind is int:
+            return node  # type: ignore
+        if node is NULL:
+            return _NULL
+        # The leaves made by the lexer, which most nodes given to `constructors` are.
+        if kind is IntLiteral:
+            return self.append(IntLiteral, node.value, ())  # type: ignore
+        if kind is Identifier:
+            return self.append(Identifier, self.intern(node.value), ())  # type: ignore
+        if kind is _OpenBlock:
+            return node.close()  # type: ignore
+        return self._addTree(node)  # type: ignore
+
+    def _addTree(self, node: Node) -> int:
+        """
+        Append `node` and its subtree.
+        The subtree is walked with an explicit stack, as it may be deeper than the recursion limit.
+        """
+        # The nodes to append, each followed by whether its children have been appended.
+        stack: list[Any] = [node, False]
+        # The indexes of the nodes appended, whose parent has not been yet.
+        done: list[int] = []
+        while stack:
+            ready = stack.pop()
+            node = stack.pop()
+            if type(node) is int:
+                done.append(node)
+            elif node is NULL:
+                done.append(_NULL)
+            elif isinstance(node, _OpenBlock):
+                done.append(node.close())
+            elif isinstance(node, _View) and node.tree is self:
+                done.append(node.index)
+            elif not ready:
+                stack.append(node)
+                stack.append(True)
+                for child in reversed(node):
+                    stack.append(child)
+                    stack.append(False)
+            else:
+                count = len(node)
+                children = done[len(done) - count :]
+                del done[len(done) - count :]
+                done.append(self.append(type(node), self._value(node), children))
+        return done[0]
+
+    def _value(self, node: Node) -> int:
+        if isinstance(node, IntLiteral):
+            return node.value
+        if isinstance(node, Identifier):
+            return self.intern(node.value)
+        if isinstance(node, (Unary, Binary)):
+            return _OP_CODES[node.op]
+        return 0
+
+    def constructors(self) -> dict[str, Callable[..., Any]]:
+        """
+        Functions named and called like the node constructors of `.tree`, which append the node to this tree
+        and return its index. Their arguments may be indexes of this tree, or node objects, which are appended.
+        `Block` returns an open block, whose `children` can be appended to until it is used as a child.
+        """
+        add = self.add
+        append = self.append
+
+        def node(kind: type[Node], value: int, *children: Child) -> int:
+            return append(kind, value, list(map(add, children)))
+
+        return {
+            "Program": lambda *children: node(Program, 0, *children),
+            "Function": lambda ret_t, ident, body: node(
+                Function, 0, ret_t, ident, body
+            ),
+            "Return": lambda expr: node(Return, 0, expr),
+            "If": lambda cond, then, otherwise=None: node(
+                If, 0, cond, then, NULL if otherwise is None else otherwise
+            ),
+            "While": lambda cond, body: node(While, 0, cond, body),
+            "Break": lambda: node(Break, 0),
+            "Block": lambda *children: _OpenBlock(self, children),
+            "Declaration": lambda var_t, ident, init_expr=None: node(
+                Declaration, 0, var_t, ident, NULL if init_expr is None else init_expr
+            ),
+            "Unary": lambda op, operand: node(Unary, _OP_CODES[op], operand),
+            "Binary": lambda op, lhs, rhs: node(Binary, _OP_CODES[op], lhs, rhs),
+            "Assignment": lambda lhs, rhs: node(
+                Assignment, _OP_CODES[BinaryOp.Assign], lhs, rhs
+            ),
+            "ConditionExpression": lambda cond, then, otherwise: node(
+                ConditionExpression, 0, cond, then, otherwise
+            ),
+            "Identifier": lambda value: append(Identifier, self.intern(value), []),
+            "IntLiteral": lambda value: append(IntLiteral, int(value), []),
+            "TInt": lambda: append(TInt, 0, []),
+        }
+
+
+class _Children(list):
+    "The children of an open block, which are appended to the tree as they are appended to the block."
+
+    __slots__ = ("tree",)
+
+    def __init__(self, tree: FlatTree) -> None:
+        super().__init__()
+        self.tree = tree
+
+    def append(self, child: Child) -> None:
+        super().append(self.tree.add(child))
+
+
+class _OpenBlock:
+    """
+    A block being parsed. Its children are contiguous in `FlatTree.edges`,
+    so the block is only appended once it is complete, i.e. when it becomes a child itself.
+    """
+
+    __slots__ = ("tree", "children", "index")
+
+    def __init__(self, tree: FlatTree, children: tuple[Child, ...]) -> None:
+        self.tree = tree
+        self.children = _Children(tree)
+        self.index: Optional[int] = None
+        for child in children:
+            self.children.append(child)
+
+    def close(self) -> int:
+        if self.index is None:
+            self.index = self.tree.append(Block, 0, self.children)
+        return self.index
+
+
+class _View:
+    """
+    Base class of the views of `FlatTree` nodes. The concrete views are made by `_makeView`.
+    """
+
+    __slots__ = ()
+
+    tree: FlatTree
+    index: int
+
+    def __len__(self) -> int:
+        return self.tree.count[self.index]
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _View)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def setattr(self, name: str, value: Any):
+        self.tree.attrs.setdefault(name, {})[self.index] = value
+
+    def getattr(self, name: str) -> Any:
+        attrs = self.tree.attrs.get(name)
+        return None if attrs is None else attrs.get(self.index, None)
+
+
+def _childProperty(position: int) -> property:
+    return property(lambda self: self.tree.child(self.index, position))
+
+
+def _attrProperty(name: str) -> property:
+    return property(
+        lambda self: self.getattr(name),
+        lambda self, value: self.setattr(name, value),
+    )
+
+
+# Fields of node classes that are computed from `FlatTree.values`, rather than stored along with the additional information.
+_VALUES: dict[type[Node], dict[str, property]] = {
+    Unary: {"op": property(lambda self: UNARY_OPS[self.tree.values[self.index]])},
+    Binary: {"op": property(lambda self: BINARY_OPS[self.tree.values[self.index]])},
+    Identifier: {
+        "value": property(lambda self: self.tree.names[self.tree.values[self.index]])
+    },
+    IntLiteral: {
+        "value": property(
+            lambda self: self.tree.large.get(self.index) or self.tree.values[self.index]
+        )
+    },
+    TInt: {"type": property(lambda self: INT)},
+}
+
+
+def _makeView(kind: type[Node]) -> type[Node]:
+    namespace: dict[str, Any] = {
+        "__slots__": ("tree", "index"),
+        "__module__": __name__,
+        "_children": staticmethod(lambda node: node.tree.children(node.index)),
+    }
+
+    def __init__(self, tree: FlatTree, index: int) -> None:
+        self.tree = tree
+        self.index = index
+
+    namespace["__init__"] = __init__
+
+    if issubclass(kind, ListNode):
+        namespace["children"] = property(lambda self: self._children(self))
+        namespace["__getitem__"] = lambda self, key: self._children(self)[key]
+    else:
+        for position, field in enumerate(kind.fields):
+            namespace[field] = _childProperty(position)
+
+    computed = {}
+    for base in reversed(kind.__mro__):
+        computed.update(_VALUES.get(base, {}))
+    namespace.update(computed)
+    for base in kind.__mro__:
+        for slot in vars(base).get("__slots__", ()):
+            if slot not in namespace and slot != "__weakref__":
+                namespace[slot] = _attrProperty(slot)
+
+    return type(f"Flat{kind.__name__}", (_View, kind), namespace)
+
+
+_VIEWS = tuple(_makeView(kind) for kind in KINDS)
@@ -8,10 +8,25 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from enum import Enum, auto, unique
-from typing import Any, Optional, TypeVar, Union
+from operator import attrgetter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+from weakref import WeakKeyDictionary
 
 from .visitor import Visitor
 
+if TYPE_CHECKING:
+    from frontend.symbol.symbol import Symbol
+    from utils.tac.temp import Temp
+
 _T = TypeVar("_T", bound=Enum)
 
 T = TypeVar("T")
@@ -87,31 +102,75 @@ it's no need to make a enumeration for it.
 """
 
 
+# The additional information on AST nodes (see `Node.setattr`) that the passes use, which get a slot of their own.
+ATTRIBUTES = ("symbol", "val")
+
+# Any other additional information, by node.
+_attrs: WeakKeyDictionary[Node, dict[str, Any]] = WeakKeyDictionary()
+
+
+def _index_len_err(i: int, node: Node):
+    return IndexError(
+        f"you are trying to index the #{i} child of node {node.name}, which has only {len(node)} children"
+    )
+
+
+def _childrenGetter(fields: tuple[str, ...]) -> Callable[[Node], Sequence[Node]]:
+    "A function returning the children of a node, which are held by the attributes `fields`."
+    if not fields:
+        return lambda node: ()
+    if len(fields) == 1:
+        field = fields[0]
+        return lambda node: (getattr(node, field),)
+    return attrgetter(*fields)
+
+
 class Node(ABC):
     """
     Base class of all AST nodes.
+
+    Nodes are slotted to keep large ASTs small: every concrete node class lists its fields in `__slots__`,
+    and its `name` is a class attribute.
+    The children are declared once per class too (see `fields`), so that iterating them allocates no intermediate tuples.
+    The additional information passes store through `setattr`/`getattr` lives in dedicated slots
+    if it is one of `ATTRIBUTES`, and in a side table otherwise.
     """
 
-    def __init__(self, name: str) -> None:
-        """Constructor.
-        `name`: name of this kind of node. Used when represents the node by a string.
-        `_attrs`: used to store additional information on AST nodes.
-        """
-        self.name = name
-        self._attrs = dict[str, Any]()
+    __slots__ = ATTRIBUTES + ("__weakref__",)
+
+    # Name of this kind of node. Used when represents the node by a string.
+    name = "node"
+
+    # Names of the attributes holding the children of this kind of node, in order.
+    # Iterating a node goes through `_children`, which is derived from them once per class.
+    fields: tuple[str, ...] = ()
+    _children: Callable[[Node], Sequence[Node]] = staticmethod(lambda node: ())
+
+    symbol: Optional[Symbol]
+    val: Optional[Temp]
+
+    def __init__(self) -> None:
+        self.symbol = None
+        self.val = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "fields" in vars(cls):
+            cls._children = staticmethod(_childrenGetter(cls.fields))
 
-    @abstractmethod
     def __len__(self) -> int:
         """Returns its children count."""
-        raise NotImplementedError
+        return len(self.fields)
 
-    @abstractmethod
     def __getitem__(self, key: int) -> Node:
         """
         Get one of its children by index.
         Not that children of a AST node are always AST nodes.
         """
-        raise NotImplementedError
+        try:
+            return getattr(self, self.fields[key])
+        except IndexError:
+            raise _index_len_err(key, self) from None
 
     @abstractmethod
     def accept(self, v: Visitor[T, U], ctx: T) -> Optional[U]:
@@ -123,19 +182,27 @@ class Node(ABC):
 
     def setattr(self, name: str, value: Any):
         """Set additional information on AST node."""
-        self._attrs[name] = value
+        if name in ATTRIBUTES:
+            object.__setattr__(self, name, value)
+        else:
+            _attrs.setdefault(self, {})[name] = value
 
     def getattr(self, name: str) -> Any:
         """
         Get additional information on AST node.
         Note that the default return value is `None` when the given name is not present.
         """
-        return self._attrs.get(name, None)
+        if name in ATTRIBUTES:
+            return object.__getattribute__(self, name)
+        attrs = _attrs.get(self)
+        return None if attrs is None else attrs.get(name, None)
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[Node]:
         """Iterates its children."""
-        for i in range(0, len(self)):
-            yield self[i]
+        return iter(self._children(self))
+
+    def __reversed__(self) -> Iterator[Node]:
+        return reversed(self._children(self))
 
     def __bool__(self):
         """
@@ -167,14 +234,9 @@ class NullType(Node):
     You can take `If` in `.tree` as an example.
     """
 
-    def __init__(self) -> None:
-        super().__init__("NULL")
-
-    def __getitem__(self, key: int) -> Node:
-        return super().__getitem__(key)
+    __slots__ = ()
 
-    def __len__(self) -> int:
-        return 0
+    name = "NULL"
 
     def __bool__(self):
         return False
@@ -2,36 +2,37 @@
 Module that defines all AST nodes.
 Reading this file to grasp the basic method of defining a new AST node is recommended.
 Modify this file if you want to add a new AST node.
+A node class lists its attributes in `__slots__`, and the ones holding its children in `fields`.
 """
 
 from __future__ import annotations
 
+from operator import attrgetter
 from typing import Any, Generic, Optional, TypeVar, Union
 
 from frontend.type import INT, DecafType
 from utils import T, U
 
 from .node import NULL, BinaryOp, Node, UnaryOp
-from .visitor import Visitor, accept
+from .visitor import Visitor
 
 _T = TypeVar("_T", bound=Node)
 U = TypeVar("U", covariant=True)
 
 
-def _index_len_err(i: int, node: Node):
-    return IndexError(
-        f"you are trying to index the #{i} child of node {node.name}, which has only {len(node)} children"
-    )
-
-
 class ListNode(Node, Generic[_T]):
     """
     Abstract node type that represents a node sequence.
     E.g. `Block` (sequence of statements).
     """
 
-    def __init__(self, name: str, children: list[_T]) -> None:
-        super().__init__(name)
+    __slots__ = ("children",)
+
+    # The children are the elements of `children`, rather than named fields.
+    _children = staticmethod(attrgetter("children"))
+
+    def __init__(self, children: list[_T]) -> None:
+        super().__init__()
         self.children = children
 
     def __getitem__(self, key: int) -> Node:
@@ -41,8 +42,8 @@ class ListNode(Node, Generic[_T]):
         return len(self.children)
 
     def accept(self, v: Visitor[T, U], ctx: T):
-        ret = tuple(map(accept(v, ctx), self))
-        return None if ret.count(None) == len(ret) else ret
+        ret = [child.accept(v, ctx) for child in self.children]
+        return None if ret.count(None) == len(ret) else tuple(ret)
 
 
 class Program(ListNode["Function"]):
@@ -50,8 +51,13 @@ class Program(ListNode["Function"]):
     AST root. It should have only one children before step9.
     """
 
+    # The global scope is set by the namer.
+    __slots__ = ("globalScope",)
+
+    name = "program"
+
     def __init__(self, *children: Function) -> None:
-        super().__init__("program", list(children))
+        super().__init__(list(children))
 
     def functions(self) -> dict[str, Function]:
         return {func.ident.value: func for func in self if isinstance(func, Function)}
@@ -71,27 +77,22 @@ class Function(Node):
     AST node that represents a function.
     """
 
+    __slots__ = ("ret_t", "ident", "body")
+
+    name = "function"
+    fields = ("ret_t", "ident", "body")
+
     def __init__(
         self,
         ret_t: TypeLiteral,
         ident: Identifier,
         body: Block,
     ) -> None:
-        super().__init__("function")
+        super().__init__()
         self.ret_t = ret_t
         self.ident = ident
         self.body = body
 
-    def __getitem__(self, key: int) -> Node:
-        return (
-            self.ret_t,
-            self.ident,
-            self.body,
-        )[key]
-
-    def __len__(self) -> int:
-        return 3
-
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitFunction(self, ctx)
 
@@ -101,6 +102,8 @@ class Statement(Node):
     Abstract type that represents a statement.
     """
 
+    __slots__ = ()
+
     def is_block(self) -> bool:
         """
         Determine if this type of statement is `Block`.
@@ -113,17 +116,19 @@ class Return(Statement):
     AST node of return statement.
     """
 
+    __slots__ = ("expr",)
+
+    name = "return"
+    fields = ("expr",)
+
     def __init__(self, expr: Expression) -> None:
-        super().__init__("return")
+        super().__init__()
         self.expr = expr
 
     def __getitem__(self, key: Union[int, str]) -> Node:
         if isinstance(key, int):
-            return (self.expr,)[key]
-        return self.__dict__[key]
-
-    def __len__(self) -> int:
-        return 1
+            return super().__getitem__(key)
+        return getattr(self, key)
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitReturn(self, ctx)
@@ -134,20 +139,19 @@ class If(Statement):
     AST node of if statement.
     """
 
+    __slots__ = ("cond", "then", "otherwise")
+
+    name = "if"
+    fields = ("cond", "then", "otherwise")
+
     def __init__(
         self, cond: Expression, then: Statement, otherwise: Optional[Statement] = None
     ) -> None:
-        super().__init__("if")
+        super().__init__()
         self.cond = cond
         self.then = then
         self.otherwise = otherwise or NULL
 
-    def __getitem__(self, key: int) -> Node:
-        return (self.cond, self.then, self.otherwise)[key]
-
-    def __len__(self) -> int:
-        return 3
-
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitIf(self, ctx)
 
@@ -157,17 +161,16 @@ class While(Statement):
     AST node of while statement.
     """
 
+    __slots__ = ("cond", "body")
+
+    name = "while"
+    fields = ("cond", "body")
+
     def __init__(self, cond: Expression, body: Statement) -> None:
-        super().__init__("while")
+        super().__init__()
         self.cond = cond
         self.body = body
 
-    def __getitem__(self, key: int) -> Node:
-        return (self.cond, self.body)[key]
-
-    def __len__(self) -> int:
-        return 2
-
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitWhile(self, ctx)
 
@@ -177,14 +180,12 @@ class Break(Statement):
     AST node of break statement.
     """
 
-    def __init__(self) -> None:
-        super().__init__("break")
+    __slots__ = ()
 
-    def __getitem__(self, key: int) -> Node:
-        raise _index_len_err(key, self)
+    name = "break"
 
-    def __len__(self) -> int:
-        return 0
+    def __init__(self) -> None:
+        super().__init__()
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitBreak(self, ctx)
@@ -198,8 +199,12 @@ class Block(Statement, ListNode[Union["Statement", "Declaration"]]):
     AST node of block "statement".
     """
 
+    __slots__ = ()
+
+    name = "block"
+
     def __init__(self, *children: Union[Statement, Declaration]) -> None:
-        super().__init__("block", list(children))
+        super().__init__(list(children))
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitBlock(self, ctx)
@@ -213,23 +218,22 @@ class Declaration(Node):
     AST node of declaration.
     """
 
+    __slots__ = ("var_t", "ident", "init_expr")
+
+    name = "declaration"
+    fields = ("var_t", "ident", "init_expr")
+
     def __init__(
         self,
         var_t: TypeLiteral,
         ident: Identifier,
         init_expr: Optional[Expression] = None,
     ) -> None:
-        super().__init__("declaration")
+        super().__init__()
         self.var_t = var_t
         self.ident = ident
         self.init_expr = init_expr or NULL
 
-    def __getitem__(self, key: int) -> Node:
-        return (self.var_t, self.ident, self.init_expr)[key]
-
-    def __len__(self) -> int:
-        return 3
-
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitDeclaration(self, ctx)
 
@@ -239,8 +243,10 @@ class Expression(Node):
     Abstract type that represents an evaluable expression.
     """
 
-    def __init__(self, name: str) -> None:
-        super().__init__(name)
+    __slots__ = ("type",)
+
+    def __init__(self) -> None:
+        super().__init__()
         self.type: Optional[DecafType] = None
 
 
@@ -250,16 +256,18 @@ class Unary(Expression):
     Note that the operation type (like negative) is not among its children.
     """
 
+    __slots__ = ("op", "operand")
+
+    fields = ("operand",)
+
     def __init__(self, op: UnaryOp, operand: Expression) -> None:
-        super().__init__(f"unary({op.value})")
+        super().__init__()
         self.op = op
         self.operand = operand
 
-    def __getitem__(self, key: int) -> Node:
-        return (self.operand,)[key]
-
-    def __len__(self) -> int:
-        return 1
+    @property
+    def name(self) -> str:
+        return f"unary({self.op.value})"
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitUnary(self, ctx)
@@ -277,17 +285,19 @@ class Binary(Expression):
     Note that the operation type (like plus or subtract) is not among its children.
     """
 
+    __slots__ = ("lhs", "op", "rhs")
+
+    fields = ("lhs", "rhs")
+
     def __init__(self, op: BinaryOp, lhs: Expression, rhs: Expression) -> None:
-        super().__init__(f"binary({op.value})")
+        super().__init__()
         self.lhs = lhs
         self.op = op
         self.rhs = rhs
 
-    def __getitem__(self, key: int) -> Node:
-        return (self.lhs, self.rhs)[key]
-
-    def __len__(self) -> int:
-        return 2
+    @property
+    def name(self) -> str:
+        return f"binary({self.op.value})"
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitBinary(self, ctx)
@@ -306,6 +316,8 @@ class Assignment(Binary):
     It's actually a kind of binary expression, but it'll make things easier if we use another accept method to handle it.
     """
 
+    __slots__ = ()
+
     def __init__(self, lhs: Identifier, rhs: Expression) -> None:
         super().__init__(BinaryOp.Assign, lhs, rhs)
 
@@ -318,21 +330,23 @@ class ConditionExpression(Expression):
     AST node of condition expression (`?:`).
     """
 
+    __slots__ = ("cond", "then", "otherwise")
+
+    name = "cond_expr"
+    fields = ("cond", "then", "otherwise")
+
     def __init__(
         self, cond: Expression, then: Expression, otherwise: Expression
     ) -> None:
-        super().__init__("cond_expr")
+        super().__init__()
         self.cond = cond
         self.then = then
         self.otherwise = otherwise
 
     def __getitem__(self, key: Union[int, str]) -> Node:
         if isinstance(key, int):
-            return (self.cond, self.then, self.otherwise)[key]
-        return self.__dict__[key]
-
-    def __len__(self) -> int:
-        return 3
+            return super().__getitem__(key)
+        return getattr(self, key)
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitCondExpr(self, ctx)
@@ -350,15 +364,13 @@ class Identifier(Expression):
     AST node of identifier "expression".
     """
 
-    def __init__(self, value: str) -> None:
-        super().__init__("identifier")
-        self.value = value
+    __slots__ = ("value",)
 
-    def __getitem__(self, key: int) -> Node:
-        raise _index_len_err(key, self)
+    name = "identifier"
 
-    def __len__(self) -> int:
-        return 0
+    def __init__(self, value: str) -> None:
+        super().__init__()
+        self.value = value
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitIdentifier(self, ctx)
@@ -375,15 +387,13 @@ class IntLiteral(Expression):
     AST node of int literal like `0`.
     """
 
-    def __init__(self, value: Union[int, str]) -> None:
-        super().__init__("int_literal")
-        self.value = int(value)
+    __slots__ = ("value",)
 
-    def __getitem__(self, key: int) -> Node:
-        raise _index_len_err(key, self)
+    name = "int_literal"
 
-    def __len__(self) -> int:
-        return 0
+    def __init__(self, value: Union[int, str]) -> None:
+        super().__init__()
+        self.value = int(value)
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitIntLiteral(self, ctx)
@@ -400,8 +410,10 @@ class TypeLiteral(Node):
     Abstract node type that represents a type literal like `int`.
     """
 
-    def __init__(self, name: str, _type: DecafType) -> None:
-        super().__init__(name)
+    __slots__ = ("type",)
+
+    def __init__(self, _type: DecafType) -> None:
+        super().__init__()
         self.type = _type
 
     def __str__(self) -> str:
@@ -414,14 +426,12 @@ class TypeLiteral(Node):
 class TInt(TypeLiteral):
     "AST node of type `int`."
 
-    def __init__(self) -> None:
-        super().__init__("type_int", INT)
+    __slots__ = ()
 
-    def __getitem__(self, key: int) -> Node:
-        raise _index_len_err(key, self)
+    name = "type_int"
 
-    def __len__(self) -> int:
-        return 0
+    def __init__(self) -> None:
+        super().__init__(INT)
 
     def accept(self, v: Visitor[T, U], ctx: T):
         return v.visitTInt(self, ctx)
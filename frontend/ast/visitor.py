@@ -2,10 +2,11 @@
 Module that defines the base type of visitor.
 """
 
-
 from __future__ import annotations
 
-from typing import Callable, Protocol, Sequence, TypeVar
+import functools
+import inspect
+from typing import Any, Callable, Generator, Iterator, Protocol, Sequence, TypeVar
 
 from .node import *
 from .tree import *
@@ -74,7 +75,105 @@ class Visitor(Protocol[T, U]):  # type: ignore
         return self.visitOther(that, ctx)
 
 
-class RecursiveVisitor(Visitor[T, U]):
-    def visitOther(self, node: Node, ctx: T) -> Optional[Sequence[Optional[U]]]:
-        ret = tuple(map(accept(self, ctx), node))
+# The methods of `Visitor` that do not fall back to `visitOther` by default.
+_DEFAULTS = {"visitAssignment": "visitBinary"}
+
+
+class _MethodName:
+    "Passed to `Node.accept` instead of a visitor, to find out which method it calls."
+
+    def __getattr__(self, name: str) -> Callable[[Node, Any], str]:
+        return lambda node, ctx: name
+
+
+class IterativeVisitor(Visitor[T, U]):
+    """
+    A visitor whose traversal is not limited by the recursion limit, however deep the tree.
+    It is started on a node by `run`.
+
+    Its `visitXxx` methods visiting children are generators, run on an explicit work stack instead of the Python stack.
+    In such a method, `(yield child)` visits `child` with the same context and evaluates to the result,
+    just as `child.accept(self, ctx)` would. The code before the first `yield` is the pre-order hook of the node kind,
+    the code after the last one its post-order hook. The returned value is the result of the visit.
+    Methods that visit no child (e.g. of leaves) may be plain functions.
+    """
+
+    # Maps a node type to the function visiting it, and whether that function is a generator function.
+    _dispatch: dict[type, tuple[Callable[..., Any], bool]] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, method in list(vars(cls).items()):
+            if name.startswith("visit") and inspect.isgeneratorfunction(method):
+                setattr(cls, name, _drive(method))
+        cls._dispatch = {}
+
+    def run(self, node: Node, ctx: T) -> Any:
+        "Visit `node`, looking up its method in the dispatch table as `walk` does for the children, not through `accept`."
+        method, generator = type(self)._dispatch.get(type(node)) or self._resolve(node)
+        if generator:
+            return walk(self, method(self, node, ctx), ctx)
+        return method(self, node, ctx)
+
+    @classmethod
+    def _resolve(cls, node: Node) -> tuple[Callable[..., Any], bool]:
+        """
+        Find the function visiting `node`, going straight to the fallback for the methods `Visitor` implements,
+        so that nodes visited through `visitOther` do not recurse either.
+        """
+        name = node.accept(_MethodName(), None)  # type: ignore
+        method = getattr(cls, name)
+        while name != "visitOther" and method is getattr(Visitor, name, None):
+            name = _DEFAULTS.get(name, "visitOther")
+            method = getattr(cls, name)
+        generator = getattr(method, "generator", None)
+        entry = cls._dispatch[type(node)] = (
+            (generator, True) if generator is not None else (method, False)
+        )
+        return entry
+
+
+def _drive(generator: Callable[..., Iterator[Node]]) -> Callable[..., Any]:
+    @functools.wraps(generator)
+    def visit(self: IterativeVisitor, node: Node, ctx):
+        return walk(self, generator(self, node, ctx), ctx)
+
+    visit.generator = generator  # type: ignore
+    return visit
+
+
+def walk(visitor: IterativeVisitor[T, U], visit: Iterator[Node], ctx: T) -> Any:
+    "Run the generator `visit` of `visitor`, and every generator it leads to, until it returns."
+    dispatch = type(visitor)._dispatch
+    resolve = type(visitor)._resolve
+    # The generators waiting for the result of the one being run.
+    stack = []
+    value = None
+    while True:
+        try:
+            child = visit.send(value)
+        except StopIteration as stop:
+            value = stop.value
+            if not stack:
+                return value
+            visit = stack.pop()
+            continue
+
+        method, generator = dispatch.get(type(child)) or resolve(child)
+        if generator:
+            stack.append(visit)
+            visit = method(visitor, child, ctx)
+            value = None
+        else:
+            value = method(visitor, child, ctx)
+
+
+class RecursiveVisitor(IterativeVisitor[T, U]):
+    def visitOther(
+        self, node: Node, ctx: T
+    ) -> Generator[Node, Optional[U], Optional[Sequence[Optional[U]]]]:
+        ret = []
+        for child in node:
+            ret.append((yield child))
+        ret = tuple(ret)
         return ret if ret and ret.count(None) == len(ret) else None
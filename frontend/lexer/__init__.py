@@ -10,6 +10,7 @@ from . import lex
 # * replace the '.ply-lexer' by '.xxx' to use your own-defined lexer, where 'xxx' is the module/package name of it
 # * note that your lexer should be iterable, and should have the method 'input' in order to accept the input source file
 from .ply_lexer import lexer as ply_lexer
+from .dfa_lexer import DFALexer
 
 
 class LexToken(Protocol):
@@ -50,10 +51,14 @@ class Lexer(Protocol):
 
 lexer: Lexer = ply_lexer
 
+# A table-driven alternative to the PLY lexer, see `.dfa_lexer`.
+dfa_lexer: Lexer = DFALexer()
+
 __all__ = [
     "lexer",
     "lex",
     "LexToken",
     "Lexer",
     "ply_lexer",
+    "dfa_lexer",
 ]
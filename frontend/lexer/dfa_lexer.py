@@ -0,0 +1,365 @@
+"""
+Module that defines a table-driven lexer, as an alternative to `.ply_lexer`.
+
+The token set of `.lex` is compiled into a DFA over character classes when the first input is tokenized.
+`input` then tokenizes the whole source in one pass into parallel arrays
+(kind codes, start offsets, line numbers), and `token` only materializes a token,
+and the AST leaf carried by identifiers and integers, when the parser asks for it.
+
+The behavior, including line numbering and error recovery, is the same as the PLY lexer's:
+    * ignored newlines, whitespace and comments are not stored;
+    * an unterminated `/* ...` comment is skipped up to its last line, of which every character is a lex error;
+    * a `// ...` comment must be followed by a newline, otherwise its slashes are lexed as `Div`.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Iterator, Optional
+
+from frontend.ast import tree
+from utils.error import DecafLexError
+
+from . import lex
+
+# Token kinds are indexes into `lex.tokens`, followed by the pseudo kinds below.
+TOKENS: tuple[str, ...] = lex.tokens
+KIND_OF: dict[str, int] = {name: kind for kind, name in enumerate(TOKENS)}
+
+_IGNORE = len(TOKENS)
+_NEWLINE = _IGNORE + 1
+_COMMENT = _IGNORE + 2
+_LINE_COMMENT = _IGNORE + 3
+
+IDENTIFIER = KIND_OF["Identifier"]
+INTEGER = KIND_OF["Integer"]
+DIV = KIND_OF["Div"]
+RESERVED: dict[str, int] = {text: KIND_OF[name] for text, name in lex.reserved.items()}
+
+# Character classes. Each operator character gets a class of its own.
+_OTHER, _LETTER, _DIGIT, _SPACE, _LF, _CR = range(6)
+
+# Token rules that are regular expressions in `.lex`, given as (first characters, following characters).
+_RUN_RULES = {
+    IDENTIFIER: (_LETTER, (_LETTER, _DIGIT)),
+    INTEGER: (_DIGIT, (_DIGIT,)),
+    _IGNORE: (_SPACE, (_SPACE,)),
+}
+_RUN_PATTERNS = {
+    _LETTER: "a-zA-Z_",
+    _DIGIT: "0-9",
+    _SPACE: " \\t",
+}
+
+
+def _literals() -> dict[str, int]:
+    """
+    Collect fixed-string tokens from `.lex`, whose patterns have been escaped there,
+    plus the ones that only exist in the lexer: comment openers.
+    """
+    literals = {}
+    for name in TOKENS:
+        pattern = getattr(lex, f"t_{name}", None)
+        if isinstance(pattern, str) and name not in lex.reserved.values():
+            literals[re.sub(r"\\(.)", r"\1", pattern)] = KIND_OF[name]
+    literals["/*"] = _COMMENT
+    literals["//"] = _LINE_COMMENT
+    return literals
+
+
+class _DFA:
+    """
+    Transition table `trans[state * classCount + cls]`, where state 0 is the start state and -1 is the dead state.
+    `accept[state]` is the token kind recognized in `state` (or -1),
+    `skip[state]` is an optional pattern consuming a run of characters that loop on `state`,
+    `final[state]` tells whether no further transition is possible once that run is consumed.
+    """
+
+    def __init__(self) -> None:
+        literals = _literals()
+        chars = sorted({c for text in literals for c in text})
+
+        self.classes = {
+            c: _LETTER for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_"
+        }
+        self.classes.update({c: _DIGIT for c in "0123456789"})
+        self.classes.update({" ": _SPACE, "\t": _SPACE, "\n": _LF, "\r": _CR})
+        for cls, c in enumerate(chars, _CR + 1):
+            self.classes[c] = cls
+        self.classCount = _CR + 1 + len(chars)
+
+        self.trans: list[int] = []
+        self.accept: list[int] = []
+        self.skip: list[Optional[re.Pattern]] = []
+
+        start = self.newState(-1)
+
+        # Newlines: `\r\n?|\n`
+        self.setTrans(start, _LF, self.newState(_NEWLINE))
+        cr = self.newState(_NEWLINE)
+        self.setTrans(start, _CR, cr)
+        self.setTrans(cr, _LF, self.newState(_NEWLINE))
+
+        # Identifiers, integers and whitespace: a first character followed by a run.
+        for kind, (first, follow) in _RUN_RULES.items():
+            state = self.newState(kind)
+            self.setTrans(start, first, state)
+            for cls in follow:
+                self.setTrans(state, cls, state)
+            pattern = "".join(_RUN_PATTERNS[cls] for cls in follow)
+            self.skip[state] = re.compile(f"[{pattern}]*")
+
+        # Fixed strings, organized as a trie.
+        for text, kind in sorted(literals.items()):
+            state = start
+            for c in text:
+                cls = self.classes[c]
+                next = self.trans[state * self.classCount + cls]
+                if next < 0:
+                    next = self.newState(-1)
+                    self.setTrans(state, cls, next)
+                state = next
+            self.accept[state] = kind
+
+        self.final = [
+            all(
+                next < 0 or next == state
+                for next in self.trans[
+                    state * self.classCount : (state + 1) * self.classCount
+                ]
+            )
+            for state in range(len(self.accept))
+        ]
+
+        self.table = str.maketrans(
+            {c: chr(cls) for c, cls in self.classes.items()}
+            | {chr(i): chr(_OTHER) for i in range(128) if chr(i) not in self.classes}
+        )
+
+    def newState(self, kind: int) -> int:
+        self.trans.extend([-1] * self.classCount)
+        self.accept.append(kind)
+        self.skip.append(None)
+        return len(self.accept) - 1
+
+    def setTrans(self, state: int, cls: int, next: int) -> None:
+        self.trans[state * self.classCount + cls] = next
+
+    def classify(self, s: str) -> bytes:
+        "Map every character of `s` to its class."
+        if s.isascii():
+            return s.translate(self.table).encode("ascii")
+        return bytes(self.classes.get(c, _OTHER) for c in s)
+
+
+_dfa: Optional[_DFA] = None
+
+
+def _automaton() -> _DFA:
+    "The DFA of the token set, built on first use."
+    global _dfa
+    if _dfa is None:
+        _dfa = _DFA()
+    return _dfa
+
+
+_NEWLINE_RE = re.compile(r"\r\n?|\n")
+_LINE_END_RE = re.compile(r"[\r\n]")
+
+
+class DFAToken:
+    """
+    A token handed to the parser, compatible with `LexToken`.
+    """
+
+    __slots__ = ("type", "value", "lineno", "lexpos", "lexer")
+
+    def __init__(
+        self, type: str, value, lineno: int, lexpos: int, lexer: DFALexer
+    ) -> None:
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.lexer = lexer
+
+    def __str__(self) -> str:
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class DFALexer:
+    def __init__(self) -> None:
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lineno = 1
+        self.error_stack: list[DecafLexError] = []
+
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.lines = array("I")
+        self.index = 0
+
+    def input(self, s: str) -> None:
+        self.lexdata = s
+        self.lexpos = 0
+        self.lineno = 1
+        self.error_stack = []
+        self.index = 0
+        self.kinds, self.starts, self.lines = self.tokenize(s)
+
+    def tokenize(self, s: str) -> tuple[array, array, array]:
+        """
+        Run the DFA over the whole input with maximal munch.
+        Returns the kind, start offset and line number arrays of the tokens that reach the parser.
+        """
+        kinds = array("B")
+        starts = array("I")
+        lines = array("I")
+        addKind, addStart, addLine = kinds.append, starts.append, lines.append
+
+        dfa = _automaton()
+        trans, accept, skip, final = dfa.trans, dfa.accept, dfa.skip, dfa.final
+        classCount = dfa.classCount
+        reserved = RESERVED
+        # with a sentinel, so that the class after the last character can be looked up
+        classes = dfa.classify(s) + bytes((_OTHER,))
+        n = len(s)
+        pos = 0
+        lineno = 1
+
+        while pos < n:
+            # The first transition and the states that end a token right away are the common case.
+            state = trans[classes[pos]]
+            if state < 0:
+                self.error(pos, lineno)
+                pos += 1
+                continue
+
+            i = pos + 1
+            run = skip[state]
+            if run is not None and trans[state * classCount + classes[i]] == state:
+                i = run.match(s, i).end()
+            kind = accept[state]
+            end = i
+            if not final[state]:
+                while i < n:
+                    state = trans[state * classCount + classes[i]]
+                    if state < 0:
+                        break
+                    i += 1
+                    run = skip[state]
+                    if run is not None:
+                        i = run.match(s, i).end()
+                    if accept[state] >= 0:
+                        kind = accept[state]
+                        end = i
+                    if final[state]:
+                        break
+
+            if kind < 0:
+                self.error(pos, lineno)
+                pos += 1
+            elif kind < _IGNORE:
+                if kind == IDENTIFIER:
+                    kind = reserved.get(s[pos:end], IDENTIFIER)
+                addKind(kind)
+                addStart(pos)
+                addLine(lineno)
+                pos = end
+            elif kind == _IGNORE:
+                pos = end
+            elif kind == _NEWLINE:
+                lineno += 1
+                pos = end
+            elif kind == _COMMENT:
+                pos, lineno = self.skipComment(s, end, lineno)
+            else:
+                m = _LINE_END_RE.search(s, end)
+                if m is not None:
+                    pos = m.start()
+                else:
+                    addKind(DIV)
+                    addStart(pos)
+                    addLine(lineno)
+                    pos += 1
+
+        return kinds, starts, lines
+
+    def skipComment(self, s: str, pos: int, lineno: int) -> tuple[int, int]:
+        end = s.find("*/", pos)
+        if end >= 0:
+            return end + 2, lineno + len(_NEWLINE_RE.findall(s, pos, end))
+
+        # Unterminated: everything is skipped but the last line, whose characters are errors.
+        last = pos
+        for m in _NEWLINE_RE.finditer(s, pos):
+            lineno += 1
+            last = m.end()
+        for i in range(last, len(s)):
+            self.error(i, lineno)
+        return len(s), lineno
+
+    def error(self, pos: int, lineno: int) -> None:
+        self.error_stack.append(
+            DecafLexError(DFAToken("error", self.lexdata[pos], lineno, pos, self))
+        )
+
+    def text(self, index: int) -> str:
+        "Get the source text of the `index`-th token."
+        start = self.starts[index]
+        kind = self.kinds[index]
+        if kind == IDENTIFIER or kind == INTEGER:
+            cls = _LETTER if kind == IDENTIFIER else _DIGIT
+            dfa = _automaton()
+            state = dfa.trans[cls]
+            return self.lexdata[
+                start : dfa.skip[state].match(self.lexdata, start + 1).end()
+            ]
+        return _TEXT[kind]
+
+    def token(self) -> Optional[DFAToken]:
+        index = self.index
+        if index >= len(self.kinds):
+            self.lexpos = len(self.lexdata)
+            return None
+        self.index = index + 1
+
+        kind = self.kinds[index]
+        start = self.starts[index]
+        lineno = self.lines[index]
+        if kind == IDENTIFIER:
+            value = tree.Identifier(self.text(index))
+        elif kind == INTEGER:
+            value = tree.IntLiteral(self.text(index))
+        else:
+            value = _TEXT[kind]
+
+        self.lexpos = start
+        self.lineno = lineno
+        return DFAToken(TOKENS[kind], value, lineno, start, self)
+
+    def __iter__(self) -> Iterator[DFAToken]:
+        return self
+
+    def __next__(self) -> DFAToken:
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+
+def _texts() -> list[str]:
+    texts = [""] * len(TOKENS)
+    for text, kind in _literals().items():
+        if kind < _IGNORE:
+            texts[kind] = text
+    for text, kind in RESERVED.items():
+        texts[kind] = text
+    return texts
+
+
+_TEXT = _texts()
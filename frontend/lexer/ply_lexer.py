@@ -3,14 +3,18 @@ Module that defines a lexer using `ply.lex`.
 It won't make your experiment harder if you don't read it.
 """
 
+import sys
 from functools import wraps
 from typing import List
 
 import ply.lex as lex
 
 from frontend.ast import tree
+from utils import tablecache
 from utils.error import DecafLexError
 
+from . import lex as _lexdef
+
 from .lex import *
 
 error_stack: List[DecafLexError] = []
@@ -67,5 +71,28 @@ def _intlit_into_node(f):
 
 t_Integer = _intlit_into_node(t_Integer)
 
-lexer = lex.lex()
+
+def _build():
+    """
+    Build the lexer, reusing the cached lextab if the token definitions are unchanged.
+    See `utils.tablecache` for details.
+    """
+    module = sys.modules[__name__]
+    if not tablecache.enabled():
+        return lex.lex(module=module)
+
+    name = tablecache.table_name("lextab", _lexdef, module)
+    lextab = tablecache.load(name)
+    if lextab is not None:
+        try:
+            return lex.lex(module=module, optimize=True, lextab=lextab)
+        except ImportError:
+            pass
+
+    lexobj = lex.lex(module=module)
+    tablecache.store(name, lexobj.writetab)
+    return lexobj
+
+
+lexer = _build()
 lexer.error_stack = error_stack  # type: ignore
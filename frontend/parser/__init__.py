@@ -1,9 +1,11 @@
+import types
 from typing import Optional, Protocol, cast
 
 from frontend.ast.tree import Program
 from frontend.lexer import Lexer
 from utils.error import DecafSyntaxError
 
+from . import codegen, flat, pratt
 from .ply_parser import parser as _parser
 
 
@@ -11,13 +13,36 @@ class Parser(Protocol):
     def __init__(self) -> None:
         self.error_stack: list[DecafSyntaxError]
 
-    def parse(self, input: str, lexer: Optional[Lexer] = None) -> Program:
-        ...
+    def parse(self, input: str, lexer: Optional[Lexer] = None) -> Program: ...
 
 
 parser = cast(Parser, _parser)
 
+_generated: Optional[types.ModuleType] = None
+
+
+def generated_module() -> types.ModuleType:
+    """
+    The module generated from the grammar by `.codegen`, loaded on first use only,
+    as it is not needed unless the generated parser is chosen.
+    """
+    global _generated
+    if _generated is None:
+        _generated = codegen.load()
+    return _generated
+
+
+def __getattr__(name: str):
+    # `generated_parser`, the same grammar compiled into a standalone module, is loaded on first use.
+    if name == "generated_parser":
+        return cast(Parser, generated_module().parser)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "parser",
+    "generated_parser",
+    "generated_module",
+    "flat",
+    "pratt",
 ]
@@ -0,0 +1,306 @@
+"""
+Module that generates a parser module from the grammar of `.ply_parser`, to be driven by `.lr.LRParser`.
+
+The LALR tables are taken from PLY, the rest from the source of `.ply_parser`:
+    * every `p_xxx` rule function becomes a function of the values of the right-hand side,
+      where `p[i]` is replaced with the `i`-th argument, and `p[0]` with the returned value;
+    * statements like `helper(p)`, which call a module-level function taking `p`, are replaced with its body;
+    * rules whose action is just `p[0] = p[1]` (e.g. `expression : assignment`) get no function at all;
+    * `p_error`, the other module-level functions and assignments, and the imports are copied over.
+Rule functions may only use `p` as `p[i]`, i.e. positions (`p.lineno(i)`, ...) are not supported.
+
+The generated module is compiled and cached along with the LALR tables (see `utils.tablecache`).
+Run `python3 -m frontend.parser.codegen` to print it.
+"""
+
+import ast
+import inspect
+import re
+import sys
+import types
+
+from frontend.lexer import lex
+from utils import tablecache
+
+from . import ply_parser
+
+# Top-level names of `.ply_parser` that are (re)defined by the generated module.
+_PLY_NAMES = frozenset(("tokens", "parser"))
+# Statements using these names deal with PLY, and are not copied over.
+_PLY_ONLY = frozenset(("yacc", "tablecache"))
+
+
+class CodegenError(Exception):
+    pass
+
+
+class _Positions(ast.NodeTransformer):
+    """
+    Replace `p[i]` with `_i`, and inline the calls to helpers taking `p`.
+    """
+
+    def __init__(self, param: str, length: int, helpers: dict[str, ast.FunctionDef]):
+        self.param = param
+        self.length = length
+        self.helpers = helpers
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        if isinstance(node.value, ast.Name) and node.value.id == self.param:
+            index = node.slice
+            if (
+                not isinstance(index, ast.Constant)
+                or type(index.value) is not int
+                or not 0 <= index.value <= self.length
+            ):
+                raise CodegenError(f"unsupported use of `{ast.unparse(node)}`")
+            return ast.copy_location(ast.Name(f"_{index.value}", node.ctx), node)
+        return self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == self.param:
+            raise CodegenError(f"unsupported use of `{self.param}`")
+        return node
+
+    def visit_Return(self, node: ast.Return) -> ast.AST:
+        if node.value is not None:
+            raise CodegenError("rule functions should not return a value")
+        return ast.copy_location(ast.Return(ast.Name("_0", ast.Load())), node)
+
+    def visit_Expr(self, node: ast.Expr) -> ast.AST:
+        call = node.value
+        if (
+            isinstance(call, ast.Call)
+            and isinstance(call.func, ast.Name)
+            and call.func.id in self.helpers
+            and len(call.args) == 1
+            and not call.keywords
+            and isinstance(call.args[0], ast.Name)
+            and call.args[0].id == self.param
+        ):
+            helper = self.helpers[call.func.id]
+            if any(isinstance(n, ast.Return) for n in ast.walk(helper)):
+                raise CodegenError(f"cannot inline `{helper.name}`, which returns")
+            inner = _Positions(helper.args.args[0].arg, self.length, self.helpers)
+            return [inner.visit(stmt) for stmt in _body(helper)]
+        return self.generic_visit(node)
+
+
+def _body(func: ast.FunctionDef) -> list[ast.stmt]:
+    "The body of `func` without its docstring."
+    body = func.body
+    if ast.get_docstring(func) is not None:
+        body = body[1:]
+    return [stmt for stmt in body if not isinstance(stmt, ast.Pass)]
+
+
+def _takesP(func: ast.FunctionDef) -> bool:
+    args = func.args
+    return (
+        len(args.args) == 1
+        and not args.posonlyargs
+        and not args.kwonlyargs
+        and args.vararg is None
+        and args.kwarg is None
+    )
+
+
+def _action(func: ast.FunctionDef, length: int, helpers) -> list[ast.stmt]:
+    "The action of `func` for a right-hand side of `length` symbols, which computes `_0`."
+    if not _takesP(func):
+        raise CodegenError(f"`{func.name}` should take exactly one argument")
+    positions = _Positions(func.args.args[0].arg, length, helpers)
+    body = []
+    for stmt in _body(func):
+        stmt = positions.visit(stmt)
+        body.extend(stmt if isinstance(stmt, list) else [stmt])
+    return body
+
+
+def _isUnit(body: list[ast.stmt]) -> bool:
+    "Whether the action is `_0 = _1`."
+    return ast.unparse(body) == "_0 = _1"
+
+
+def _reduceFunction(name: str, length: int, body: list[ast.stmt]) -> str:
+    params = ", ".join(f"_{i}" for i in range(1, length + 1))
+    lines = [f"def {name}({params}):"]
+    if not body:
+        lines.append("    return None")
+    elif (
+        len(body) == 1
+        and isinstance(body[0], ast.Assign)
+        and ast.unparse(body[0].targets) == "_0"
+    ):
+        lines.append(f"    return {ast.unparse(body[0].value)}")
+    else:
+        lines.append("    _0 = None")
+        for stmt in body:
+            lines.extend("    " + line for line in ast.unparse(stmt).splitlines())
+        lines.append("    return _0")
+    return "\n".join(lines)
+
+
+def _indexesP(func: ast.FunctionDef) -> bool:
+    param = func.args.args[0].arg
+    return any(
+        isinstance(n, ast.Subscript)
+        and isinstance(n.value, ast.Name)
+        and n.value.id == param
+        for n in ast.walk(func)
+    )
+
+
+def _loads(stmt: ast.stmt, names: frozenset[str]) -> bool:
+    return any(
+        isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load) and n.id in names
+        for n in ast.walk(stmt)
+    )
+
+
+def _preamble(tree: ast.Module, rules: frozenset[str]) -> list[ast.stmt]:
+    """
+    Module-level code of `.ply_parser` that neither defines rules nor deals with PLY.
+    The parser object is bound to `parser` in the generated module too, so that `p_error` can use it.
+    """
+    stmts = []
+    for stmt in tree.body:
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+            continue  # the docstring
+        if isinstance(stmt, ast.FunctionDef) and stmt.name in rules:
+            continue
+        if isinstance(stmt, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+            if any(
+                isinstance(n, ast.Name) and n.id in _PLY_NAMES
+                for target in targets
+                for n in ast.walk(target)
+            ):
+                continue
+        if _loads(stmt, _PLY_ONLY):
+            continue
+        stmts.append(stmt)
+    return stmts
+
+
+def _imports(stmts: list[ast.stmt], code: str) -> list[str]:
+    "The imports among `stmts` that are needed by `code`, i.e. star imports and imports of names it uses."
+    used = set(re.findall(r"\w+", code))
+    imports = []
+    for stmt in stmts:
+        if not isinstance(stmt, (ast.Import, ast.ImportFrom)):
+            continue
+        names = [
+            alias
+            for alias in stmt.names
+            if alias.name == "*" or (alias.asname or alias.name).split(".")[0] in used
+        ]
+        if names:
+            stmt.names = names
+            imports.append(ast.unparse(stmt))
+    return imports
+
+
+def _table(name: str, rows: list[str]) -> str:
+    return "\n".join([f"{name} = (", *(f"    {row}," for row in rows), ")"])
+
+
+def generate() -> str:
+    "Generate the source of the parser module."
+    tree = ast.parse(inspect.getsource(ply_parser))
+    functions = {
+        stmt.name: stmt for stmt in tree.body if isinstance(stmt, ast.FunctionDef)
+    }
+    helpers = {
+        name: func
+        for name, func in functions.items()
+        if not name.startswith("p_") and _takesP(func) and _indexesP(func)
+    }
+
+    lr = ply_parser.parser
+    arities: dict[str, set[int]] = {}
+    for prod in lr.productions[1:]:
+        arities.setdefault(prod.func, set()).add(prod.len)
+
+    reducers: dict[tuple[str, int], str] = {}
+    definitions = []
+    rules = []
+    for number, prod in enumerate(lr.productions):
+        if number == 0:
+            # `S' -> program`, which is accepted rather than reduced.
+            rules.append(f"({prod.name!r}, {prod.len}, None)")
+            continue
+        key = (prod.func, prod.len)
+        if key not in reducers:
+            try:
+                body = _action(functions[prod.func], prod.len, helpers)
+            except CodegenError as e:
+                raise CodegenError(f"{prod.func}: {e}") from None
+            if prod.len == 1 and _isUnit(body):
+                reducers[key] = "None"
+            else:
+                name = prod.func
+                if len(arities[prod.func]) > 1:
+                    name = f"{name}_{prod.len}"
+                reducers[key] = name
+                definitions.append(_reduceFunction(name, prod.len, body))
+        rules.append(f"({prod.name!r}, {prod.len}, {reducers[key]})")
+
+    preamble = _preamble(
+        tree,
+        frozenset(name for name in functions if name.startswith("p_")) - {"p_error"}
+        | frozenset(helpers),
+    )
+    states = range(len(lr.action))
+    errorfunc = "p_error" if "p_error" in functions else "None"
+    chunks = [
+        *(
+            ast.unparse(stmt)
+            for stmt in preamble
+            if not isinstance(stmt, (ast.Import, ast.ImportFrom))
+        ),
+        *definitions,
+        _table("_ACTION", [repr(lr.action[state]) for state in states]),
+        _table("_GOTO", [repr(lr.goto.get(state, {})) for state in states]),
+        _table(
+            "_DEFAULTED", [str(lr.defaulted_states.get(state, 0)) for state in states]
+        ),
+        _table("_RULES", rules),
+        f"parser = LRParser(_ACTION, _GOTO, _DEFAULTED, _RULES, {errorfunc})\n"
+        "parser.error_stack = error_stack",
+    ]
+    header = [
+        f'"""\nGenerated by `frontend.parser.codegen` from `{ply_parser.__name__}`, do not edit.\n"""',
+        "\n".join(
+            [
+                "from frontend.parser.lr import LRParser",
+                *_imports(preamble, "\n".join(chunks)),
+            ]
+        ),
+    ]
+    return "\n\n\n".join(header + chunks) + "\n"
+
+
+def load() -> types.ModuleType:
+    """
+    Generate, or load from the cache, the parser module and run it.
+    """
+    module = types.ModuleType(f"{__package__}.generated")
+    if not tablecache.enabled():
+        source = generate()
+        exec(compile(source, "<generated parser>", "exec"), module.__dict__)
+        return module
+
+    name = tablecache.table_name("lalrparser", lex, ply_parser, sys.modules[__name__])
+    code = tablecache.load_code(name)
+    if code is None:
+        source = generate()
+        code = tablecache.store_code(name, source) or compile(
+            source, "<generated parser>", "exec"
+        )
+    module.__file__ = code.co_filename
+    exec(code, module.__dict__)
+    return module
+
+
+if __name__ == "__main__":
+    print(generate(), end="")
@@ -0,0 +1,65 @@
+"""
+Module that defines a parser building the AST directly into a `frontend.ast.flat.FlatTree`.
+
+It runs the rule functions of the module generated by `.codegen`, which look the node constructors up as globals.
+For every parse, they are copied with globals of their own, where the node constructors are the `constructors`
+of the tree being built, so that the generated module, which the generated parser keeps using, is left as it is.
+Syntax errors are collected by the `error_stack` of the generated parser.
+"""
+
+import types
+from typing import Any, Callable, Optional
+
+from frontend.ast.flat import FlatTree
+from frontend.ast.tree import Program
+from frontend.lexer import Lexer
+
+from .lr import LRParser
+
+
+def parserOf(tree: FlatTree) -> LRParser:
+    "A parser whose rule functions build into `tree`."
+    from . import generated_module
+
+    module = generated_module()
+    namespace = {**vars(module), **tree.constructors()}
+    # Rule functions are shared by the productions of the same rule with the same length.
+    copies: dict[Callable[..., Any], Callable[..., Any]] = {}
+
+    def copy(function: Callable[..., Any]) -> Callable[..., Any]:
+        if function not in copies:
+            copies[function] = types.FunctionType(
+                function.__code__,
+                namespace,
+                function.__name__,
+                function.__defaults__,
+                function.__closure__,
+            )
+        return copies[function]
+
+    generated: LRParser = module.parser
+    parser = LRParser(
+        generated.action,
+        generated.goto,
+        generated.defaulted,
+        tuple(
+            (lhs, length, None if reduce is None else copy(reduce))
+            for lhs, length, reduce in generated.rules
+        ),
+        None if generated.errorfunc is None else copy(generated.errorfunc),
+    )
+    # `p_error` recovers through the parser it is given as `parser`.
+    namespace["parser"] = parser
+    parser.error_stack = generated.error_stack  # type: ignore
+    return parser
+
+
+def parse(input: str, lexer: Optional[Lexer] = None) -> Optional[Program]:
+    """
+    Parse `input` into a new `FlatTree`, and return the view of its root.
+    """
+    tree = FlatTree()
+    root = parserOf(tree).parse(input, lexer=lexer)
+    if root is None:
+        return None
+    return tree.view(tree.add(root))  # type: ignore
@@ -0,0 +1,211 @@
+"""
+Module that defines the runtime of the parsers generated by `.codegen`.
+
+`LRParser` drives LALR tables the way `ply.yacc` does, including its error recovery,
+but keeps the semantic values on a plain list and calls every reduce action with the values of the right-hand side,
+instead of going through a `YaccProduction` and a list of `YaccSymbol`s.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Callable, Optional
+
+from frontend.lexer import LexToken, Lexer
+
+# Same as `ply.yacc.error_count`: number of symbols that must be shifted to leave the error recovery mode.
+ERROR_COUNT = 3
+
+
+class Symbol:
+    """
+    A symbol made up by the parser: the end of input, or an `error` token.
+    Like PLY's `YaccSymbol`, it only has the attributes that have been set.
+    """
+
+    def __init__(self, type: str, value: Any = None) -> None:
+        self.type = type
+        self.value = value
+
+    def __str__(self) -> str:
+        return self.type
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+# A production as seen by the parser: its left-hand side, its length,
+# and its reduce action, or `None` if the production just passes the value of its only symbol on.
+Rule = tuple[str, int, Optional[Callable[..., Any]]]
+
+
+class LRParser:
+    """
+    Parse with LALR tables. States are numbered from 0, which is the start state:
+        * `action[state]` maps a token type to the action, i.e. to shift into state `t` if `t > 0`,
+          to reduce by rule `-t` if `t < 0`, and to accept if `t == 0`;
+        * `goto[state]` maps a nonterminal to the state to go to after reducing it;
+        * `defaulted[state]` is the only action of `state`, if it is a reduction (otherwise 0),
+          which is done without reading the lookahead.
+    """
+
+    def __init__(
+        self,
+        action: tuple[dict[str, int], ...],
+        goto: tuple[dict[str, int], ...],
+        defaulted: tuple[int, ...],
+        rules: tuple[Rule, ...],
+        errorfunc: Optional[Callable[[Optional[LexToken]], Optional[LexToken]]],
+    ) -> None:
+        self.action = action
+        self.goto = goto
+        self.defaulted = defaulted
+        self.rules = rules
+        self.errorfunc = errorfunc
+        self.errorok = True
+
+        # The states entered by shifting `error`, i.e. the ones with an `error` symbol on top of the stack.
+        self.errorStates = frozenset(
+            actions["error"]
+            for actions in action
+            if actions.get("error", -1) > 0  # type: ignore
+        )
+
+    def errok(self) -> None:
+        self.errorok = True
+
+    def parse(self, input: Optional[str] = None, lexer: Optional[Lexer] = None):
+        if lexer is None:
+            from frontend.lexer import lexer
+        if input is not None:
+            lexer.input(input)
+
+        get_token = lexer.token
+        self.token = get_token
+
+        action = self.action
+        goto = self.goto
+        defaulted = self.defaulted
+        rules = self.rules
+
+        states = [0]
+        values: list[Any] = [None]
+        state = 0
+        lookahead = None
+        ltype = "$end"  # the type of `lookahead`
+        lookaheads = []
+        errorcount = 0
+
+        while True:
+            t = defaulted[state]
+            if not t:
+                if lookahead is None:
+                    if lookaheads:
+                        lookahead = lookaheads.pop()
+                    else:
+                        lookahead = get_token()
+                    if lookahead is None:
+                        lookahead = Symbol("$end")
+                    ltype = lookahead.type
+                t = action[state].get(ltype)
+
+            if t is not None:
+                if t > 0:
+                    states.append(t)
+                    state = t
+                    values.append(lookahead.value)
+                    lookahead = None
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    lhs, length, reduce = rules[-t]
+                    if reduce is None:
+                        state = goto[states[-2]][lhs]
+                        states[-1] = state
+                        continue
+
+                    try:
+                        if length:
+                            value = reduce(*values[-length:])
+                        else:
+                            value = reduce()
+                    except SyntaxError:
+                        # Enter the error recovery mode, as PLY does.
+                        lookaheads.append(lookahead)
+                        if length:
+                            values.pop()
+                        states.pop()
+                        state = states[-1]
+                        lookahead = Symbol("error", "error")
+                        ltype = "error"
+                        errorcount = ERROR_COUNT
+                        self.errorok = False
+                        continue
+
+                    if length:
+                        del states[-length:]
+                        values[-length:] = (value,)
+                    else:
+                        values.append(value)
+                    state = goto[states[-1]][lhs]
+                    states.append(state)
+                    continue
+
+                return values[-1]
+
+            # A syntax error. The recovery is the one of `ply.yacc`, see its documentation.
+            if errorcount == 0 or self.errorok:
+                errorcount = ERROR_COUNT
+                self.errorok = False
+                errtoken = None if lookahead.type == "$end" else lookahead
+                if self.errorfunc is not None:
+                    if errtoken is not None and not hasattr(errtoken, "lexer"):
+                        errtoken.lexer = lexer
+                    tok = self.errorfunc(errtoken)
+                    if self.errorok:
+                        lookahead = tok
+                        if tok is not None:
+                            ltype = tok.type
+                        continue
+                elif errtoken is not None:
+                    lineno = getattr(errtoken, "lineno", 0)
+                    if lineno:
+                        sys.stderr.write(
+                            f"yacc: Syntax error at line {lineno}, token={errtoken.type}\n"
+                        )
+                    else:
+                        sys.stderr.write(f"yacc: Syntax error, token={errtoken.type}")
+                else:
+                    sys.stderr.write("yacc: Parse error in input. EOF\n")
+                    return None
+            else:
+                errorcount = ERROR_COUNT
+
+            if len(states) <= 1 and lookahead.type != "$end":
+                lookahead = None
+                state = 0
+                lookaheads.clear()
+                continue
+
+            if lookahead.type == "$end":
+                return None
+
+            if lookahead.type != "error":
+                if states[-1] in self.errorStates:
+                    lookahead = None
+                    continue
+
+                error = Symbol("error", lookahead)
+                if hasattr(lookahead, "lineno"):
+                    error.lineno = error.endlineno = lookahead.lineno
+                if hasattr(lookahead, "lexpos"):
+                    error.lexpos = error.endlexpos = lookahead.lexpos
+                lookaheads.append(lookahead)
+                lookahead = error
+                ltype = "error"
+            else:
+                values.pop()
+                states.pop()
+                state = states[-1]
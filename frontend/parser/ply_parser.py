@@ -11,13 +11,17 @@ Refer to https://www.dabeaz.com/ply/ply.html for more details.
 """
 
 
+import sys
+
 import ply.yacc as yacc
 
 from frontend.ast.tree import *
 from frontend.lexer import lex
+from utils import get_line, tablecache
 from utils.error import DecafSyntaxError
 
-tokens = lex.tokens
+# `Expression` is never produced by the lexer, see `.pratt`.
+tokens = lex.tokens + ("Expression",)
 error_stack = list[DecafSyntaxError]()
 
 
@@ -244,6 +248,13 @@ def p_identifier_expression(p):
     p[0] = p[1]
 
 
+def p_pratt_expression(p):
+    """
+    primary : Expression
+    """
+    p[0] = p[1]
+
+
 def p_brace_expression(p):
     """
     primary : LParen expression RParen
@@ -260,11 +271,50 @@ def p_error(t):
         return
 
     inp = t.lexer.lexdata
-    error_stack.append(DecafSyntaxError(t, f"\n{inp.splitlines()[t.lineno - 1]}"))
+    error_stack.append(DecafSyntaxError(t, f"\n{get_line(inp, t.lineno)}"))
 
     parser.errok()
     return parser.token()
 
 
-parser = yacc.yacc(start="program")
+def _build():
+    """
+    Build the parser, reusing the cached LALR tables if the grammar and the tokens are unchanged.
+    See `utils.tablecache` for details.
+    """
+    module = sys.modules[__name__]
+    if not tablecache.enabled():
+        return yacc.yacc(module=module, start="program")
+
+    name = tablecache.table_name("parsetab", lex, module)
+    parsetab = tablecache.load(name)
+    if parsetab is not None:
+        return yacc.yacc(
+            module=module,
+            start="program",
+            debug=False,
+            optimize=True,
+            write_tables=False,
+            tabmodule=parsetab,
+        )
+
+    built = []
+    tablecache.store(
+        name,
+        lambda tabmodule, outputdir: built.append(
+            yacc.yacc(
+                module=module,
+                start="program",
+                debug=False,
+                tabmodule=tabmodule,
+                outputdir=outputdir,
+            )
+        ),
+    )
+    if built:
+        return built[0]
+    return yacc.yacc(module=module, start="program", debug=False, write_tables=False)
+
+
+parser = _build()
 parser.error_stack = error_stack  # type: ignore
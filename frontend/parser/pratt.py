@@ -0,0 +1,341 @@
+"""
+Module that defines a precedence-climbing (Pratt) parser for expressions.
+
+With the LALR grammar in `.ply_parser`, every literal or identifier goes through the 14-level chain
+`expression -> assignment -> conditional -> ... -> postfix -> primary`, i.e. 14 reductions, each of them a Python callback.
+Instead, `ExpressionLexer` sits between the lexer and the LALR parser: wherever an expression may start,
+it parses the whole expression by precedence climbing and hands it to the LALR parser as a single `Expression` token,
+which the grammar accepts as a `primary`. Statements are still parsed by the LALR grammar.
+
+Anything the precedence climbing parser does not accept is passed through token by token,
+and so are expressions nested more deeply than `MAX_DEPTH`, so that it never runs out of stack.
+Grouping does not change whether a program is accepted, nor the resulting AST,
+but the error recovery of the LALR parser would go differently after the first syntax error.
+Thus `parse` parses erroneous input a second time without grouping, to report the very same diagnostics.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import deque
+from typing import Optional
+
+from frontend.ast.node import BinaryOp, UnaryOp
+from frontend.ast.tree import (
+    Assignment,
+    Binary,
+    ConditionExpression,
+    Expression,
+    Program,
+    Unary,
+)
+from frontend.lexer import LexToken, Lexer
+
+EXPRESSION = "Expression"
+
+# Binding power of binary operators, from loosest to tightest. All of them are left-associative.
+# `=` and `?:` are handled separately, as they are right-associative and restricted by the grammar.
+PRECEDENCE: dict[BinaryOp, int] = {
+    BinaryOp.LogicOr: 1,
+    BinaryOp.LogicAnd: 2,
+    BinaryOp.BitOr: 3,
+    BinaryOp.Xor: 4,
+    BinaryOp.BitAnd: 5,
+    BinaryOp.EQ: 6,
+    BinaryOp.NE: 6,
+    BinaryOp.LT: 7,
+    BinaryOp.GT: 7,
+    BinaryOp.LE: 7,
+    BinaryOp.GE: 7,
+    BinaryOp.Add: 8,
+    BinaryOp.Sub: 8,
+    BinaryOp.Mul: 9,
+    BinaryOp.Div: 9,
+    BinaryOp.Mod: 9,
+}
+
+# Token types that are binary/unary operators, mapped to the operator and its binding power.
+_BINARY: dict[str, tuple[BinaryOp, int]] = {}
+_UNARY: dict[str, UnaryOp] = {}
+
+
+def _operatorTables() -> None:
+    from frontend.lexer import lex
+
+    for name in lex.tokens:
+        pattern = getattr(lex, f"t_{name}", None)
+        if not isinstance(pattern, str):
+            continue
+        text = pattern.replace("\\", "")
+        try:
+            op = BinaryOp.backward_search(text)
+        except KeyError:
+            pass
+        else:
+            if op in PRECEDENCE:
+                _BINARY[name] = (op, PRECEDENCE[op])
+        try:
+            _UNARY[name] = UnaryOp.backward_search(text)
+        except KeyError:
+            pass
+
+
+_operatorTables()
+
+# Tokens that may start an expression.
+_STARTS = frozenset(("Identifier", "Integer", "LParen")) | frozenset(_UNARY)
+
+# An expression may not start right after these tokens:
+# the identifier of a declaration follows `Int`, the parenthesis of a condition follows `If`/`While`.
+_NO_EXPRESSION_AFTER = {
+    "Identifier": frozenset(("Int",)),
+    "Integer": frozenset(),
+    "LParen": frozenset(("If", "While")),
+}
+
+
+# The deepest nesting of parentheses and of operators of increasing precedence parsed by precedence climbing,
+# each level of which takes a few frames of `assignment`, `climb`, `unary` and `primary`.
+MAX_DEPTH = sys.getrecursionlimit() // 8
+
+
+class _Backtrack(Exception):
+    pass
+
+
+class ExpressionToken:
+    """
+    The token standing for a whole expression.
+    Its position is the one of its first token, `tokens` are the tokens it is made of.
+    """
+
+    def __init__(
+        self, value: Expression, tokens: list[LexToken], lexer: ExpressionLexer
+    ) -> None:
+        self.type = EXPRESSION
+        self.value = value
+        self.lineno = tokens[0].lineno
+        self.lexpos = tokens[0].lexpos
+        self.lexer = lexer
+        self.tokens = tokens
+
+    def __str__(self) -> str:
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class ExpressionLexer:
+    """
+    A `Lexer` wrapping another one, which groups expressions into `Expression` tokens.
+    """
+
+    def __init__(self, lexer: Lexer) -> None:
+        self.lexer = lexer
+        self.pending: deque[LexToken] = deque()
+        self.raw = 0
+        self.prev: Optional[str] = None
+        self.depth = 0
+
+    @property
+    def lexdata(self) -> str:
+        return self.lexer.lexdata
+
+    @property
+    def lexpos(self) -> int:
+        return self.lexer.lexpos
+
+    @property
+    def lineno(self) -> int:
+        return self.lexer.lineno
+
+    @property
+    def error_stack(self):
+        return self.lexer.error_stack
+
+    def input(self, s: str) -> None:
+        self.lexer.input(s)
+        self.pending.clear()
+        self.raw = 0
+        self.prev = None
+
+    def token(self):
+        t = self.next()
+        if t is None:
+            return None
+
+        if (
+            self.raw == 0
+            and t.type in _STARTS
+            and self.prev not in _NO_EXPRESSION_AFTER.get(t.type, ())
+        ):
+            self.pending.appendleft(t)
+            self.consumed: list[LexToken] = []
+            self.depth = 0
+            try:
+                node = self.assignment()
+            except _Backtrack:
+                # Not an expression (or an erroneous one, or one nested too deeply): hand the tokens over one by one.
+                self.pending.extendleft(reversed(self.consumed))
+                self.raw = len(self.consumed)
+                t = self.next()
+            else:
+                t = ExpressionToken(node, self.consumed, self)
+            del self.consumed
+
+        if self.raw:
+            self.raw -= 1
+        self.prev = t.type
+        return t
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+    # Token stream helpers.
+
+    def next(self) -> Optional[LexToken]:
+        if self.pending:
+            return self.pending.popleft()
+        return self.lexer.token()
+
+    def peek(self) -> Optional[LexToken]:
+        if not self.pending:
+            t = self.lexer.token()
+            if t is None:
+                return None
+            self.pending.append(t)
+        return self.pending[0]
+
+    def take(self) -> LexToken:
+        t = self.pending.popleft()
+        self.consumed.append(t)
+        return t
+
+    def expect(self, type: str) -> LexToken:
+        t = self.peek()
+        if t is None or t.type != type:
+            raise _Backtrack
+        return self.take()
+
+    # Expression parser. Each method corresponds to a nonterminal of the grammar.
+    # The right-recursive rules are parsed by loops: only parentheses and `climb` recurse, counted by `depth`.
+
+    def assignment(self) -> Expression:
+        "assignment : conditional | Identifier Assign expression"
+        targets = []
+        while True:
+            t = self.peek()
+            if t is None:
+                raise _Backtrack
+            if t.type != "Identifier":
+                expr = self.conditional(self.climb(self.unary(), 1))
+                break
+            self.take()
+            after = self.peek()
+            if after is None or after.type != "Assign":
+                expr = self.conditional(self.climb(t.value, 1))
+                break
+            self.take()
+            targets.append(t.value)
+        for target in reversed(targets):
+            expr = Assignment(target, expr)
+        return expr
+
+    def conditional(self, cond: Expression) -> Expression:
+        "conditional : logical_or | logical_or Question expression Colon conditional"
+        branches = []
+        while True:
+            t = self.peek()
+            if t is None or t.type != "Question":
+                break
+            self.take()
+            then = self.assignment()
+            self.expect("Colon")
+            branches.append((cond, then))
+            cond = self.climb(self.unary(), 1)
+        for branch, then in reversed(branches):
+            cond = ConditionExpression(branch, then, cond)
+        return cond
+
+    def climb(self, lhs: Expression, minPower: int) -> Expression:
+        "Binary operators, from `logical_or` to `multiplicative`."
+        while True:
+            t = self.peek()
+            entry = _BINARY.get(t.type) if t is not None else None
+            if entry is None or entry[1] < minPower:
+                return lhs
+            op, power = entry
+            self.take()
+            rhs = self.unary()
+            while True:
+                t = self.peek()
+                next = _BINARY.get(t.type) if t is not None else None
+                if next is None or next[1] <= power:
+                    break
+                if self.depth == MAX_DEPTH:
+                    raise _Backtrack
+                self.depth += 1
+                rhs = self.climb(rhs, next[1])
+                self.depth -= 1
+            lhs = Binary(op, lhs, rhs)
+
+    def unary(self) -> Expression:
+        "unary : primary | Minus unary | BitNot unary | Not unary"
+        ops = []
+        while True:
+            t = self.peek()
+            if t is None:
+                raise _Backtrack
+            op = _UNARY.get(t.type)
+            if op is None:
+                break
+            self.take()
+            ops.append(op)
+        expr = self.primary()
+        for op in reversed(ops):
+            expr = Unary(op, expr)
+        return expr
+
+    def primary(self) -> Expression:
+        "primary : Integer | Identifier | LParen expression RParen"
+        t = self.peek()
+        if t.type == "Integer" or t.type == "Identifier":
+            return self.take().value
+        if t.type == "LParen":
+            if self.depth == MAX_DEPTH:
+                raise _Backtrack
+            self.take()
+            self.depth += 1
+            expr = self.assignment()
+            self.depth -= 1
+            self.expect("RParen")
+            return expr
+        raise _Backtrack
+
+
+def parse(parser, input: str, lexer: Lexer) -> Program:
+    """
+    Parse `input` with `parser`, whose grammar must accept `Expression` tokens as `primary`.
+    On syntax errors, the diagnostics are the ones of parsing token by token.
+    """
+    syntaxErrors = len(parser.error_stack)
+    lexErrors = len(lexer.error_stack)
+    lineno = lexer.lineno
+
+    r = parser.parse(input, lexer=ExpressionLexer(lexer))
+    if len(parser.error_stack) == syntaxErrors:
+        return r
+
+    del parser.error_stack[syntaxErrors:]
+    del lexer.error_stack[lexErrors:]
+    lexer.lineno = lineno
+    if hasattr(lexer, "begin"):
+        lexer.begin("INITIAL")  # type: ignore
+    return parser.parse(input, lexer=lexer)
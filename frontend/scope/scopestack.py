@@ -1,3 +1,4 @@
+import sys
 from typing import Optional
 
 from frontend.symbol.symbol import Symbol
@@ -82,3 +83,73 @@ class ScopeStack:
 
     def inLoop(self) -> None:
         return self.loopDepth > 0
+
+
+class ShadowingScopeStack(ScopeStack):
+    """
+    A scope stack which also keeps, for every name, the stack of the symbols it denotes in the open scopes,
+    innermost last. Thus `lookup` and `findConflict` take a single dict probe, however deep the scopes are nested.
+
+    The scopes themselves are maintained as by `ScopeStack`, and are left to the later phases.
+    Symbols have to be declared through `declare`, not on the scopes directly,
+    but the symbols a scope already holds when it is opened are taken into account.
+    """
+
+    def __init__(
+        self, globalscope: Scope, scopeDepth: int = ScopeStack.defaultMaxScopeDepth
+    ) -> None:
+        super().__init__(globalscope, scopeDepth)
+        # Name -> (depth of the scope, symbol) of the symbols the name denotes, innermost last.
+        self.active: dict[str, list[tuple[int, Symbol]]] = {}
+        # The names declared in each open scope, to forget them when the scope is closed.
+        self.declared: list[list[str]] = [[]]
+        self._index(globalscope)
+
+    # To record the symbols already in the newly opened scope.
+    def _index(self, scope: Scope) -> None:
+        for symbol in scope.symbols.values():
+            self._push(symbol)
+
+    def _push(self, symbol: Symbol) -> None:
+        name = sys.intern(symbol.name)
+        depth = len(self.stack) - 1
+        symbols = self.active.get(name)
+        if symbols is None:
+            self.active[name] = [(depth, symbol)]
+        elif symbols[-1][0] == depth:
+            # Redeclared in the same scope, which replaces the symbol as `Scope.declare` does.
+            symbols[-1] = (depth, symbol)
+            return
+        else:
+            symbols.append((depth, symbol))
+        self.declared[-1].append(name)
+
+    def open(self, scope: Scope) -> None:
+        super().open(scope)
+        self.declared.append([])
+        self._index(scope)
+
+    def close(self) -> None:
+        active = self.active
+        for name in self.declared.pop():
+            symbols = active[name]
+            symbols.pop()
+            if not symbols:
+                del active[name]
+        super().close()
+
+    def declare(self, symbol: Symbol) -> None:
+        super().declare(symbol)
+        self._push(symbol)
+
+    def findConflict(self, name: str) -> Optional[Symbol]:
+        symbols = self.active.get(name)
+        if symbols is not None and symbols[-1][0] == len(self.stack) - 1:
+            return symbols[-1][1]
+        return None
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        symbols = self.active.get(name)
+        if symbols is not None:
+            return symbols[-1][1]
+        return None
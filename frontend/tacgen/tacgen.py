@@ -1,12 +1,15 @@
+from typing import Iterator
+
 import utils.riscv as riscv
 from frontend.ast import node
 from frontend.ast.tree import *
-from frontend.ast.visitor import Visitor
+from frontend.ast.visitor import IterativeVisitor
 from frontend.symbol.varsymbol import VarSymbol
 from frontend.type.array import ArrayType
 from utils.tac import tacop
 from utils.tac.funcvisitor import FuncVisitor
 from utils.tac.programwriter import ProgramWriter
+from utils.tac.tacfunc import TACFunc
 from utils.tac.tacprog import TACProg
 from utils.tac.temp import Temp
 
@@ -15,30 +18,60 @@ The TAC generation phase: translate the abstract syntax tree into three-address
 """
 
 
-class TACGen(Visitor[FuncVisitor, None]):
+# Children are visited by `yield child` rather than `child.accept(self, mv)`, see `IterativeVisitor`.
+class TACGen(IterativeVisitor[FuncVisitor, None]):
     def __init__(self) -> None:
         pass
 
     # Entry of this phase
     def transform(self, program: Program) -> TACProg:
-        mainFunc = program.mainFunc()
-        pw = ProgramWriter(["main"])
-        # The function visitor of 'main' is special.
-        mv = pw.visitMainFunc()
-
-        mainFunc.body.accept(self, mv)
-        # Remember to call mv.visitEnd after the translation a function.
-        mv.visitEnd()
+        funcs = program.functions()
+        pw = ProgramWriter(list(funcs))
+        for func in funcs.values():
+            self.translate(pw, func).visitEnd()
 
         # Remember to call pw.visitEnd before finishing the translation phase.
         return pw.visitEnd()
 
-    def visitBlock(self, block: Block, mv: FuncVisitor) -> None:
+    # Translate the functions one at a time, each yielded as soon as it is translated,
+    # so that the backend can compile it and drop it before the next one is (see `Asm.transformFuncs`).
+    def functions(self, program: Program) -> Iterator[TACFunc]:
+        funcs = program.functions()
+        pw = ProgramWriter(list(funcs))
+        for func in funcs.values():
+            yield pw.takeFunc(self.translate(pw, func))
+        pw.visitEnd()
+
+    # Translate the body of func, with the function visitor returned, yet to be ended.
+    def translate(self, pw: ProgramWriter, func: Function) -> FuncVisitor:
+        name = func.ident.value
+        # The function visitor of 'main' is special.
+        if name == "main":
+            mv = pw.visitMainFunc()
+        else:
+            symbol = func.getattr("symbol")
+            mv = pw.visitFunc(name, 0 if symbol is None else symbol.parameterNum)
+        self.run(func.body, mv)
+        self.release(func.body)
+        return mv
+
+    # Clear the 'val' attributes set in the translation of a function body:
+    # the temps are only needed while their function is translated.
+    @staticmethod
+    def release(body: Node) -> None:
+        stack = [body]
+        while stack:
+            node = stack.pop()
+            if node.getattr("val") is not None:
+                node.setattr("val", None)
+            stack.extend(node)
+
+    def visitBlock(self, block: Block, mv: FuncVisitor) -> Iterator[Node]:
         for child in block:
-            child.accept(self, mv)
+            yield child
 
-    def visitReturn(self, stmt: Return, mv: FuncVisitor) -> None:
-        stmt.expr.accept(self, mv)
+    def visitReturn(self, stmt: Return, mv: FuncVisitor) -> Iterator[Node]:
+        yield stmt.expr
         mv.visitReturn(stmt.expr.getattr("val"))
 
     def visitBreak(self, stmt: Break, mv: FuncVisitor) -> None:
@@ -66,15 +99,15 @@ class TACGen(Visitor[FuncVisitor, None]):
         """
         pass
 
-    def visitIf(self, stmt: If, mv: FuncVisitor) -> None:
-        stmt.cond.accept(self, mv)
+    def visitIf(self, stmt: If, mv: FuncVisitor) -> Iterator[Node]:
+        yield stmt.cond
 
         if stmt.otherwise is NULL:
             skipLabel = mv.freshLabel()
             mv.visitCondBranch(
                 tacop.CondBranchOp.BEQ, stmt.cond.getattr("val"), skipLabel
             )
-            stmt.then.accept(self, mv)
+            yield stmt.then
             mv.visitLabel(skipLabel)
         else:
             skipLabel = mv.freshLabel()
@@ -82,30 +115,30 @@ class TACGen(Visitor[FuncVisitor, None]):
             mv.visitCondBranch(
                 tacop.CondBranchOp.BEQ, stmt.cond.getattr("val"), skipLabel
             )
-            stmt.then.accept(self, mv)
+            yield stmt.then
             mv.visitBranch(exitLabel)
             mv.visitLabel(skipLabel)
-            stmt.otherwise.accept(self, mv)
+            yield stmt.otherwise
             mv.visitLabel(exitLabel)
 
-    def visitWhile(self, stmt: While, mv: FuncVisitor) -> None:
+    def visitWhile(self, stmt: While, mv: FuncVisitor) -> Iterator[Node]:
         beginLabel = mv.freshLabel()
         loopLabel = mv.freshLabel()
         breakLabel = mv.freshLabel()
         mv.openLoop(breakLabel, loopLabel)
 
         mv.visitLabel(beginLabel)
-        stmt.cond.accept(self, mv)
+        yield stmt.cond
         mv.visitCondBranch(tacop.CondBranchOp.BEQ, stmt.cond.getattr("val"), breakLabel)
 
-        stmt.body.accept(self, mv)
+        yield stmt.body
         mv.visitLabel(loopLabel)
         mv.visitBranch(beginLabel)
         mv.visitLabel(breakLabel)
         mv.closeLoop()
 
-    def visitUnary(self, expr: Unary, mv: FuncVisitor) -> None:
-        expr.operand.accept(self, mv)
+    def visitUnary(self, expr: Unary, mv: FuncVisitor) -> Iterator[Node]:
+        yield expr.operand
 
         op = {
             node.UnaryOp.Neg: tacop.UnaryOp.NEG,
@@ -113,9 +146,9 @@ class TACGen(Visitor[FuncVisitor, None]):
         }[expr.op]
         expr.setattr("val", mv.visitUnary(op, expr.operand.getattr("val")))
 
-    def visitBinary(self, expr: Binary, mv: FuncVisitor) -> None:
-        expr.lhs.accept(self, mv)
-        expr.rhs.accept(self, mv)
+    def visitBinary(self, expr: Binary, mv: FuncVisitor) -> Iterator[Node]:
+        yield expr.lhs
+        yield expr.rhs
 
         op = {
             node.BinaryOp.Add: tacop.BinaryOp.ADD,
@@ -1,11 +1,11 @@
-from typing import Protocol, TypeVar, cast
+from typing import Iterator, Protocol, TypeVar, cast
 
 from frontend.ast.node import Node, NullType
 from frontend.ast.tree import *
-from frontend.ast.visitor import RecursiveVisitor, Visitor
+from frontend.ast.visitor import IterativeVisitor, RecursiveVisitor, Visitor
 from frontend.scope.globalscope import GlobalScope
 from frontend.scope.scope import Scope, ScopeKind
-from frontend.scope.scopestack import ScopeStack
+from frontend.scope.scopestack import ScopeStack, ShadowingScopeStack
 from frontend.symbol.funcsymbol import FuncSymbol
 from frontend.symbol.symbol import Symbol
 from frontend.symbol.varsymbol import VarSymbol
@@ -19,7 +19,8 @@ The namer phase: resolve all symbols defined in the abstract syntax tree and sto
 """
 
 
-class Namer(Visitor[ScopeStack, None]):
+# Children are visited by `yield child` rather than `child.accept(self, ctx)`, see `IterativeVisitor`.
+class Namer(IterativeVisitor[ScopeStack, None]):
     def __init__(self) -> None:
         pass
 
@@ -27,27 +28,28 @@ class Namer(Visitor[ScopeStack, None]):
     def transform(self, program: Program) -> Program:
         # Global scope. You don't have to consider it until Step 9.
         program.globalScope = GlobalScope
-        ctx = ScopeStack(program.globalScope)
+        ctx = ShadowingScopeStack(program.globalScope)
 
-        program.accept(self, ctx)
+        self.run(program, ctx)
         return program
 
-    def visitProgram(self, program: Program, ctx: ScopeStack) -> None:
+    def visitProgram(self, program: Program, ctx: ScopeStack) -> Iterator[Node]:
         # Check if the 'main' function is missing
         if not program.hasMainFunc():
             raise DecafNoMainFuncError
 
-        program.mainFunc().accept(self, ctx)
+        for func in program.functions().values():
+            yield func
 
-    def visitFunction(self, func: Function, ctx: ScopeStack) -> None:
-        func.body.accept(self, ctx)
+    def visitFunction(self, func: Function, ctx: ScopeStack) -> Iterator[Node]:
+        yield func.body
 
-    def visitBlock(self, block: Block, ctx: ScopeStack) -> None:
+    def visitBlock(self, block: Block, ctx: ScopeStack) -> Iterator[Node]:
         for child in block:
-            child.accept(self, ctx)
+            yield child
 
-    def visitReturn(self, stmt: Return, ctx: ScopeStack) -> None:
-        stmt.expr.accept(self, ctx)
+    def visitReturn(self, stmt: Return, ctx: ScopeStack) -> Iterator[Node]:
+        yield stmt.expr
 
         """
         def visitFor(self, stmt: For, ctx: ScopeStack) -> None:
@@ -59,18 +61,18 @@ class Namer(Visitor[ScopeStack, None]):
         5. Close the loop and the local scope.
         """
 
-    def visitIf(self, stmt: If, ctx: ScopeStack) -> None:
-        stmt.cond.accept(self, ctx)
-        stmt.then.accept(self, ctx)
+    def visitIf(self, stmt: If, ctx: ScopeStack) -> Iterator[Node]:
+        yield stmt.cond
+        yield stmt.then
 
         # check if the else branch exists
         if not stmt.otherwise is NULL:
-            stmt.otherwise.accept(self, ctx)
+            yield stmt.otherwise
 
-    def visitWhile(self, stmt: While, ctx: ScopeStack) -> None:
-        stmt.cond.accept(self, ctx)
+    def visitWhile(self, stmt: While, ctx: ScopeStack) -> Iterator[Node]:
+        yield stmt.cond
         ctx.openLoop()
-        stmt.body.accept(self, ctx)
+        yield stmt.body
         ctx.closeLoop()
 
         """
@@ -106,12 +108,12 @@ class Namer(Visitor[ScopeStack, None]):
         """
         pass
 
-    def visitUnary(self, expr: Unary, ctx: ScopeStack) -> None:
-        expr.operand.accept(self, ctx)
+    def visitUnary(self, expr: Unary, ctx: ScopeStack) -> Iterator[Node]:
+        yield expr.operand
 
-    def visitBinary(self, expr: Binary, ctx: ScopeStack) -> None:
-        expr.lhs.accept(self, ctx)
-        expr.rhs.accept(self, ctx)
+    def visitBinary(self, expr: Binary, ctx: ScopeStack) -> Iterator[Node]:
+        yield expr.lhs
+        yield expr.rhs
 
     def visitCondExpr(self, expr: ConditionExpression, ctx: ScopeStack) -> None:
         """
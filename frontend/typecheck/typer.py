@@ -2,7 +2,7 @@ from typing import Protocol, TypeVar
 
 from frontend.ast.node import Node
 from frontend.ast.tree import *
-from frontend.ast.visitor import Visitor
+from frontend.ast.visitor import IterativeVisitor
 from frontend.scope.globalscope import GlobalScope
 from frontend.scope.scope import Scope
 from frontend.scope.scopestack import ScopeStack
@@ -14,7 +14,8 @@ The typer phase: type check abstract syntax tree.
 """
 
 
-class Typer(Visitor[ScopeStack, None]):
+# Children are visited by `yield child` rather than `child.accept(self, ctx)`, see `IterativeVisitor`.
+class Typer(IterativeVisitor[ScopeStack, None]):
     def __init__(self) -> None:
         pass
 
@@ -1,27 +1,199 @@
 import argparse
+import contextlib
+import io
+import json
+import os
+import signal
 import sys
+import time
+import traceback
+from functools import partial
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+from utils import compilecache
+
+# A hit of the compilation cache is answered before the compiler is imported at all.
+if __name__ == "__main__":
+    compilecache.answer(sys.argv[1:])
 
 from backend.asm import Asm
 from backend.reg.bruteregalloc import BruteRegAlloc
 from backend.riscv.riscvasmemitter import RiscvAsmEmitter
 from frontend.ast.tree import Program
-from frontend.lexer import lexer
-from frontend.parser import parser
+import frontend.lexer
+import frontend.parser
+from frontend.lexer import Lexer
+from frontend.parser import Parser, flat, parser, pratt
+from frontend.scope.globalscope import GlobalScope
 from frontend.tacgen.tacgen import TACGen
 from frontend.typecheck.namer import Namer
 from frontend.typecheck.typer import Typer
+import utils.error
 from utils.printtree import TreePrinter
 from utils.riscv import Riscv
+from utils.passtimer import NULL_TIMER, PassTimer
+from utils.tac.reg import Reg
+from utils.tac.tacfunc import TACFunc
 from utils.tac.tacprog import TACProg
 
+# The lexers and the parsers are made on first use only, by their factories, so that a run only sets up the ones it uses.
+LEXERS: dict[str, Callable[[], Lexer]] = {
+    "ply": lambda: frontend.lexer.lexer,
+    "dfa": lambda: frontend.lexer.dfa_lexer,
+}
+
+# Each parser is made along with the one whose `error_stack` collects its syntax errors.
+PARSERS: dict[str, Callable[[], tuple[Parser, Callable[[str, Any], Program]]]] = {
+    "lalr": lambda: (parser, lambda code, lexer: parser.parse(code, lexer=lexer)),
+    "pratt": lambda: (parser, lambda code, lexer: pratt.parse(parser, code, lexer)),
+    "codegen": lambda: (
+        frontend.parser.generated_parser,
+        frontend.parser.generated_parser.parse,
+    ),
+    "flat": lambda: (frontend.parser.generated_parser, flat.parse),
+}
+
+# The lexers and the parsers made so far, by name.
+_lexers: dict[str, Lexer] = {}
+_parsers: dict[str, tuple[Parser, Callable[[str, Any], Program]]] = {}
+
+
+def lexerOf(name: str) -> Lexer:
+    made = _lexers.get(name)
+    if made is None:
+        made = _lexers[name] = LEXERS[name]()
+    return made
+
+
+def parserOf(name: str) -> tuple[Parser, Callable[[str, Any], Program]]:
+    made = _parsers.get(name)
+    if made is None:
+        made = _parsers[name] = PARSERS[name]()
+    return made
+
 
 def parseArgs():
     parser = argparse.ArgumentParser(description="MiniDecaf compiler")
     parser.add_argument("--input", type=str, help="the input C file")
+    parser.add_argument(
+        "--inputs",
+        type=str,
+        nargs="+",
+        default=[],
+        help="compile several C files in one process, see --output-dir",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="compile the C files listed in this file, one per line, each optionally followed by its output path",
+    )
+    parser.add_argument(
+        "--directory",
+        type=str,
+        help="compile every C file under this directory, as with --inputs",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="the number of processes compiling a batch (0: one per CPU)",
+    )
+    parser.add_argument(
+        "--report",
+        action="store_true",
+        help="report the time taken by each input of a batch on stderr",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        help="where to write the outputs of --inputs (default: next to each input), named after the input",
+    )
+    parser.add_argument(
+        "--serve",
+        type=str,
+        metavar="SOCKET",
+        help="serve compilation requests on this Unix socket, see client.py",
+    )
+    parser.add_argument(
+        "--max-clients",
+        type=int,
+        default=8,
+        help="the number of requests the server compiles at once",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="cache the outputs of the compilations of single inputs in this directory "
+        "(default: $MINIDECAF_CACHE_DIR, if set)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help="the size of the cache in MiB, beyond which the least recently used outputs are evicted "
+        f"(default: {compilecache.DEFAULT_SIZE})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="cache the TAC and the assembly of each function, and only compile the functions "
+        "that changed since they were cached (requires a cache directory)",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="report the hit rate and the size of the cache",
+    )
+    parser.add_argument(
+        "--time-passes",
+        nargs="?",
+        const="text",
+        choices=("text", "json"),
+        help="report the wall time, CPU time and memory peak of every pass on stderr, as a table or in JSON",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=("json",),
+        help="output statistics of the compilation of every function, instead of the code",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="with --riscv, generate the TAC of one function at a time, and compile it before generating the next one",
+    )
     parser.add_argument("--parse", action="store_true", help="output parsed AST")
     parser.add_argument("--tac", action="store_true", help="output transformed TAC")
     parser.add_argument("--riscv", action="store_true", help="output generated RISC-V")
-    return parser.parse_args()
+    parser.add_argument(
+        "--lexer", choices=LEXERS, default="ply", help="the lexer implementation"
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default="lalr",
+        help="parse with PLY, with expressions parsed by precedence climbing, with the generated parser, "
+        "or with the generated parser into a flat, array-backed AST",
+    )
+    args = parser.parse_args()
+
+    # A batch is compiled without the cache, and without the reports of the compilation of a single input.
+    if args.inputs or args.manifest or args.directory:
+        single = {
+            "--input": args.input is not None,
+            "--cache-dir": args.cache_dir is not None,
+            "--cache-size": args.cache_size is not None,
+            "--incremental": args.incremental,
+            "--cache-stats": args.cache_stats,
+            "--time-passes": args.time_passes is not None,
+            "--stats": args.stats is not None,
+        }
+        given = [option for option, isGiven in single.items() if isGiven]
+        if given:
+            parser.error(
+                f"{', '.join(given)} cannot be used with --inputs, --manifest or --directory"
+            )
+    if args.cache_size is None:
+        args.cache_size = compilecache.DEFAULT_SIZE
+    return args
 
 
 def readCode(fileName):
@@ -29,65 +201,409 @@ def readCode(fileName):
         return f.read()
 
 
+class CompileError(Exception):
+    "The diagnostics that stop the compilation of an input."
+
+
+# The errors reported as diagnostics on the input by the batches and the server, rather than as internal errors:
+# the syntax errors, and the semantic errors of the passes (see `utils.error`).
+DIAGNOSTICS: tuple[type[Exception], ...] = (
+    CompileError,
+    *(
+        value
+        for value in vars(utils.error).values()
+        if isinstance(value, type) and value.__name__.startswith("Decaf")
+    ),
+)
+
+
 # The parser stage: MiniDecaf code -> Abstract syntax tree
-def step_parse(args: argparse.Namespace):
+def step_parse(args: argparse.Namespace, timer: PassTimer = NULL_TIMER):
     code = readCode(args.input)
-    r: Program = parser.parse(code, lexer=lexer)
+    try:
+        with timer.measure("parse"):
+            return parseCode(code, args)
+    except CompileError as e:
+        print(e, file=sys.stderr)
+        exit(1)
+
 
-    errors = parser.error_stack
+def parseCode(code: str, args: argparse.Namespace) -> Program:
+    chosen, parse = parserOf(args.parser)
+    r: Program = parse(code, lexerOf(args.lexer))
+
+    errors = chosen.error_stack
     if errors:
-        print("\n".join(map(str, errors)), file=sys.stderr)
-        exit(1)
+        raise CompileError("\n".join(map(str, errors)))
 
     return r
 
 
-# IR generation stage: Abstract syntax tree -> Three-address code
-def step_tac(p: Program):
+# Semantic analysis stage: Abstract syntax tree -> Abstract syntax tree with symbols and types
+def step_check(p: Program, timer: PassTimer = NULL_TIMER) -> Program:
     namer = Namer()
-    p = namer.transform(p)
+    with timer.measure("namer"):
+        p = namer.transform(p)
     typer = Typer()
-    p = typer.transform(p)
+    with timer.measure("typer"):
+        p = typer.transform(p)
+    return p
+
+
+# IR generation stage: Abstract syntax tree -> Three-address code
+def step_tac(p: Program, timer: PassTimer = NULL_TIMER):
+    p = step_check(p, timer)
 
     tacgen = TACGen()
-    tac_prog = tacgen.transform(p)
+    with timer.measure("tacgen"):
+        tac_prog = tacgen.transform(p)
 
     return tac_prog
 
 
 # Target code generation stage: Three-address code -> RISC-V assembly code
-def step_asm(p: TACProg):
-    riscvAsmEmitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
-    asm = Asm(riscvAsmEmitter, BruteRegAlloc(riscvAsmEmitter))
+def step_asm(
+    p: TACProg,
+    timer: PassTimer = NULL_TIMER,
+    stats: Optional[list[dict[str, Any]]] = None,
+    out: Optional[TextIO] = None,
+):
+    # If `out` is given, the code is written to it as soon as every function is emitted, and nothing is returned.
+    riscvAsmEmitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved, out)
+    asm = Asm(riscvAsmEmitter, BruteRegAlloc(riscvAsmEmitter), timer, stats)
     prog = asm.transform(p)
     return prog
 
+
+# IR generation and target code generation, one function at a time: the TAC of a function is generated,
+# compiled to RISC-V and dropped before the next one is, so that only the largest function is ever resident.
+def step_pipeline(
+    p: Program,
+    timer: PassTimer = NULL_TIMER,
+    stats: Optional[list[dict[str, Any]]] = None,
+    out: Optional[TextIO] = None,
+):
+    p = step_check(p, timer)
+    tacgen = TACGen()
+
+    def funcs() -> Iterator[TACFunc]:
+        translated = tacgen.functions(p)
+        while True:
+            with timer.measure("tacgen"):
+                func = next(translated, None)
+            if func is None:
+                return
+            yield func
+            del func
+
+    riscvAsmEmitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved, out)
+    asm = Asm(riscvAsmEmitter, BruteRegAlloc(riscvAsmEmitter), timer, stats)
+    return asm.transformFuncs(funcs())
+
+
+# Reset the state a compilation leaves in the modules, so that another one can run in the same process.
+# The lexer and parser tables, which are the expensive part to set up, are kept.
+def reset() -> None:
+    for lex in _lexers.values():
+        lex.error_stack.clear()
+        lex.lineno = 1
+        if hasattr(lex, "begin"):
+            lex.begin("INITIAL")  # type: ignore
+    for chosen, _ in _parsers.values():
+        chosen.error_stack.clear()
+
+    GlobalScope.symbols.clear()
+    GlobalScope.definedGlobalVar.clear()
+
+    for reg in vars(Riscv).values():
+        if isinstance(reg, Reg):
+            reg.occupied = False
+            reg.used = False
+            reg.temp = None
+
+
+# Compile `code` from scratch, and return what `main` would print for it.
+def compileCode(
+    code: str, args: argparse.Namespace, timer: PassTimer = NULL_TIMER
+) -> str:
+    reset()
+
+    def parse():
+        with timer.measure("parse"):
+            return parseCode(code, args)
+
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        if args.riscv and getattr(args, "pipeline", False):
+            print(step_pipeline(parse(), timer, out=sys.stdout))
+        elif args.riscv:
+            print(step_asm(step_tac(parse(), timer), timer, out=sys.stdout))
+        elif args.tac:
+            step_tac(parse(), timer).printTo()
+        elif args.parse:
+            TreePrinter(indentLen=2).work(parse())
+    return out.getvalue()
+
+
+OUTPUT_SUFFIXES = {"riscv": ".s", "tac": ".tac", "parse": ".ast"}
+
+
+# The (input, output) paths of a batch: the `--inputs`, then the lines of the `--manifest`.
+def batchJobs(args: argparse.Namespace) -> list[tuple[str, str]]:
+    mode = next((mode for mode in OUTPUT_SUFFIXES if getattr(args, mode)), "parse")
+
+    def output(input: str) -> str:
+        stem = os.path.splitext(input)[0]
+        if args.output_dir is not None:
+            stem = os.path.join(args.output_dir, os.path.basename(stem))
+        return stem + OUTPUT_SUFFIXES[mode]
+
+    inputs = list(args.inputs)
+    if args.directory is not None:
+        for dir, subdirs, files in os.walk(args.directory):
+            subdirs.sort()
+            inputs.extend(
+                os.path.join(dir, f) for f in sorted(files) if f.endswith(".c")
+            )
+
+    jobs = [(input, output(input)) for input in inputs]
+    if args.manifest is not None:
+        base = os.path.dirname(args.manifest)
+        with open(args.manifest, "r") as f:
+            for line in f:
+                fields = line.split()
+                if not fields or fields[0].startswith("#"):
+                    continue
+                input = os.path.join(base, fields[0])
+                if len(fields) > 1:
+                    jobs.append((input, os.path.join(base, fields[1])))
+                else:
+                    jobs.append((input, output(input)))
+    return jobs
+
+
+# Compile the input of a job. Returns the output, or the error that stopped the compilation, and the time taken.
+def compileJob(
+    args: argparse.Namespace, job: tuple[str, str]
+) -> tuple[Optional[str], Optional[str], float]:
+    start = time.perf_counter()
+    try:
+        result, error = compileCode(readCode(job[0]), args), None
+    except (*DIAGNOSTICS, OSError) as e:
+        result, error = None, str(e)
+    except Exception:
+        # An internal error of the compiler, rather than a diagnostic on the input.
+        result, error = None, traceback.format_exc().rstrip()
+    return result, error, time.perf_counter() - start
+
+
+# The results of the jobs, in order, compiled by `args.jobs` processes.
+def compileJobs(
+    args: argparse.Namespace, jobs: list[tuple[str, str]]
+) -> Iterator[tuple[Optional[str], Optional[str], float]]:
+    processes = args.jobs or os.cpu_count() or 1
+    if processes == 1 or len(jobs) <= 1:
+        yield from map(partial(compileJob, args), jobs)
+        return
+
+    import multiprocessing
+
+    # Compile once before forking, so that the workers inherit whatever is set up lazily, and start hot.
+    compileCode("int main() { return 0; }", args)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with context.Pool(min(processes, len(jobs))) as pool:
+        chunksize = max(1, min(16, len(jobs) // (processes * 4)))
+        yield from pool.imap(partial(compileJob, args), jobs, chunksize)
+
+
+# Compile every input of the batch, writing each output to its path. Diagnostics go to stderr, prefixed by the input.
+# Returns the exit status: 1 if any input failed to compile.
+def batch(args: argparse.Namespace) -> int:
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    jobs = batchJobs(args)
+    start = time.perf_counter()
+    failed = 0
+    for (input, output), (result, error, elapsed) in zip(jobs, compileJobs(args, jobs)):
+        if error is not None:
+            print(f"{input}: {error}", file=sys.stderr)
+            failed += 1
+        else:
+            with open(output, "w") as f:
+                f.write(result)  # type: ignore
+        if args.report:
+            state = "failed" if error is not None else "ok"
+            print(f"{input}: {state} in {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+    if args.report:
+        print(
+            f"{len(jobs)} inputs, {failed} failed, in {time.perf_counter() - start:.3f} s",
+            file=sys.stderr,
+        )
+    return 1 if failed else 0
+
+
+MODES = ("riscv", "tac", "parse")
+
+
+# Compile a request of the server: the source `code`, its `mode` (one of `MODES`), and optionally the `lexer` and `parser`.
+# Returns the response: the `output`, the diagnostics in `errors`, and the exit `status` of the CLI.
+def compileRequest(request: dict) -> dict:
+    mode = request.get("mode")
+    lexerName = request.get("lexer", "ply")
+    parserName = request.get("parser", "lalr")
+    if mode not in MODES or lexerName not in LEXERS or parserName not in PARSERS:
+        return {"status": 2, "output": "", "errors": f"invalid request: {request}"}
+
+    args = argparse.Namespace(lexer=lexerName, parser=parserName)
+    for name in MODES:
+        setattr(args, name, name == mode)
+    try:
+        return {"status": 0, "output": compileCode(request["code"], args), "errors": ""}
+    except DIAGNOSTICS as e:
+        return {"status": 1, "output": "", "errors": str(e)}
+    except Exception:
+        return {"status": 1, "output": "", "errors": traceback.format_exc().rstrip()}
+
+
+def serve(args: argparse.Namespace) -> None:
+    import socket
+    import socketserver
+    import threading
+
+    # A connection carries one request, and then its response, both in JSON. The request may be a `shutdown` of the server.
+    class CompileHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            data = self.rfile.read()
+            # Connections probing whether the server listens send nothing.
+            if not data:
+                return
+            request = json.loads(data)
+            if request.get("shutdown"):
+                os.kill(os.getppid(), signal.SIGTERM)
+                response = {"status": 0, "output": "", "errors": ""}
+            else:
+                response = compileRequest(request)
+            self.wfile.write(json.dumps(response).encode())
+
+    # Every request is handled by a process forked from the server, which therefore starts hot,
+    # and whose state is isolated from the other requests. `max_children` limits the requests handled at once.
+    class CompileServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+        pass
+
+    path = args.serve
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX) as probe:
+            if probe.connect_ex(path) == 0:
+                print(f"{path}: a server is already listening", file=sys.stderr)
+                exit(1)
+        os.remove(path)
+
+    # Make every lexer and parser, and compile once, so that whatever is set up lazily is inherited by the handlers.
+    for name in LEXERS:
+        lexerOf(name)
+    for name in PARSERS:
+        parserOf(name)
+    compileRequest({"code": "int main() { return 0; }", "mode": "riscv"})
+    with CompileServer(path, CompileHandler) as server:
+        server.max_children = args.max_clients
+
+        # `shutdown` waits for `serve_forever` to return, thus it cannot be called by the thread serving.
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        try:
+            server.serve_forever()
+        finally:
+            # Closing the server waits for the requests being handled.
+            os.remove(path)
+
+
+def reportPasses(args: argparse.Namespace, timer: PassTimer) -> None:
+    if args.time_passes is None:
+        return
+    timer.stop()
+    print(
+        timer.json() if args.time_passes == "json" else timer.report(), file=sys.stderr
+    )
+
+
 # hope all of you happiness
 # enjoy potato chips
 
+
 def main():
     args = parseArgs()
+    if args.serve is not None:
+        return serve(args)
+    if args.inputs or args.manifest or args.directory:
+        exit(batch(args))
+    if args.cache_stats:
+        print("no cache directory is given", file=sys.stderr)
+        exit(1)
+
+    timer = NULL_TIMER
+    if args.time_passes is not None:
+        timer = PassTimer()
+        timer.start()
+
+    if args.stats is not None:
+        stats: list[dict[str, Any]] = []
+        step_asm(step_tac(step_parse(args, timer), timer), timer, stats)
+        print(json.dumps({"functions": stats}, indent=2))
+        reportPasses(args, timer)
+        return
+
+    # `compilecache.answer` has missed, store the output.
+    directory = compilecache.cache_dir(args)
+    if directory is not None and compilecache.mode(args) is not None:
+        code = readCode(args.input)
+        try:
+            if args.incremental and not args.parse:
+                from utils.incremental import IncrementalCompiler
+
+                reset()
+                compiler = IncrementalCompiler(directory, args.cache_size)
+                output = compiler.compile(
+                    parseCode(code, args), compilecache.mode(args)  # type: ignore
+                )
+            else:
+                output = compileCode(code, args, timer)
+        except CompileError as e:
+            print(e, file=sys.stderr)
+            exit(1)
+        sys.stdout.write(output)
+        compilecache.store(
+            directory, compilecache.key(args, code), output, args.cache_size
+        )
+        reportPasses(args, timer)
+        return
 
     def _parse():
-        r = step_parse(args)
+        r = step_parse(args, timer)
         # print("\nParsed AST:\n")
         # printer = TreePrinter(indentLen=2)
         # printer.work(r)
         return r
 
     def _tac():
-        tac = step_tac(_parse())
+        tac = step_tac(_parse(), timer)
         # print("\nGenerated TAC:\n")
         # tac.printTo()
         return tac
 
     def _asm():
-        asm = step_asm(_tac())
+        asm = step_asm(_tac(), timer, out=sys.stdout)
         # print("\nGenerated ASM:\n")
         # print(asm)
         return asm
 
-    if args.riscv:
+    if args.riscv and args.pipeline:
+        prog = step_pipeline(_parse(), timer, out=sys.stdout)
+        print(prog)
+    elif args.riscv:
         prog = _asm()
         print(prog)
     elif args.tac:
@@ -98,6 +614,7 @@ def main():
         printer = TreePrinter(indentLen=2)
         printer.work(prog)
 
+    reportPasses(args, timer)
     return
 
 
@@ -0,0 +1,14 @@
+"""
+A simulator of RV32IM, for the assembly the compiler emits: the local stand-in for qemu.
+
+`assemble` reads the text printed by `AsmCodePrinter`, and `run` executes its `main`, returning a `Result`:
+the exit value, and the instructions executed by opcode, the loads, stores, branches taken and the approximate cycles.
+"""
+
+from .assembler import AssemblerError, Instr, Program, assemble
+from .machine import DEFAULT_LATENCIES, Machine, Result, SimulationError, run
+
+
+def simulate(source: str, **kwargs) -> Result:
+    "Assemble `source` and run its `main`."
+    return run(assemble(source), **kwargs)
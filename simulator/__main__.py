@@ -0,0 +1,59 @@
+"""
+Run an assembly file: `python -m simulator main.s [--latency load=3] [--json]`.
+The statistics are printed to stderr (or to stdout with `--json`), and the exit code is the one `main` returns.
+"""
+
+import argparse
+import json
+import sys
+
+from . import AssemblerError, DEFAULT_LATENCIES, SimulationError, assemble, run
+
+
+def latency(text: str) -> tuple[str, int]:
+    name, _, value = text.partition("=")
+    if name not in DEFAULT_LATENCIES or not value.isdigit():
+        raise argparse.ArgumentTypeError(
+            f"expected CLASS=CYCLES, with CLASS one of {', '.join(DEFAULT_LATENCIES)}"
+        )
+    return name, int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m simulator", description=__doc__)
+    parser.add_argument("input", type=str, help="the assembly file, or - for stdin")
+    parser.add_argument(
+        "--latency",
+        type=latency,
+        action="append",
+        default=[],
+        metavar="CLASS=CYCLES",
+        help="the latency of a class of instructions, in cycles",
+    )
+    parser.add_argument("--max-steps", type=int, default=100_000_000)
+    parser.add_argument(
+        "--json", action="store_true", help="print the statistics as JSON"
+    )
+    args = parser.parse_args()
+
+    if args.input == "-":
+        source = sys.stdin.read()
+    else:
+        with open(args.input, "r") as f:
+            source = f.read()
+
+    try:
+        result = run(assemble(source), dict(args.latency), args.max_steps)
+    except (AssemblerError, SimulationError) as e:
+        print(f"{args.input}: {e}", file=sys.stderr)
+        sys.exit(255)
+
+    if args.json:
+        print(json.dumps(result.asDict(), indent=2))
+    else:
+        print(result.report(), file=sys.stderr)
+    sys.exit(result.exitCode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Module that assembles the text printed by `AsmCodePrinter` into instructions the `Machine` executes.
+
+Instructions are kept symbolic, one `Instr` per line, rather than encoded: registers are numbers,
+immediates are ints, and branch and jump targets are instruction indexes.
+The `.text` section is the only one, its directives are ignored, and comments start with `#`.
+Pseudo-instructions are expanded into the instructions they stand for (`li` into `addi`, `mv` into `addi`,
+`beqz` into `beq`, `j` into `jal`, `ret` into `jalr`, ...), so that the statistics count the instructions executed.
+"""
+
+import re
+from typing import NamedTuple
+
+REGS: dict[str, int] = {f"x{i}": i for i in range(32)}
+REGS.update(
+    {
+        name: i
+        for i, name in enumerate(
+            ["zero", "ra", "sp", "gp", "tp", "t0", "t1", "t2", "fp", "s1"]
+            + [f"a{i}" for i in range(8)]
+            + [f"s{i}" for i in range(2, 12)]
+            + [f"t{i}" for i in range(3, 7)]
+        )
+    }
+)
+REGS["s0"] = 8
+
+# Instructions by format: the operands they take.
+R_TYPE = frozenset(
+    "add sub sll slt sltu xor srl sra or and mul mulh mulhsu mulhu div divu rem remu".split()
+)
+I_TYPE = frozenset("addi slti sltiu xori ori andi slli srli srai".split())
+LOADS = frozenset("lw lh lhu lb lbu".split())
+STORES = frozenset("sw sh sb".split())
+BRANCHES = frozenset("beq bne blt bge bltu bgeu".split())
+
+OPCODES = R_TYPE | I_TYPE | LOADS | STORES | BRANCHES | {"lui", "jal", "jalr"}
+
+
+class AssemblerError(Exception):
+    def __init__(self, lineno: int, line: str, message: str) -> None:
+        super().__init__(f"line {lineno}: {message}: {line.strip()}")
+        self.lineno = lineno
+
+
+class Instr(NamedTuple):
+    op: str
+    rd: int = 0
+    rs1: int = 0
+    rs2: int = 0
+    # The immediate, or the index of the target instruction of a branch or a jump.
+    imm: int = 0
+    # The line of the source the instruction comes from.
+    lineno: int = 0
+
+
+class Program(NamedTuple):
+    instrs: list[Instr]
+    labels: dict[str, int]
+
+    def entry(self, label: str = "main") -> int:
+        return self.labels[label]
+
+
+_LABEL = re.compile(r"^\s*([A-Za-z_.$][\w.$]*)\s*:")
+_OFFSET = re.compile(r"^(-?\w+)\((\w+)\)$")
+
+
+def assemble(source: str) -> Program:
+    # Labels may be used before they are defined, thus targets are resolved once all the lines are read.
+    lines: list[tuple[int, str, str, list[str]]] = []
+    labels: dict[str, int] = {}
+    for lineno, line in enumerate(source.splitlines(), 1):
+        text = line.split("#", 1)[0]
+        while match := _LABEL.match(text):
+            labels[match.group(1)] = len(lines)
+            text = text[match.end() :]
+        text = text.strip()
+        if not text or text.startswith("."):
+            continue
+        mnemonic, _, rest = text.partition(" ")
+        operands = [operand.strip() for operand in rest.split(",")] if rest else []
+        lines.append((lineno, line, mnemonic, operands))
+
+    instrs = [
+        _instr(lineno, line, mnemonic, operands, labels)
+        for lineno, line, mnemonic, operands in lines
+    ]
+    return Program(instrs, labels)
+
+
+def _instr(
+    lineno: int, line: str, mnemonic: str, operands: list[str], labels: dict[str, int]
+) -> Instr:
+    def fail(message: str):
+        return AssemblerError(lineno, line, message)
+
+    def count(n: int) -> None:
+        if len(operands) != n:
+            raise fail(f"{mnemonic} takes {n} operands")
+
+    def reg(operand: str) -> int:
+        if operand not in REGS:
+            raise fail(f"unknown register {operand}")
+        return REGS[operand]
+
+    def imm(operand: str) -> int:
+        try:
+            return int(operand, 0)
+        except ValueError:
+            raise fail(f"invalid immediate {operand}") from None
+
+    def target(operand: str) -> int:
+        if operand not in labels:
+            raise fail(f"undefined label {operand}")
+        return labels[operand]
+
+    def offset(operand: str) -> tuple[int, int]:
+        match = _OFFSET.match(operand)
+        if match is None:
+            raise fail(f"invalid address {operand}")
+        return imm(match.group(1)), reg(match.group(2))
+
+    op = mnemonic
+    # Pseudo-instructions.
+    if op == "nop":
+        count(0)
+        return Instr("addi", lineno=lineno)
+    if op == "li":
+        count(2)
+        return Instr("addi", reg(operands[0]), 0, imm=imm(operands[1]), lineno=lineno)
+    if op == "mv":
+        count(2)
+        return Instr("addi", reg(operands[0]), reg(operands[1]), lineno=lineno)
+    if op in ("neg", "not", "seqz", "snez"):
+        count(2)
+        rd, rs = reg(operands[0]), reg(operands[1])
+        if op == "neg":
+            return Instr("sub", rd, 0, rs, lineno=lineno)
+        if op == "not":
+            return Instr("xori", rd, rs, imm=-1, lineno=lineno)
+        if op == "seqz":
+            return Instr("sltiu", rd, rs, imm=1, lineno=lineno)
+        return Instr("sltu", rd, 0, rs, lineno=lineno)
+    if op in ("sgt", "sgtu"):
+        count(3)
+        # rs1 > rs2 is rs2 < rs1.
+        return Instr(
+            {"sgt": "slt", "sgtu": "sltu"}[op],
+            reg(operands[0]),
+            reg(operands[2]),
+            reg(operands[1]),
+            lineno=lineno,
+        )
+    if op in ("beqz", "bnez", "blez", "bgez", "bltz", "bgtz"):
+        count(2)
+        rs, label = reg(operands[0]), target(operands[1])
+        if op in ("blez", "bgtz"):
+            # rs <= 0 is 0 >= rs, and rs > 0 is 0 < rs.
+            return Instr(
+                "bge" if op == "blez" else "blt", 0, 0, rs, label, lineno=lineno
+            )
+        return Instr(op[:3] if op != "bgez" else "bge", 0, rs, 0, label, lineno=lineno)
+    if op in ("bgt", "ble", "bgtu", "bleu"):
+        count(3)
+        swapped = {"bgt": "blt", "ble": "bge", "bgtu": "bltu", "bleu": "bgeu"}[op]
+        return Instr(
+            swapped,
+            0,
+            reg(operands[1]),
+            reg(operands[0]),
+            target(operands[2]),
+            lineno=lineno,
+        )
+    if op == "j":
+        count(1)
+        return Instr("jal", 0, imm=target(operands[0]), lineno=lineno)
+    if op == "call":
+        count(1)
+        return Instr("jal", REGS["ra"], imm=target(operands[0]), lineno=lineno)
+    if op == "jr":
+        count(1)
+        return Instr("jalr", 0, reg(operands[0]), lineno=lineno)
+    if op == "ret":
+        count(0)
+        return Instr("jalr", 0, REGS["ra"], lineno=lineno)
+
+    if op not in OPCODES:
+        raise fail(f"unsupported instruction {op}")
+    if op in R_TYPE:
+        count(3)
+        return Instr(op, *map(reg, operands), lineno=lineno)  # type: ignore
+    if op in I_TYPE:
+        count(3)
+        return Instr(
+            op, reg(operands[0]), reg(operands[1]), imm=imm(operands[2]), lineno=lineno
+        )
+    if op in LOADS:
+        count(2)
+        value, base = offset(operands[1])
+        return Instr(op, reg(operands[0]), base, imm=value, lineno=lineno)
+    if op in STORES:
+        count(2)
+        value, base = offset(operands[1])
+        return Instr(op, 0, base, reg(operands[0]), value, lineno=lineno)
+    if op in BRANCHES:
+        count(3)
+        return Instr(
+            op,
+            0,
+            reg(operands[0]),
+            reg(operands[1]),
+            target(operands[2]),
+            lineno=lineno,
+        )
+    if op == "lui":
+        count(2)
+        return Instr(op, reg(operands[0]), imm=imm(operands[1]), lineno=lineno)
+    if op == "jal":
+        if len(operands) == 1:
+            return Instr(op, REGS["ra"], imm=target(operands[0]), lineno=lineno)
+        count(2)
+        return Instr(op, reg(operands[0]), imm=target(operands[1]), lineno=lineno)
+    # jalr
+    if len(operands) == 1:
+        return Instr(op, REGS["ra"], reg(operands[0]), lineno=lineno)
+    if len(operands) == 2 and "(" in operands[1]:
+        value, base = offset(operands[1])
+        return Instr(op, reg(operands[0]), base, imm=value, lineno=lineno)
+    count(3)
+    return Instr(
+        op, reg(operands[0]), reg(operands[1]), imm=imm(operands[2]), lineno=lineno
+    )
@@ -0,0 +1,302 @@
+"""
+Module that executes an assembled `Program` on an RV32IM machine, and counts what it executes.
+
+The machine has the 32 registers of RV32I and a stack, at the top of a memory of `memory` bytes (1 MiB by default).
+`main` is called with `ra` pointing to `HALT`: it returns to it, and its exit value is `a0`.
+Instructions are at `TEXT_BASE + 4 * index`, so that addresses computed from `ra` and `jal` stay consistent.
+
+Cycles are approximate: every instruction costs the latency of its class in `latencies` (see `DEFAULT_LATENCIES`),
+and a taken branch or a jump adds `latencies["taken"]`, the cost of refilling the pipeline.
+"""
+
+from collections import Counter
+from typing import Optional
+
+from .assembler import BRANCHES, I_TYPE, LOADS, Program, STORES
+
+MASK = 0xFFFFFFFF
+TEXT_BASE = 0x10000
+HALT = 0
+
+# The class of every opcode, each with its own latency.
+CLASSES: dict[str, str] = {
+    **{op: "load" for op in LOADS},
+    **{op: "store" for op in STORES},
+    **{op: "branch" for op in BRANCHES},
+    **{op: "mul" for op in ("mul", "mulh", "mulhsu", "mulhu")},
+    **{op: "div" for op in ("div", "divu", "rem", "remu")},
+    "jal": "jump",
+    "jalr": "jump",
+}
+
+DEFAULT_LATENCIES: dict[str, int] = {
+    "alu": 1,
+    "mul": 3,
+    "div": 20,
+    "load": 2,
+    "store": 1,
+    "branch": 1,
+    "jump": 1,
+    "taken": 2,
+}
+
+
+class SimulationError(Exception):
+    pass
+
+
+class Result:
+    def __init__(
+        self,
+        exitValue: int,
+        opcodes: Counter[str],
+        loads: int,
+        stores: int,
+        branches: int,
+        taken: int,
+        cycles: int,
+    ) -> None:
+        self.exitValue = exitValue
+        self.opcodes = opcodes
+        self.loads = loads
+        self.stores = stores
+        self.branches = branches
+        self.taken = taken
+        self.cycles = cycles
+
+    @property
+    def exitCode(self) -> int:
+        "The status of a process whose `main` returns `exitValue`, as qemu reports it."
+        return self.exitValue & 0xFF
+
+    @property
+    def instrs(self) -> int:
+        return sum(self.opcodes.values())
+
+    def asDict(self) -> dict:
+        return {
+            "exitValue": self.exitValue,
+            "instrs": self.instrs,
+            "cycles": self.cycles,
+            "loads": self.loads,
+            "stores": self.stores,
+            "branches": self.branches,
+            "taken": self.taken,
+            "opcodes": dict(self.opcodes.most_common()),
+        }
+
+    def report(self) -> str:
+        lines = [
+            f"exit value     {self.exitValue}",
+            f"instructions   {self.instrs}",
+            f"cycles         {self.cycles}",
+            f"loads          {self.loads}",
+            f"stores         {self.stores}",
+            f"branches       {self.branches} ({self.taken} taken)",
+            "",
+        ]
+        lines.extend(f"{op:<14} {count}" for op, count in self.opcodes.most_common())
+        return "\n".join(lines)
+
+
+def _signed(value: int) -> int:
+    value &= MASK
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _div(a: int, b: int) -> int:
+    # RISC-V rounds towards zero, and defines division by zero and overflow instead of trapping.
+    if b == 0:
+        return -1
+    if a == -(1 << 31) and b == -1:
+        return a
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def _rem(a: int, b: int) -> int:
+    if b == 0:
+        return a
+    if a == -(1 << 31) and b == -1:
+        return 0
+    return a - _div(a, b) * b
+
+
+_ALU = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "sll": lambda a, b: a << (b & 31),
+    "slt": lambda a, b: int(a < b),
+    "sltu": lambda a, b: int((a & MASK) < (b & MASK)),
+    "xor": lambda a, b: a ^ b,
+    "srl": lambda a, b: (a & MASK) >> (b & 31),
+    "sra": lambda a, b: a >> (b & 31),
+    "or": lambda a, b: a | b,
+    "and": lambda a, b: a & b,
+    "mul": lambda a, b: a * b,
+    "mulh": lambda a, b: (a * b) >> 32,
+    "mulhsu": lambda a, b: (a * (b & MASK)) >> 32,
+    "mulhu": lambda a, b: ((a & MASK) * (b & MASK)) >> 32,
+    "div": _div,
+    "divu": lambda a, b: (a & MASK) // (b & MASK) if b else -1,
+    "rem": _rem,
+    "remu": lambda a, b: (a & MASK) % (b & MASK) if b else a,
+}
+_ALU.update(
+    {
+        "addi": _ALU["add"],
+        "slti": _ALU["slt"],
+        "sltiu": _ALU["sltu"],
+        "xori": _ALU["xor"],
+        "ori": _ALU["or"],
+        "andi": _ALU["and"],
+        "slli": _ALU["sll"],
+        "srli": _ALU["srl"],
+        "srai": _ALU["sra"],
+    }
+)
+
+_BRANCH = {
+    "beq": lambda a, b: a == b,
+    "bne": lambda a, b: a != b,
+    "blt": lambda a, b: a < b,
+    "bge": lambda a, b: a >= b,
+    "bltu": lambda a, b: (a & MASK) < (b & MASK),
+    "bgeu": lambda a, b: (a & MASK) >= (b & MASK),
+}
+
+_WIDTHS = {"lw": 4, "lh": 2, "lhu": 2, "lb": 1, "lbu": 1, "sw": 4, "sh": 2, "sb": 1}
+
+
+class Machine:
+    def __init__(
+        self,
+        program: Program,
+        latencies: Optional[dict[str, int]] = None,
+        memory: int = 1 << 20,
+        maxSteps: int = 100_000_000,
+    ) -> None:
+        self.program = program
+        self.latencies = {**DEFAULT_LATENCIES, **(latencies or {})}
+        unknown = set(self.latencies) - set(DEFAULT_LATENCIES)
+        if unknown:
+            raise SimulationError(
+                f"unknown latency classes: {', '.join(sorted(unknown))}"
+            )
+        self.memory = bytearray(memory)
+        self.maxSteps = maxSteps
+        self.regs = [0] * 32
+
+    def _address(self, address: int, width: int) -> int:
+        address &= MASK
+        if address + width > len(self.memory):
+            raise SimulationError(f"access out of memory at {address:#x}")
+        if address % width:
+            raise SimulationError(f"misaligned access at {address:#x}")
+        return address
+
+    def _target(self, address: int) -> int:
+        index, misaligned = divmod((address & MASK) - TEXT_BASE, 4)
+        if misaligned or not 0 <= index < len(self.program.instrs):
+            raise SimulationError(
+                f"jump to {address & MASK:#x}, outside of the program"
+            )
+        return index
+
+    def run(self, entry: str = "main") -> Result:
+        instrs = self.program.instrs
+        if entry not in self.program.labels:
+            raise SimulationError(f"undefined entry {entry}")
+        regs = self.regs
+        memory = self.memory
+        regs[1] = HALT
+        regs[2] = len(memory)
+
+        # Counts are kept by instruction, and only aggregated by opcode at the end.
+        executed = [0] * len(instrs)
+        takenBranches = [0] * len(instrs)
+        pc = self.program.labels[entry]
+        steps = 0
+        while True:
+            if pc >= len(instrs):
+                raise SimulationError("execution fell off the end of the program")
+            if steps >= self.maxSteps:
+                raise SimulationError(f"no exit after {self.maxSteps} instructions")
+            steps += 1
+            executed[pc] += 1
+            instr = instrs[pc]
+            op = instr.op
+            following = pc + 1
+
+            if op in _ALU:
+                b = instr.imm if op in I_TYPE else regs[instr.rs2]
+                value = _ALU[op](regs[instr.rs1], b)
+            elif op in _BRANCH:
+                if _BRANCH[op](regs[instr.rs1], regs[instr.rs2]):
+                    takenBranches[pc] += 1
+                    following = instr.imm
+                value = None
+            elif op in _WIDTHS and op[0] == "l":
+                width = _WIDTHS[op]
+                address = self._address(regs[instr.rs1] + instr.imm, width)
+                value = int.from_bytes(
+                    memory[address : address + width], "little", signed=op[-1] != "u"
+                )
+            elif op in _WIDTHS:
+                width = _WIDTHS[op]
+                address = self._address(regs[instr.rs1] + instr.imm, width)
+                memory[address : address + width] = (
+                    regs[instr.rs2] & ((1 << 8 * width) - 1)
+                ).to_bytes(width, "little")
+                value = None
+            elif op == "jal":
+                value = TEXT_BASE + 4 * following
+                following = instr.imm
+            elif op == "jalr":
+                value = TEXT_BASE + 4 * following
+                address = (regs[instr.rs1] + instr.imm) & ~1
+                if instr.rd:
+                    regs[instr.rd] = _signed(value)
+                if address & MASK == HALT:
+                    break
+                following = self._target(address)
+            elif op == "lui":
+                value = instr.imm << 12
+            else:
+                raise SimulationError(f"unsupported instruction {op}")
+
+            if value is not None and instr.rd:
+                regs[instr.rd] = _signed(value)
+            pc = following
+
+        return self._result(executed, takenBranches)
+
+    def _result(self, executed: list[int], takenBranches: list[int]) -> Result:
+        latencies = self.latencies
+        opcodes: Counter[str] = Counter()
+        loads = stores = branches = cycles = 0
+        for instr, count in zip(self.program.instrs, executed):
+            if not count:
+                continue
+            opcodes[instr.op] += count
+            kind = CLASSES.get(instr.op, "alu")
+            cycles += latencies[kind] * count
+            if kind == "load":
+                loads += count
+            elif kind == "store":
+                stores += count
+            elif kind == "branch":
+                branches += count
+            elif kind == "jump":
+                cycles += latencies["taken"] * count
+        taken = sum(takenBranches)
+        cycles += latencies["taken"] * taken
+        return Result(self.regs[10], opcodes, loads, stores, branches, taken, cycles)
+
+
+def run(
+    program: Program,
+    latencies: Optional[dict[str, int]] = None,
+    maxSteps: int = 100_000_000,
+) -> Result:
+    return Machine(program, latencies, maxSteps=maxSteps).run()
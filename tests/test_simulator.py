@@ -0,0 +1,125 @@
+"""
+Tests of the simulator: the expansion of the pseudo-instructions by the assembler,
+and the edge cases of the M extension, which RISC-V defines instead of trapping.
+"""
+
+import pytest
+
+from simulator import AssemblerError, Instr, assemble, simulate
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+
+def expand(line: str) -> Instr:
+    "The instruction `line` assembles into, in a program where `L` labels the instruction after it."
+    instrs = assemble(f"main:\n    {line}\nL:\n    ret\n").instrs
+    assert len(instrs) == 2
+    return instrs[0]._replace(lineno=0)
+
+
+@pytest.mark.parametrize(
+    "line, instr",
+    [
+        ("nop", Instr("addi")),
+        ("li a0, -7", Instr("addi", 10, 0, imm=-7)),
+        ("mv a0, t1", Instr("addi", 10, 6)),
+        ("neg a0, t1", Instr("sub", 10, 0, 6)),
+        ("not a0, t1", Instr("xori", 10, 6, imm=-1)),
+        ("seqz a0, t1", Instr("sltiu", 10, 6, imm=1)),
+        ("snez a0, t1", Instr("sltu", 10, 0, 6)),
+        ("sgt a0, t1, t2", Instr("slt", 10, 7, 6)),
+        ("sgtu a0, t1, t2", Instr("sltu", 10, 7, 6)),
+        ("beqz t1, L", Instr("beq", 0, 6, 0, 1)),
+        ("bnez t1, L", Instr("bne", 0, 6, 0, 1)),
+        ("bltz t1, L", Instr("blt", 0, 6, 0, 1)),
+        ("bgez t1, L", Instr("bge", 0, 6, 0, 1)),
+        ("blez t1, L", Instr("bge", 0, 0, 6, 1)),
+        ("bgtz t1, L", Instr("blt", 0, 0, 6, 1)),
+        ("bgt t1, t2, L", Instr("blt", 0, 7, 6, 1)),
+        ("ble t1, t2, L", Instr("bge", 0, 7, 6, 1)),
+        ("bgtu t1, t2, L", Instr("bltu", 0, 7, 6, 1)),
+        ("bleu t1, t2, L", Instr("bgeu", 0, 7, 6, 1)),
+        ("j L", Instr("jal", 0, imm=1)),
+        ("call L", Instr("jal", 1, imm=1)),
+        ("jr t1", Instr("jalr", 0, 6)),
+        ("ret", Instr("jalr", 0, 1)),
+    ],
+)
+def test_pseudo_instruction(line: str, instr: Instr):
+    assert expand(line) == instr
+
+
+def test_pseudo_instruction_operands():
+    with pytest.raises(AssemblerError, match="sgtu takes 3 operands"):
+        assemble("main:\n    sgtu a0, t1\n")
+
+
+def compute(op: str, a: int, b: int) -> int:
+    "The value of `op a, b` on the machine, as a signed 32-bit int."
+    return simulate(
+        f"main:\n    li t0, {a}\n    li t1, {b}\n    {op} a0, t0, t1\n    ret\n"
+    ).exitValue
+
+
+@pytest.mark.parametrize(
+    "op, a, b, expected",
+    [
+        ("sgt", 2, 1, 1),
+        ("sgt", 1, 2, 0),
+        ("sgt", -1, 1, 0),
+        ("sgtu", -1, 1, 1),
+        ("sgtu", 1, -1, 0),
+        ("sgtu", 1, 1, 0),
+    ],
+)
+def test_set_greater_than(op: str, a: int, b: int, expected: int):
+    assert compute(op, a, b) == expected
+
+
+@pytest.mark.parametrize(
+    "op, a, b, expected",
+    [
+        # Division by zero: the quotient has all bits set, the remainder is the dividend.
+        ("div", 7, 0, -1),
+        ("divu", 7, 0, -1),
+        ("rem", 7, 0, 7),
+        ("rem", -7, 0, -7),
+        ("remu", 7, 0, 7),
+        ("remu", -7, 0, -7),
+        # Overflow: the quotient is the dividend, the remainder is 0.
+        ("div", INT_MIN, -1, INT_MIN),
+        ("rem", INT_MIN, -1, 0),
+        # Rounding towards zero, the remainder taking the sign of the dividend.
+        ("div", -7, 2, -3),
+        ("rem", -7, 2, -1),
+        ("div", 7, -2, -3),
+        ("rem", 7, -2, 1),
+        ("divu", -7, 2, 0x7FFFFFFC),
+        ("remu", -7, 2, 1),
+    ],
+)
+def test_division(op: str, a: int, b: int, expected: int):
+    assert compute(op, a, b) == expected
+
+
+@pytest.mark.parametrize(
+    "op, a, b, expected",
+    [
+        ("mul", INT_MAX, 2, -2),
+        ("mul", INT_MIN, -1, INT_MIN),
+        ("mulh", INT_MIN, INT_MIN, 1 << 30),
+        ("mulh", -1, -1, 0),
+        ("mulh", -1, 1, -1),
+        ("mulh", INT_MAX, INT_MAX, (1 << 30) - 1),
+        # `mulhsu` takes its second operand as unsigned.
+        ("mulhsu", -1, -1, -1),
+        ("mulhsu", 1, -1, 0),
+        ("mulhsu", INT_MIN, -1, INT_MIN),
+        ("mulhu", -1, -1, -2),
+        ("mulhu", INT_MIN, 2, 1),
+        ("mulhu", 1, -1, 0),
+    ],
+)
+def test_multiplication(op: str, a: int, b: int, expected: int):
+    assert compute(op, a, b) == expected
@@ -1,9 +1,12 @@
-import inspect
 import types
+from array import array
+from bisect import bisect_right
 from typing import Optional, TypeVar
 
 
 def caller_module():
+    import inspect
+
     frame = inspect.stack()[2]
     module = inspect.getmodule(frame[0])
     for frame in inspect.stack():
@@ -29,14 +32,57 @@ def try_else(job, onSucceed, onFail):
         return onSucceed(ret)
 
 
+class LineIndex:
+    """
+    The offsets at which the lines of a source start, to find the line and the column of a position,
+    or the text of a line, by bisection rather than by scanning the source.
+    Lines are numbered from 1 and delimited as the lexers count them, by `\\r\\n`, `\\r` or `\\n`
+    (`t_ignore_Newline` of `frontend.lexer.lex`); columns are numbered from 1.
+    """
+
+    def __init__(self, source: str) -> None:
+        import re
+
+        from frontend.lexer import lex
+
+        self.source = source
+        self.starts = array("l", [0])
+        self.starts.extend(
+            newline.end() for newline in re.finditer(lex.t_ignore_Newline, source)
+        )
+
+    def lineno(self, pos: int) -> int:
+        return bisect_right(self.starts, pos)
+
+    def column(self, pos: int) -> int:
+        return pos - self.starts[self.lineno(pos) - 1] + 1
+
+    def line(self, lineno: int) -> str:
+        if not 0 < lineno <= len(self.starts):
+            raise IndexError(f"line {lineno} out of range")
+        end = self.starts[lineno] if lineno < len(self.starts) else len(self.source)
+        # A line holds no newline character but the one ending it.
+        return self.source[self.starts[lineno - 1] : end].rstrip("\r\n")
+
+
+# The index of the last source asked for. Only one is kept, so that it goes along with the source it indexes.
+_lineIndex: Optional[LineIndex] = None
+
+
+def line_index(_input: str) -> LineIndex:
+    "The `LineIndex` of `_input`, built on the first diagnostic about it."
+    global _lineIndex
+    if _lineIndex is None or _lineIndex.source is not _input:
+        _lineIndex = LineIndex(_input)
+    return _lineIndex
+
+
 def find_column(_input: str, lexpos: int):
-    line_start = _input.rfind("\n", 0, lexpos)
-    return lexpos - line_start
+    return line_index(_input).column(lexpos)
 
 
 def get_line(_input: str, lineno: int):
-    lines = get_line.__dict__.setdefault(_input, _input.splitlines())
-    return lines[lineno - 1]
+    return line_index(_input).line(lineno)
 
 
 def get_grammar(path: Optional[str] = None):
@@ -1,33 +1,81 @@
+from typing import Optional, TextIO
+
 from utils.label.label import Label
 from utils.tac.nativeinstr import NativeInstr
 from utils.tac.tacinstr import TACInstr
 
+"""
+AsmCodePrinter: print asm code
+
+The code is appended to a list of chunks, and joined once: concatenating it to a string would be quadratic.
+If `out` is given, the chunks are written to it whenever `flush` is called, i.e. when a function is emitted,
+or when `FLUSH_CHUNKS` of them are pending, so that the whole code never has to be held in memory.
+Otherwise `flush` joins the chunks of the function into one, which takes much less memory than its lines.
+"""
+
 
 class AsmCodePrinter:
     INDENTS = "    "
     COMMENT_PROMPT = "#"
+    FLUSH_CHUNKS = 1 << 14
+
+    def __init__(self, out: Optional[TextIO] = None) -> None:
+        self.out = out
+        self.chunks: list[str] = []
+        # The number of chunks already joined by `flush`.
+        self.flushed = 0
+        # The number of instructions printed, labels excluded.
+        self.instrs = 0
 
-    def __init__(self) -> None:
-        self.buffer = ""
+    def write(self, text: str):
+        self.chunks.append(text)
+        if self.out is not None and len(self.chunks) >= self.FLUSH_CHUNKS:
+            self.flush()
 
     def printf(self, fmt: str, **args):
-        self.buffer += self.INDENTS + fmt.format(**args)
+        self.write(self.INDENTS + fmt.format(**args))
 
     def println(self, fmt: str, **args):
-        self.buffer += self.INDENTS + fmt.format(**args) + "\n"
+        self.write(self.INDENTS + fmt.format(**args) + "\n")
 
     def printLabel(self, label: Label):
-        self.buffer += str(label.name) + ":\n"
+        self.write(str(label.name) + ":\n")
 
     def printInstr(self, instr: NativeInstr):
         if instr.isLabel():
-            self.buffer += str(instr.label) + ":"
+            self.write(str(instr.label) + ":\n")
         else:
-            self.buffer += self.INDENTS + str(instr)
-        self.buffer += "\n"
+            self.write(self.INDENTS + str(instr) + "\n")
+            self.instrs += 1
 
     def printComment(self, comment: str):
-        self.buffer += self.INDENTS + self.COMMENT_PROMPT + " " + comment + "\n"
+        self.write(self.INDENTS + self.COMMENT_PROMPT + " " + comment + "\n")
+
+    # Print code that has already been formatted, e.g. the code of a function printed by another printer.
+    def printText(self, text: str):
+        self.write(text)
+
+    # Write the pending chunks to `out`, or join them.
+    def flush(self):
+        if self.out is not None:
+            self.out.write("".join(self.chunks))
+            self.chunks.clear()
+        elif len(self.chunks) > self.flushed:
+            self.chunks[self.flushed :] = ["".join(self.chunks[self.flushed :])]
+            self.flushed = len(self.chunks)
+
+    # Flush, and return where the code printed next starts, for `text`.
+    def mark(self) -> int:
+        self.flush()
+        return len(self.chunks)
+
+    # The code printed since `start` was marked, which must not have been written to `out`.
+    def text(self, start: int = 0) -> str:
+        return "".join(self.chunks[start:])
 
+    # Return the code printed, or flush it and return an empty string if it is written to `out`.
     def close(self) -> str:
-        return self.buffer
+        if self.out is not None:
+            self.flush()
+            return ""
+        return self.text()
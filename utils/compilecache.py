@@ -0,0 +1,246 @@
+"""
+Module that caches the outputs of the compiler on disk, to answer the compilation of an unchanged input at once.
+
+An output (the AST dump, the TAC or the assembly) is stored under a hash of the input source, the requested stage,
+the lexer and the parser, and a fingerprint of the compiler's own source files, so that editing the compiler
+invalidates every output. Outputs are published atomically, thus concurrent compiler processes may share the cache.
+When the outputs stored exceed the size of the cache, the least recently used ones are evicted,
+an output being marked as used by its modification time, which is updated on every hit.
+
+This module only imports the standard library, so that `main.py` can answer a hit before importing the compiler
+(see `answer`). Only the compilations that succeed are stored.
+
+Environment variables:
+    MINIDECAF_CACHE_DIR: the cache directory used when `--cache-dir` is not given. The cache is disabled if neither is.
+"""
+
+import argparse
+import fcntl
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from typing import Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The sources of the compiler, whose fingerprint is part of every key.
+SOURCES = ("frontend", "backend", "utils", "main.py")
+
+DEFAULT_SIZE = 64  # MiB
+
+_fingerprint: Optional[str] = None
+
+# The hits and the misses of the cache, stored as two unsigned 64-bit integers in its `counts` file.
+_EVENTS = ("hits", "misses")
+_COUNTS = struct.Struct("<2Q")
+
+
+def cache_dir(args: argparse.Namespace) -> Optional[str]:
+    return args.cache_dir or os.environ.get("MINIDECAF_CACHE_DIR") or None
+
+
+def fingerprint() -> str:
+    "Hash the source files of the compiler, together with the Python version."
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha1(f"{sys.version_info[:2]}".encode())
+        for source in SOURCES:
+            path = os.path.join(ROOT_DIR, source)
+            files = [path]
+            if os.path.isdir(path):
+                files = []
+                for dir, subdirs, names in os.walk(path):
+                    subdirs.sort()
+                    files.extend(
+                        os.path.join(dir, name)
+                        for name in sorted(names)
+                        if name.endswith(".py")
+                    )
+            for file in files:
+                h.update(os.path.relpath(file, ROOT_DIR).encode() + b"\0")
+                with open(file, "rb") as f:
+                    h.update(f.read())
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+
+def mode(args: argparse.Namespace) -> Optional[str]:
+    "The stage whose output is requested, as `main` chooses it."
+    return next(
+        (mode for mode in ("riscv", "tac", "parse") if getattr(args, mode)), None
+    )
+
+
+def key(args: argparse.Namespace, code: str) -> str:
+    h = hashlib.sha256()
+    for part in (fingerprint(), mode(args), args.lexer, args.parser):
+        h.update(f"{part}\0".encode())
+    h.update(code.encode())
+    return h.hexdigest()
+
+
+def _path(directory: str, key: str) -> str:
+    return os.path.join(directory, "objects", key[:2], key)
+
+
+def _read_counts(fd: int) -> list[int]:
+    data = os.pread(fd, _COUNTS.size, 0)
+    return list(_COUNTS.unpack(data)) if len(data) == _COUNTS.size else [0, 0]
+
+
+def _count(directory: str, event: str) -> None:
+    """
+    Count a hit or a miss in the counters of the cache, which keep their size.
+    The file is locked while it is updated, so no count is lost to concurrency.
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(os.path.join(directory, "counts"), os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        counts = _read_counts(fd)
+        counts[_EVENTS.index(event)] += 1
+        os.pwrite(fd, _COUNTS.pack(*counts), 0)
+    except OSError:
+        pass
+    finally:
+        # Releases the lock.
+        os.close(fd)
+
+
+def load(directory: str, key: str) -> Optional[str]:
+    "The output stored under `key`, or `None` on a miss. Both are counted."
+    path = _path(directory, key)
+    try:
+        with open(path, "r") as f:
+            output = f.read()
+        os.utime(path)
+    except OSError:
+        _count(directory, "misses")
+        return None
+    _count(directory, "hits")
+    return output
+
+
+def store(directory: str, key: str, output: str, size: int = DEFAULT_SIZE) -> None:
+    """
+    Publish `output` under `key` atomically, then evict the least recently used outputs beyond `size` MiB.
+    A cache directory that is not writable is ignored.
+    """
+    path = _path(directory, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(output)
+        os.replace(tmp, path)
+    except OSError:
+        os.remove(tmp)
+        return
+    evict(directory, size)
+
+
+def _entries(directory: str) -> list[os.DirEntry]:
+    entries = []
+    objects = os.path.join(directory, "objects")
+    try:
+        subdirs = list(os.scandir(objects))
+    except OSError:
+        return entries
+    for subdir in subdirs:
+        if subdir.is_dir():
+            entries.extend(
+                entry for entry in os.scandir(subdir) if not entry.name.startswith(".")
+            )
+    return entries
+
+
+def evict(directory: str, size: int) -> None:
+    entries = [(entry.stat(), entry.path) for entry in _entries(directory)]
+    total = sum(stat.st_size for stat, _ in entries)
+    entries.sort(key=lambda entry: entry[0].st_mtime_ns)
+    for stat, path in entries:
+        if total <= size * 2**20:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= stat.st_size
+
+
+def stats(directory: str) -> dict[str, int]:
+    counts = dict.fromkeys(_EVENTS, 0)
+    try:
+        fd = os.open(os.path.join(directory, "counts"), os.O_RDONLY)
+    except OSError:
+        fd = None
+    if fd is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            counts.update(zip(_EVENTS, _read_counts(fd)))
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    entries = _entries(directory)
+    counts["entries"] = len(entries)
+    counts["bytes"] = sum(entry.stat().st_size for entry in entries)
+    return counts
+
+
+def print_stats(directory: str) -> None:
+    counts = stats(directory)
+    lookups = counts["hits"] + counts["misses"]
+    rate = counts["hits"] / lookups if lookups else 0
+    print(f"cache: {directory}")
+    print(f"hits: {counts['hits']}, misses: {counts['misses']}, hit rate: {rate:.1%}")
+    print(f"stored: {counts['entries']} outputs, {counts['bytes']} bytes")
+
+
+def answer(argv: list[str]) -> None:
+    """
+    Answer the command line `argv` of `main.py` from the cache if possible, and then exit.
+    Only the compilations of a single input are answered, and `--cache-stats`. Otherwise, this returns.
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--input", type=str)
+    parser.add_argument("--parse", action="store_true")
+    parser.add_argument("--tac", action="store_true")
+    parser.add_argument("--riscv", action="store_true")
+    parser.add_argument("--lexer", type=str, default="ply")
+    parser.add_argument("--parser", type=str, default="lalr")
+    parser.add_argument("--cache-dir", type=str)
+    parser.add_argument("--cache-size", type=int)
+    parser.add_argument("--incremental", action="store_true")
+    # The output is the same with or without it.
+    parser.add_argument("--pipeline", action="store_true")
+    parser.add_argument("--cache-stats", action="store_true")
+    args, rest = parser.parse_known_args(argv)
+
+    directory = cache_dir(args)
+    if rest or directory is None:
+        return
+    if args.cache_stats:
+        print_stats(directory)
+        exit(0)
+    if args.input is None or mode(args) is None:
+        return
+
+    try:
+        with open(args.input, "r") as f:
+            code = f.read()
+    except OSError:
+        return
+    output = load(directory, key(args, code))
+    if output is not None:
+        sys.stdout.write(output)
+        exit(0)
@@ -0,0 +1,131 @@
+"""
+Module that recompiles a program function by function, reusing the outputs of the functions that did not change.
+
+Every function is keyed by a structural hash of its AST, together with the signatures of all the functions
+of the program (which calls depend on) and the fingerprint of the compiler (see `utils.compilecache`).
+Its TAC and its assembly are stored in the compilation cache under that key.
+When every function of a program is found, the program is only parsed and hashed.
+Otherwise, the frontend runs on the program, since `Namer`, `Typer` and `TACGen` translate whole programs,
+and the backend (instruction selection, liveness analysis and register allocation) runs on the changed functions only,
+the assembly of the others being stitched in through `AsmCodePrinter`.
+
+For the assembly of a function to be reusable, it must not depend on the functions compiled before it,
+thus the state of the registers is reset before each function, and block labels are numbered per function
+(see `Context.freshLabel`).
+"""
+
+import hashlib
+from typing import Optional
+
+from backend.dataflow.cfgbuilder import CFGBuilder
+from backend.dataflow.livenessanalyzer import LivenessAnalyzer
+from backend.reg.bruteregalloc import BruteRegAlloc
+from backend.riscv.riscvasmemitter import RiscvAsmEmitter
+from frontend.ast.node import Node
+from frontend.ast.tree import Function, Identifier, IntLiteral, Program
+from frontend.tacgen.tacgen import TACGen
+from frontend.typecheck.namer import Namer
+from frontend.typecheck.typer import Typer
+from utils import compilecache
+from utils.riscv import Riscv
+from utils.tac.tacfunc import TACFunc
+
+
+def digest(func: Function, signatures: str) -> str:
+    """
+    The structural hash of `func`: the kind, the value and the number of children of its nodes, in preorder.
+    The tree is walked with an explicit stack, as it may be deeper than the recursion limit.
+    """
+    h = hashlib.sha256(f"{compilecache.fingerprint()}\0{signatures}\0".encode())
+    stack: list[Node] = [func]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (Identifier, IntLiteral)):
+            h.update(f"{node.name} {node.value}\0".encode())
+        else:
+            h.update(f"{node.name} {len(node)}\0".encode())
+            stack.extend(reversed(node))
+    return h.hexdigest()
+
+
+def signatures(program: Program) -> str:
+    return ",".join(
+        f"{func.ret_t.type} {name}"
+        for name, func in sorted(program.functions().items())
+    )
+
+
+def tacText(func: TACFunc) -> str:
+    "What `TACFunc.printTo` prints."
+    return "".join(
+        f"{instr}\n" if instr.isLabel() else f"    {instr}\n"
+        for instr in func.getInstrSeq()
+    )
+
+
+class IncrementalCompiler:
+    def __init__(self, directory: str, size: int = compilecache.DEFAULT_SIZE) -> None:
+        self.directory = directory
+        self.size = size
+        # The functions reused and the ones compiled by the last compilation.
+        self.reused: list[str] = []
+        self.compiled: list[str] = []
+
+    def _load(self, key: str, stage: str) -> Optional[str]:
+        return compilecache.load(self.directory, f"{key}-{stage}")
+
+    def _store(self, key: str, stage: str, output: str) -> None:
+        compilecache.store(self.directory, f"{key}-{stage}", output, self.size)
+
+    def compile(self, program: Program, stage: str) -> str:
+        """
+        The output of `program` at `stage` ("tac" or "riscv"), as `main` prints it.
+        """
+        shared = signatures(program)
+        keys = {
+            name: digest(func, shared) for name, func in program.functions().items()
+        }
+        outputs = {name: self._load(key, stage) for name, key in keys.items()}
+        self.reused = [name for name, output in outputs.items() if output is not None]
+        self.compiled = [name for name, output in outputs.items() if output is None]
+        if not self.compiled:
+            return self._stitch(program, outputs, stage)
+
+        program = Typer().transform(Namer().transform(program))
+        tac = TACGen().transform(program)
+        funcs = {func.entry.name: func for func in tac.funcs}
+
+        if stage == "tac":
+            for name in self.compiled:
+                outputs[name] = tacText(funcs[name])
+                self._store(keys[name], stage, outputs[name])  # type: ignore
+            return self._stitch(program, outputs, stage)
+
+        emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
+        analyzer = LivenessAnalyzer()
+        for name in self.compiled:
+            for reg in Riscv.AllocatableRegs:
+                reg.occupied = False
+                reg.used = False
+                reg.temp = None
+            start = emitter.printer.mark()
+            instrs, info = emitter.selectInstr(funcs[name])
+            cfg = CFGBuilder().buildFrom(instrs)
+            analyzer.accept(cfg)
+            BruteRegAlloc(emitter).accept(cfg, info)
+            outputs[name] = emitter.printer.text(start)
+            self._store(keys[name], stage, outputs[name])  # type: ignore
+        return self._stitch(program, outputs, stage)
+
+    def _stitch(
+        self, program: Program, outputs: dict[str, Optional[str]], stage: str
+    ) -> str:
+        if stage == "tac":
+            return "".join(outputs[name] for name in program.functions())  # type: ignore
+
+        # The emitter prints the beginning of the assembly.
+        emitter = RiscvAsmEmitter(Riscv.AllocatableRegs, Riscv.CallerSaved)
+        for name in program.functions():
+            emitter.printer.printText(outputs[name])  # type: ignore
+        # As `print` does in `main`.
+        return emitter.emitEnd() + "\n"
@@ -0,0 +1,122 @@
+"""
+Module that measures the passes of the compiler, for `--time-passes`.
+
+A pass is measured by `with timer.measure(name, function):` around it: its wall time, its CPU time,
+and the peak of the memory it allocated (traced by `tracemalloc`, thus only while a timer is enabled).
+The backend passes run once per function and are measured as such; the report aggregates them by pass as well.
+
+`NULL_TIMER` measures nothing: it is what the passes are given when `--time-passes` is not, and costs a no-op `with`.
+"""
+
+import contextlib
+import json
+import time
+import tracemalloc
+from typing import ContextManager, Iterator, NamedTuple, Optional
+
+
+class PassRecord(NamedTuple):
+    name: str
+    # The function the pass ran on, if it runs per function.
+    function: Optional[str]
+    wall: float
+    cpu: float
+    # The peak of the memory allocated during the pass, in bytes.
+    peak: int
+
+
+class PassTimer:
+    def __init__(self) -> None:
+        self.records: list[PassRecord] = []
+        self.started = False
+        self._peaks: list[list[int]] = []
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+
+    def stop(self) -> None:
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+
+    @contextlib.contextmanager
+    def measure(self, name: str, function: Optional[str] = None) -> Iterator[None]:
+        # `tracemalloc` has a single peak, which is reset for every pass. Passes may nest, e.g. the backend of a function
+        # in the whole backend: the peaks of the passes that are running are kept in `_peaks`, as [start, peak] pairs.
+        current, peak = tracemalloc.get_traced_memory()
+        for running in self._peaks:
+            running[1] = max(running[1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append([current, current])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+            _, peak = tracemalloc.get_traced_memory()
+            start, inner = self._peaks.pop()
+            peak = max(peak, inner)
+            for running in self._peaks:
+                running[1] = max(running[1], peak)
+            self.records.append(PassRecord(name, function, wall, cpu, peak - start))
+
+    def totals(self) -> dict[str, PassRecord]:
+        "The records aggregated by pass, in the order the passes first ran: times add up, and peaks are maximized."
+        totals: dict[str, PassRecord] = {}
+        for record in self.records:
+            total = totals.get(record.name)
+            if total is None:
+                totals[record.name] = record._replace(function=None)
+            else:
+                totals[record.name] = total._replace(
+                    wall=total.wall + record.wall,
+                    cpu=total.cpu + record.cpu,
+                    peak=max(total.peak, record.peak),
+                )
+        return totals
+
+    def report(self) -> str:
+        lines = [
+            f"{'pass':<24} {'function':<16} {'wall (ms)':>10} {'cpu (ms)':>10} {'peak (KiB)':>11}"
+        ]
+
+        def line(record: PassRecord) -> str:
+            return (
+                f"{record.name:<24} {record.function or '':<16} {record.wall * 1000:10.3f}"
+                f" {record.cpu * 1000:10.3f} {record.peak / 1024:11.1f}"
+            )
+
+        lines.extend(map(line, self.totals().values()))
+        functions = [record for record in self.records if record.function is not None]
+        if functions:
+            lines.append("")
+            lines.extend(map(line, functions))
+        return "\n".join(lines)
+
+    def json(self) -> str:
+        return json.dumps(
+            {
+                "passes": [record._asdict() for record in self.totals().values()],
+                "functions": [
+                    record._asdict()
+                    for record in self.records
+                    if record.function is not None
+                ],
+            },
+            indent=2,
+        )
+
+
+class _NullTimer(PassTimer):
+    def measure(
+        self, name: str, function: Optional[str] = None
+    ) -> ContextManager[None]:
+        return _NULL_CONTEXT
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+NULL_TIMER: PassTimer = _NullTimer()
@@ -1,5 +1,8 @@
 from frontend.ast.node import Node
 
+_CLOSE_NODE = object()
+_CLOSE_LIST = object()
+
 
 class TreePrinter:
     l = "["
@@ -11,37 +14,47 @@ class TreePrinter:
         self.indentNum = 0
 
     def work(self, element) -> None:
-        if element is None:
-            self.printLine("<None: here is a bug>")
+        # Elements still to print, along with markers closing the nodes/lists that have been opened.
+        # An explicit stack is used, as the tree may be deeper than the recursion limit.
+        stack = [element]
+        while stack:
+            element = stack.pop()
 
-        elif isinstance(element, Node):
-            if element.is_leaf():
-                self.printLine(str(element))
-                return
-
-            if len(element) == 0:
-                self.printLine(f"{element.name} {self.lr}")
-                return
-
-            self.printLine(f"{element.name} {self.l}")
-            self.incIndent()
-            for it in element:
-                self.work(it)
-            self.decIndent()
-            self.printLine(self.r)
-
-        elif isinstance(element, list):
-            self.printLine("List")
-            self.incIndent()
-            if len(element) == 0:
-                self.printLine("<empty>")
-            else:
-                for it in element:
-                    self.work(it)
-            self.decIndent()
+            if element is _CLOSE_NODE:
+                self.decIndent()
+                self.printLine(self.r)
+
+            elif element is _CLOSE_LIST:
+                self.decIndent()
+
+            elif element is None:
+                self.printLine("<None: here is a bug>")
+
+            elif isinstance(element, Node):
+                if element.is_leaf():
+                    self.printLine(str(element))
+                    continue
 
-        else:
-            self.printLine(str(element))
+                if len(element) == 0:
+                    self.printLine(f"{element.name} {self.lr}")
+                    continue
+
+                self.printLine(f"{element.name} {self.l}")
+                self.incIndent()
+                stack.append(_CLOSE_NODE)
+                stack.extend(reversed(element))
+
+            elif isinstance(element, list):
+                self.printLine("List")
+                self.incIndent()
+                stack.append(_CLOSE_LIST)
+                if len(element) == 0:
+                    self.printLine("<empty>")
+                else:
+                    stack.extend(reversed(element))
+
+            else:
+                self.printLine(str(element))
 
     def outputIndent(self) -> None:
         if self.indentNum > 0:
@@ -0,0 +1,163 @@
+"""
+Module that persists the tables generated by `ply.lex` and `ply.yacc`.
+
+Building the lexer master regex and the LALR tables is the most expensive part of starting the compiler.
+Tables are therefore generated once into a cache directory, under a name that contains a hash of
+the source files describing the lexer/grammar, and loaded through PLY's optimized path afterwards.
+Editing any of those source files changes the hash, so stale tables are never picked up.
+
+PLY writes its tables as Python modules. Compiling such a module is about as slow as regenerating it
+when bytecode is not cached, so the cache stores the module's contents marshalled instead,
+and hands PLY a module object rebuilt from them.
+Generated Python modules (see `frontend.parser.codegen`) are stored along with their compiled code likewise.
+
+Environment variables:
+    MINIDECAF_TABLE_DIR:      where to store the tables (default: `.plycache` under the project root).
+    MINIDECAF_NO_TABLE_CACHE: if set to a non-empty value, fall back to PLY's default behavior,
+                              i.e. rebuild everything and write `parser.out` on every run.
+"""
+
+import hashlib
+import marshal
+import os
+import runpy
+import shutil
+import sys
+import tempfile
+import types
+from typing import Callable, Optional
+
+import ply
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def enabled() -> bool:
+    return not os.environ.get("MINIDECAF_NO_TABLE_CACHE")
+
+
+def cache_dir() -> str:
+    return os.environ.get("MINIDECAF_TABLE_DIR") or os.path.join(ROOT_DIR, ".plycache")
+
+
+def fingerprint(*modules: types.ModuleType) -> str:
+    """
+    Hash the source files of the given modules, together with the PLY and Python versions.
+    """
+    h = hashlib.sha1(f"{ply.__version__} {sys.version_info[:2]}".encode())
+    for module in modules:
+        with open(module.__file__, "rb") as f:  # type: ignore
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def table_name(prefix: str, *modules: types.ModuleType) -> str:
+    return f"{prefix}_{fingerprint(*modules)}"
+
+
+def load(name: str) -> Optional[types.ModuleType]:
+    """
+    Load previously stored tables by their name, or return `None` if they do not exist (yet).
+    """
+    path = os.path.join(cache_dir(), name + ".tab")
+    try:
+        with open(path, "rb") as f:
+            tables = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    module = types.ModuleType(name)
+    module.__file__ = path
+    module.__dict__.update(tables)
+    return module
+
+
+def store(name: str, write: Callable[[str, str], None]) -> Optional[types.ModuleType]:
+    """
+    Let PLY write a table module through `write(name, outputdir)`, convert it and publish it atomically,
+    so that concurrent compiler processes never observe a half-written file.
+    Tables of other versions with the same prefix are removed.
+    Returns the freshly loaded tables, or `None` if the cache directory is not writable.
+    """
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmpdir = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+    except OSError:
+        return None
+
+    try:
+        write(name, tmpdir)
+        tables = {
+            key: value
+            for key, value in runpy.run_path(os.path.join(tmpdir, name + ".py")).items()
+            if key.startswith("_") and not key.startswith("__")
+        }
+        path = os.path.join(tmpdir, name + ".tab")
+        with open(path, "wb") as f:
+            marshal.dump(tables, f)
+        os.replace(path, os.path.join(directory, name + ".tab"))
+    except OSError:
+        return None
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    _remove_stale(directory, name)
+    return load(name)
+
+
+def load_code(name: str) -> Optional[types.CodeType]:
+    """
+    Load a module previously stored by `store_code`, compiled, or return `None` if it does not exist (yet).
+    """
+    try:
+        with open(os.path.join(cache_dir(), name + ".code"), "rb") as f:
+            code = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return code if isinstance(code, types.CodeType) else None
+
+
+def store_code(name: str, source: str) -> Optional[types.CodeType]:
+    """
+    Store the source of a generated module next to its compiled code, which is what `load_code` reads back.
+    The source is kept for reading and for tracebacks. Modules of other versions with the same prefix are removed.
+    Returns the compiled code, or `None` if the cache directory is not writable.
+    """
+    directory = cache_dir()
+    path = os.path.join(directory, name + ".py")
+    code = compile(source, path, "exec")
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmpdir = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+    except OSError:
+        return None
+
+    try:
+        with open(os.path.join(tmpdir, name + ".py"), "w") as f:
+            f.write(source)
+        with open(os.path.join(tmpdir, name + ".code"), "wb") as f:
+            marshal.dump(code, f)
+        os.replace(os.path.join(tmpdir, name + ".py"), path)
+        os.replace(
+            os.path.join(tmpdir, name + ".code"),
+            os.path.join(directory, name + ".code"),
+        )
+    except OSError:
+        return None
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    _remove_stale(directory, name)
+    return code
+
+
+def _remove_stale(directory: str, name: str) -> None:
+    prefix = name.rsplit("_", 1)[0] + "_"
+    for entry in os.listdir(directory):
+        stem, ext = os.path.splitext(entry)
+        if ext in (".tab", ".py", ".code") and stem.startswith(prefix) and stem != name:
+            try:
+                os.remove(os.path.join(directory, entry))
+            except OSError:
+                pass
@@ -9,7 +9,6 @@ class Context:
     def __init__(self) -> None:
         self.labels = {}
         self.funcs = []
-        self.nextTempLabelId = 1
 
     def putFuncLabel(self, name: str) -> None:
         self.labels[name] = FuncLabel(name)
@@ -17,7 +16,8 @@ class Context:
     def getFuncLabel(self, name: str) -> FuncLabel:
         return self.labels[name]
 
-    def freshLabel(self) -> BlockLabel:
-        name = str(self.nextTempLabelId)
-        self.nextTempLabelId += 1
+    # Block labels are numbered per function, so that the code of a function does not depend on the functions before it.
+    # The labels of the functions other than 'main' are prefixed with the function name, to tell them apart.
+    def freshLabel(self, func: FuncLabel, labelId: int) -> BlockLabel:
+        name = str(labelId) if func.func == "main" else f"{func.func}_{labelId}"
         return BlockLabel(name)
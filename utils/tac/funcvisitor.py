@@ -18,6 +18,7 @@ class FuncVisitor:
         self.func = TACFunc(entry, numArgs)
         self.visitLabel(entry)
         self.nextTempId = 0
+        self.nextLabelId = 1
 
         self.continueLabelStack = []
         self.breakLabelStack = []
@@ -30,7 +31,9 @@ class FuncVisitor:
 
     # To get a fresh new label (for jumping and branching, etc).
     def freshLabel(self) -> Label:
-        return self.ctx.freshLabel()
+        label = self.ctx.freshLabel(self.func.entry, self.nextLabelId)
+        self.nextLabelId += 1
+        return label
 
     # To count how many temporary variables have been used.
     def getUsedTemp(self) -> int:
@@ -7,6 +7,7 @@ from utils.label.label import Label, LabelKind
 
 from .context import Context
 from .funcvisitor import FuncVisitor
+from .tacfunc import TACFunc
 from .tacprog import TACProg
 
 
@@ -26,5 +27,11 @@ class ProgramWriter:
         entry = self.ctx.getFuncLabel(name)
         return FuncVisitor(entry, numArgs, self.ctx)
 
+    # Finish the function visited by mv, and hand it over rather than keeping it for visitEnd:
+    # the functions can then be translated, compiled and dropped one at a time.
+    def takeFunc(self, mv: FuncVisitor) -> TACFunc:
+        mv.visitEnd()
+        return self.ctx.funcs.pop()
+
     def visitEnd(self) -> TACProg:
         return TACProg(self.ctx.funcs)